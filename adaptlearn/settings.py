@@ -24,6 +24,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -103,3 +104,83 @@ CORS_ALLOWED_ORIGINS = [
 ]
 
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
+
+# Quizzes are built from the question bank once a course has this many distinct questions
+QUESTION_BANK_MIN_QUESTIONS = int(os.getenv('QUESTION_BANK_MIN_QUESTIONS', '30'))
+
+# Seconds a process reuses a topic's near-duplicate index before reloading it (core/question_dedup.py)
+QUESTION_DEDUP_INDEX_TTL = int(os.getenv('QUESTION_DEDUP_INDEX_TTL', '300'))
+
+# Ready-to-serve quizzes kept per popular topic by `manage.py pregenerate_quizzes`
+QUIZ_POOL_TARGET = int(os.getenv('QUIZ_POOL_TARGET', '3'))
+
+# Shared LLM client (core/llm_client.py)
+LLM_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', '30'))
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '64'))
+# Output tokens one batched multi-topic quiz call may ask for (about 2000 per topic)
+LLM_BATCH_TOKEN_BUDGET = int(os.getenv('LLM_BATCH_TOKEN_BUDGET', '8000'))
+
+# LLM backend (core/llm_providers): 'gemini', 'local' or a dotted path to an LLMProvider subclass
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'gemini')
+
+# The 'local' provider answers offline after LLM_LOCAL_LATENCY_SECONDS (+/- LLM_LOCAL_JITTER_SECONDS)
+# plus LLM_LOCAL_CHUNK_DELAY_SECONDS per streamed chunk, failing LLM_LOCAL_FAILURE_RATE of calls
+LLM_LOCAL_LATENCY_SECONDS = float(os.getenv('LLM_LOCAL_LATENCY_SECONDS', '0.5'))
+LLM_LOCAL_JITTER_SECONDS = float(os.getenv('LLM_LOCAL_JITTER_SECONDS', '0.1'))
+LLM_LOCAL_CHUNK_DELAY_SECONDS = float(os.getenv('LLM_LOCAL_CHUNK_DELAY_SECONDS', '0.02'))
+LLM_LOCAL_FAILURE_RATE = float(os.getenv('LLM_LOCAL_FAILURE_RATE', '0'))
+LLM_LOCAL_SEED = int(os.getenv('LLM_LOCAL_SEED', '0'))
+
+# Point at a local fake server for testing, e.g. GEMINI_API_ENDPOINT=http://127.0.0.1:8765 GEMINI_TRANSPORT=rest
+GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT')
+GEMINI_TRANSPORT = os.getenv('GEMINI_TRANSPORT')
+
+# Circuit breaker around LLM calls: trips when the failure rate over the last
+# LLM_BREAKER_WINDOW calls reaches LLM_BREAKER_FAILURE_RATE, probes again after LLM_BREAKER_RESET_SECONDS
+LLM_BREAKER_FAILURE_RATE = float(os.getenv('LLM_BREAKER_FAILURE_RATE', '0.5'))
+LLM_BREAKER_MINIMUM_CALLS = int(os.getenv('LLM_BREAKER_MINIMUM_CALLS', '5'))
+LLM_BREAKER_WINDOW = int(os.getenv('LLM_BREAKER_WINDOW', '20'))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv('LLM_BREAKER_RESET_SECONDS', '30'))
+
+# Roadmap generation runs on an in-process pool, capped separately from web concurrency
+ROADMAP_JOB_WORKERS = int(os.getenv('ROADMAP_JOB_WORKERS', '4'))
+ROADMAP_JOB_STALE_SECONDS = int(os.getenv('ROADMAP_JOB_STALE_SECONDS', '120'))
+
+# Shared roadmap templates (core/roadmap_cache.py). locmem evicts least recently used
+# entries past MAX_ENTRIES; point ROADMAP_CACHE_BACKEND/LOCATION at a shared cache in production.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'roadmaps': {
+        'BACKEND': os.getenv('ROADMAP_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('ROADMAP_CACHE_LOCATION', 'roadmaps'),
+        'TIMEOUT': int(os.getenv('ROADMAP_CACHE_TTL', str(60 * 60 * 24))),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('ROADMAP_CACHE_MAX_ENTRIES', '5000')),
+        },
+    },
+}
+
+# Course catalog (core/course_catalog.py): each process re-reads the catalog version from the
+# database at most every RECHECK seconds and rebuilds the cached body after MAX_AGE regardless
+COURSE_CATALOG_RECHECK_SECONDS = float(os.getenv('COURSE_CATALOG_RECHECK_SECONDS', '5'))
+COURSE_CATALOG_MAX_AGE = float(os.getenv('COURSE_CATALOG_MAX_AGE', '300'))
+
+# Score single submissions with the NumPy batch scorer (core/batch_evaluator.py); output is identical
+VECTORIZED_EVALUATION = os.getenv('VECTORIZED_EVALUATION', 'False') == 'True'
+
+# Adaptive assessments (core/adaptive.py): stop once the ability standard error
+# reaches ADAPTIVE_TARGET_SE, but never before MIN or after MAX questions.
+# With uncalibrated items 0.62 stops after about 8 questions, as precise as the
+# fixed 10-question quiz (SE about 0.6); 0.55 needs about 11, 0.7 about 5.
+ADAPTIVE_MIN_QUESTIONS = int(os.getenv('ADAPTIVE_MIN_QUESTIONS', '5'))
+ADAPTIVE_MAX_QUESTIONS = int(os.getenv('ADAPTIVE_MAX_QUESTIONS', '15'))
+ADAPTIVE_TARGET_SE = float(os.getenv('ADAPTIVE_TARGET_SE', '0.62'))
+ADAPTIVE_POOL_TTL = int(os.getenv('ADAPTIVE_POOL_TTL', '60'))
+
+# Prometheus metrics at /metrics (core/metrics.py). Set METRICS_DIR to a directory shared by
+# all workers (emptied before start) to aggregate across processes. Scrapes need
+# "Authorization: Bearer <METRICS_TOKEN>"; without a token only staff sessions can read it
+METRICS_DIR = os.getenv('METRICS_DIR')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
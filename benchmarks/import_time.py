@@ -0,0 +1,92 @@
+"""
+Cold-start import benchmark.
+
+Imports adaptlearn.wsgi (and resolves the URLconf, which imports the views)
+in a fresh interpreter under `python -X importtime`, then reports the total
+and the slowest modules. Exits non-zero when startup is over budget or when
+a module that should only load on first use (an LLM SDK, numpy) was pulled
+in at boot.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 600 --runs 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP = 'import adaptlearn.wsgi; from django.urls import get_resolver; get_resolver().url_patterns'
+
+# Loaded on first use only; importing any of these at boot is a regression
+LAZY_MODULES = ('google.generativeai', 'grpc', 'numpy')
+
+
+def measure(settings_module):
+    """One cold start; returns {module: (self_us, cumulative_us)} and the top-level total in microseconds"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        raise SystemExit(f'Startup failed with exit code {result.returncode}')
+
+    modules = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        self_us, cumulative_us = int(fields[0]), int(fields[1])
+        name = fields[2]
+        stripped = name.lstrip()
+        if len(name) - len(stripped) == 1:
+            # Only top-level imports are counted, nested ones are inside their cumulative time
+            total += cumulative_us
+        modules[stripped] = (self_us, cumulative_us)
+    return modules, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold-start import time of adaptlearn.wsgi')
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'adaptlearn.settings'))
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('IMPORT_TIME_BUDGET_MS', 800)))
+    parser.add_argument('--runs', type=int, default=3, help='cold starts to run; the median is compared to the budget')
+    parser.add_argument('--top', type=int, default=10, help='slowest modules to list')
+    args = parser.parse_args()
+
+    totals = []
+    for _ in range(max(args.runs, 1)):
+        modules, total = measure(args.settings)
+        totals.append(total)
+    median_ms = statistics.median(totals) / 1000
+
+    print(f'Cold start of adaptlearn.wsgi: median {median_ms:.0f}ms over {len(totals)} runs '
+          f'(min {min(totals) / 1000:.0f}ms, max {max(totals) / 1000:.0f}ms), budget {args.budget_ms:.0f}ms')
+    print('Slowest modules (self time, last run):')
+    for name, (self_us, cumulative_us) in sorted(modules.items(), key=lambda m: -m[1][0])[:args.top]:
+        print(f'  {self_us / 1000:8.1f}ms  {cumulative_us / 1000:8.1f}ms cumulative  {name}')
+
+    failures = []
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        failures.append(f'imported at startup but should load lazily: {", ".join(eager)}')
+    if median_ms > args.budget_ms:
+        failures.append(f'{median_ms:.0f}ms is over the {args.budget_ms:.0f}ms budget')
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    if failures:
+        sys.exit(1)
+    print('OK')
+
+
+if __name__ == '__main__':
+    main()
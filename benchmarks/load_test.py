@@ -0,0 +1,559 @@
+"""
+End-to-end load test of the learner flow.
+
+Every simulated learner registers, logs in, creates a profile, starts a
+custom assessment, submits answers, reads the results and generates a
+roadmap (polling the job until it finishes). Learners run concurrently
+against one of:
+
+    client  Django's test client, in this process (one thread per in-flight learner)
+    wsgi    adaptlearn.wsgi behind a threaded wsgiref server, in this process
+    asgi    adaptlearn.asgi behind uvicorn, in this process (pip install uvicorn)
+    --url   an already running server; server-side query counts are then unavailable
+
+The LLM is the offline 'local' provider (core/llm_providers/local.py) unless
+--llm configured is given, so runs measure the app's own overhead. Results
+(requests/sec, p50/p95/p99 latency and DB queries per endpoint, peak RSS) are
+written as JSON; --compare prints the change against an earlier result.
+Run against Postgres for concurrency figures: SQLite allows one writer at a
+time and answers concurrent learners with "database is locked" errors.
+
+    python manage.py migrate
+    python benchmarks/load_test.py --target asgi --learners 2000 --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import os
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = 'benchmark-Passw0rd'
+LEARNING_GOALS = ['career_switch', 'upskill', 'personal_project', 'academic', 'freelance', 'explore']
+PREFERRED_TIMES = ['early_morning', 'evening', 'weekend', 'flexible']
+
+# The request being served on this thread or task: [endpoint, query count]
+_current_request = contextvars.ContextVar('benchmark_request', default=None)
+
+
+class ServerStats:
+    """DB queries per request, counted inside the server through connection.execute_wrapper"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = {}  # endpoint -> [queries per request]
+        self.background_queries = 0  # roadmap jobs and other work outside a request
+
+    def count_query(self, execute, sql, params, many, context):
+        record = _current_request.get()
+        if record is None:
+            with self._lock:
+                self.background_queries += 1
+        else:
+            record[1] += 1
+        return execute(sql, params, many, context)
+
+    def install(self, connection, **kwargs):
+        if self.count_query not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self.count_query)
+
+    def begin(self, path):
+        from django.urls import Resolver404, resolve
+        try:
+            endpoint = resolve(path).url_name or path
+        except Resolver404:
+            endpoint = path
+        record = [endpoint, 0]
+        return record, _current_request.set(record)
+
+    def end(self, record, token):
+        _current_request.reset(token)
+        with self._lock:
+            self.queries.setdefault(record[0], []).append(record[1])
+
+
+class ClientStats:
+    """Latency and status of every request, as seen by the learners"""
+
+    def __init__(self):
+        self.latencies = {}  # endpoint -> [seconds]
+        self.statuses = {}  # endpoint -> {status: count}
+        self.flows_completed = 0
+        self.flows_failed = {}  # step -> count
+
+    def record(self, endpoint, status, seconds):
+        self.latencies.setdefault(endpoint, []).append(seconds)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[status] = counts.get(status, 0) + 1
+
+
+class FlowError(Exception):
+    def __init__(self, step, status, body):
+        super().__init__(f'{step} returned {status}: {str(body)[:200]}')
+        self.step = step
+
+
+# Transports: each returns (status, parsed JSON body or None)
+
+class TestClientTransport:
+    """Django's test client, run on a thread pool so learners overlap"""
+
+    def __init__(self, server_stats, workers):
+        self.server_stats = server_stats
+        self.workers = workers
+
+    async def start(self):
+        from concurrent.futures import ThreadPoolExecutor
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(self.workers, thread_name_prefix='learner'))
+
+    async def stop(self):
+        pass
+
+    def _call(self, method, path, data, token):
+        from django.db import connection
+        from django.test import Client
+
+        self.server_stats.install(connection)
+        headers = {'HTTP_AUTHORIZATION': f'Token {token}'} if token else {}
+        record, context_token = self.server_stats.begin(path)
+        try:
+            # The test client's default host, 'testserver', is not in ALLOWED_HOSTS
+            response = Client(SERVER_NAME='localhost').generic(method, path, json.dumps(data) if data is not None else '',
+                                        content_type='application/json', **headers)
+        finally:
+            self.server_stats.end(record, context_token)
+        return response.status_code, _parse_json(response.content)
+
+    async def request(self, method, path, data=None, token=None):
+        return await asyncio.get_running_loop().run_in_executor(None, self._call, method, path, data, token)
+
+
+class HTTPTransport:
+    """Minimal HTTP/1.1 client on asyncio streams, one connection per request"""
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def request(self, method, path, data=None, token=None):
+        return await asyncio.wait_for(self._request(method, path, data, token), self.timeout)
+
+    async def _request(self, method, path, data, token):
+        body = json.dumps(data).encode() if data is not None else b''
+        headers = [
+            f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}', 'Connection: close',
+            'Accept: application/json', 'Content-Type: application/json', f'Content-Length: {len(body)}',
+        ]
+        if token:
+            headers.append(f'Authorization: Token {token}')
+
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode() + body)
+            await writer.drain()
+            raw = await reader.read()
+        finally:
+            writer.close()
+
+        head, _, content = raw.partition(b'\r\n\r\n')
+        lines = head.decode('latin-1').split('\r\n')
+        status = int(lines[0].split()[1])
+        if any(line.lower().replace(' ', '') == 'transfer-encoding:chunked' for line in lines[1:]):
+            content = _dechunk(content)
+        return status, _parse_json(content)
+
+
+def _parse_json(content):
+    try:
+        return json.loads(content)
+    except ValueError:
+        return None
+
+
+def _dechunk(content):
+    body, position = b'', 0
+    while True:
+        end = content.index(b'\r\n', position)
+        size = int(content[position:end].split(b';')[0], 16)
+        if size == 0:
+            return body
+        body += content[end + 2:end + 2 + size]
+        position = end + 4 + size
+
+
+# In-process servers
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_wsgi_server(server_stats):
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+    from adaptlearn.wsgi import application
+
+    class Server(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+        request_queue_size = 4096
+
+    class Handler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    def counted(environ, start_response):
+        from django.db import connection
+        server_stats.install(connection)
+        record, token = server_stats.begin(environ.get('PATH_INFO', ''))
+        result = application(environ, start_response)
+        try:
+            return list(result)
+        finally:
+            result.close()  # fires request_finished, which releases the DB connection
+            server_stats.end(record, token)
+
+    httpd = make_server('127.0.0.1', 0, counted, server_class=Server, handler_class=Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{httpd.server_port}', httpd.shutdown
+
+
+def start_asgi_server(server_stats):
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit('--target asgi needs an ASGI server: pip install uvicorn')
+    from adaptlearn.asgi import application
+
+    async def counted(scope, receive, send):
+        if scope['type'] != 'http':
+            return await application(scope, receive, send)
+        record, token = server_stats.begin(scope['path'])
+        try:
+            await application(scope, receive, send)
+        finally:
+            server_stats.end(record, token)
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(counted, host='127.0.0.1', port=port, lifespan='off',
+                                           log_level='warning', backlog=4096))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+    return f'http://127.0.0.1:{port}', stop
+
+
+# The learner flow
+
+async def call(transport, stats, endpoint, method, path, data=None, token=None, expect=(200,)):
+    started = time.perf_counter()
+    try:
+        status, body = await transport.request(method, path, data, token)
+    except Exception as e:
+        stats.record(endpoint, type(e).__name__, time.perf_counter() - started)
+        raise FlowError(endpoint, type(e).__name__, e)
+    stats.record(endpoint, status, time.perf_counter() - started)
+    if status not in expect or not isinstance(body, dict):
+        raise FlowError(endpoint, status, body)
+    return status, body
+
+
+async def learner_flow(transport, stats, args, number, rng):
+    email = f'learner-{args.run_id}-{number}@benchmark.local'
+    prefix = '/api'
+
+    await call(transport, stats, 'api_register', 'POST', f'{prefix}/auth/register/',
+               {'full_name': f'Learner {number}', 'email': email, 'password': PASSWORD}, expect=(201,))
+    _, body = await call(transport, stats, 'api_login', 'POST', f'{prefix}/auth/login/',
+                         {'email': email, 'password': PASSWORD})
+    token = body['token']
+
+    await call(transport, stats, 'api_create_profile', 'POST', f'{prefix}/profile/create/', {
+        'learning_goal': rng.choice(LEARNING_GOALS),
+        'weekly_hours': rng.randint(3, 15),
+        'preferred_time': rng.choice(PREFERRED_TIMES),
+    }, token)
+
+    if args.async_views:
+        endpoint, path = 'api_start_assessment_async', f'{prefix}/assessment/start-async/'
+    else:
+        endpoint, path = 'api_start_assessment', f'{prefix}/assessment/start-custom/'
+    _, body = await call(transport, stats, endpoint, 'POST', path, {'course_name': rng.choice(args.topics)}, token)
+    assessment_id = body['assessment_id']
+    answers = {q['question_id']: {'answer': rng.choice('ABCD')} for q in body['quiz']['questions']}
+
+    await call(transport, stats, 'api_submit_assessment', 'POST', f'{prefix}/assessment/submit/', {
+        'assessment_id': assessment_id, 'user_answers': answers, 'time_taken': rng.randint(120, 900),
+    }, token)
+    await call(transport, stats, 'api_results', 'GET', f'{prefix}/assessment/{assessment_id}/results/', token=token)
+
+    if args.async_views:
+        endpoint, path = 'api_generate_roadmap_async', f'{prefix}/roadmap/generate-async/'
+    else:
+        endpoint, path = 'api_generate_roadmap', f'{prefix}/roadmap/generate/'
+    _, body = await call(transport, stats, endpoint, 'POST', path, {'assessment_id': assessment_id}, token,
+                         expect=(200, 202))
+
+    # A queued job (202) is polled until it finishes; a stored or async roadmap comes back directly
+    deadline = time.monotonic() + args.roadmap_timeout
+    while body.get('job_id') and body.get('status') not in ('completed', 'failed'):
+        if time.monotonic() > deadline:
+            raise FlowError('api_roadmap_job', 'timeout', body)
+        await asyncio.sleep(args.poll_interval)
+        _, body = await call(transport, stats, 'api_roadmap_job', 'GET', f"{prefix}/roadmap/jobs/{body['job_id']}/",
+                             token=token)
+    if body.get('status') == 'failed':
+        raise FlowError('api_roadmap_job', 'failed', body)
+
+
+async def run_learners(transport, stats, args):
+    await transport.start()
+    in_flight = asyncio.Semaphore(args.concurrency)
+
+    async def learner(number):
+        await asyncio.sleep(args.ramp_up * number / max(args.learners, 1))
+        async with in_flight:
+            try:
+                await learner_flow(transport, stats, args, number, random.Random(f'{args.seed}:{number}'))
+                stats.flows_completed += 1
+            except FlowError as e:
+                stats.flows_failed[e.step] = stats.flows_failed.get(e.step, 0) + 1
+                if args.verbose:
+                    print(f'learner {number}: {e}', file=sys.stderr)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(learner(number) for number in range(args.learners)))
+    elapsed = time.perf_counter() - started
+    await transport.stop()
+    return elapsed
+
+
+# Reporting
+
+def _latency_summary(seconds):
+    ms = sorted(value * 1000 for value in seconds)
+    if len(ms) > 1:
+        cuts = statistics.quantiles(ms, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ms[0]
+    return {'mean': round(statistics.fmean(ms), 2), 'p50': round(p50, 2), 'p95': round(p95, 2),
+            'p99': round(p99, 2), 'max': round(ms[-1], 2)}
+
+
+def _query_summary(counts):
+    if not counts:
+        return None
+    return {'mean': round(statistics.fmean(counts), 2), 'p50': statistics.median_low(counts),
+            'max': max(counts), 'total': sum(counts)}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def build_report(args, stats, server_stats, elapsed):
+    import django
+    from django.conf import settings
+
+    endpoints = {}
+    for endpoint, latencies in stats.latencies.items():
+        statuses = stats.statuses[endpoint]
+        errors = sum(count for status, count in statuses.items() if not (isinstance(status, int) and status < 400))
+        endpoints[endpoint] = {
+            'requests': len(latencies),
+            'errors': errors,
+            'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+            'rps': round(len(latencies) / elapsed, 2),
+            'latency_ms': _latency_summary(latencies),
+            'queries': _query_summary(server_stats.queries.get(endpoint, [])) if server_stats else None,
+        }
+
+    requests = sum(endpoint['requests'] for endpoint in endpoints.values())
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+    return {
+        'meta': {
+            'target': 'url' if args.url else args.target,
+            'url': args.url,
+            'async_views': args.async_views,
+            'learners': args.learners,
+            'concurrency': args.concurrency,
+            'ramp_up_s': args.ramp_up,
+            'topics': args.topics,
+            'llm': args.llm,
+            'llm_latency_s': args.llm_latency if args.llm == 'local' else None,
+            'llm_failure_rate': args.llm_failure_rate if args.llm == 'local' else None,
+            'commit': _git_commit(),
+            'database': settings.DATABASES['default']['ENGINE'].rsplit('.', 1)[-1],
+            'python': sys.version.split()[0],
+            'django': django.get_version(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        },
+        'totals': {
+            'duration_s': round(elapsed, 3),
+            'requests': requests,
+            'errors': sum(endpoint['errors'] for endpoint in endpoints.values()),
+            'rps': round(requests / elapsed, 2),
+            'flows_completed': stats.flows_completed,
+            'flows_failed': stats.flows_failed,
+            'flows_per_second': round(stats.flows_completed / elapsed, 2),
+            'background_queries': server_stats.background_queries if server_stats else None,
+        },
+        'endpoints': endpoints,
+        # The in-process servers share this process, so this includes the load generator
+        'memory': {'peak_rss_mb': round(peak_rss, 1)},
+    }
+
+
+def print_summary(report, out=sys.stderr):
+    totals = report['totals']
+    print(f"{report['meta']['target']}: {report['meta']['learners']} learners, {totals['flows_completed']} flows completed, "
+          f"{sum(totals['flows_failed'].values())} failed {totals['flows_failed'] or ''}", file=out)
+    print(f"{totals['requests']} requests in {totals['duration_s']}s = {totals['rps']} req/s, "
+          f"peak RSS {report['memory']['peak_rss_mb']} MB", file=out)
+    print(f"{'endpoint':32} {'reqs':>6} {'err':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}", file=out)
+    for name, endpoint in report['endpoints'].items():
+        latency = endpoint['latency_ms']
+        queries = endpoint['queries']['mean'] if endpoint['queries'] else '-'
+        print(f"{name:32} {endpoint['requests']:>6} {endpoint['errors']:>5} {endpoint['rps']:>8} {latency['p50']:>9} "
+              f"{latency['p95']:>9} {latency['p99']:>9} {queries:>8}", file=out)
+
+
+def _change(before, after):
+    if before in (None, 0) or after is None:
+        return '-'
+    return f'{(after - before) / before * 100:+.1f}%'
+
+
+def print_comparison(baseline, report, out=sys.stderr):
+    print(f"\nvs {baseline['meta'].get('commit') or 'baseline'}: req/s {baseline['totals']['rps']} -> {report['totals']['rps']} "
+          f"({_change(baseline['totals']['rps'], report['totals']['rps'])})", file=out)
+    for name, endpoint in report['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if not before:
+            continue
+        queries_before = (before.get('queries') or {}).get('mean')
+        queries_after = (endpoint.get('queries') or {}).get('mean')
+        print(f"  {name:32} p95 {before['latency_ms']['p95']} -> {endpoint['latency_ms']['p95']} ms "
+              f"({_change(before['latency_ms']['p95'], endpoint['latency_ms']['p95'])}), "
+              f"queries {queries_before} -> {queries_after} ({_change(queries_before, queries_after)})", file=out)
+
+
+def raise_open_file_limit():
+    """Each in-flight learner holds a socket on both ends"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the learner flow end to end')
+    parser.add_argument('--target', choices=['client', 'wsgi', 'asgi'], default='wsgi')
+    parser.add_argument('--url', help='benchmark a running server instead, e.g. http://127.0.0.1:8000')
+    parser.add_argument('--settings', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'adaptlearn.settings'))
+    parser.add_argument('--learners', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, help='learners in flight at once (default: all of them)')
+    parser.add_argument('--ramp-up', type=float, default=0, help='seconds over which learners start')
+    parser.add_argument('--topics', default='Python,Rust,Go,SQL,Docker',
+                        type=lambda value: [topic.strip() for topic in value.split(',') if topic.strip()])
+    parser.add_argument('--async-views', action='store_true', help='use the async start and roadmap endpoints')
+    parser.add_argument('--llm', choices=['local', 'configured'], default='local',
+                        help="'local' swaps in the offline provider; 'configured' keeps LLM_PROVIDER")
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='local provider seconds before the first chunk')
+    parser.add_argument('--llm-failure-rate', type=float, default=0.0)
+    parser.add_argument('--fast-passwords', action='store_true',
+                        help='hash passwords with MD5 so PBKDF2 does not dominate register and login')
+    parser.add_argument('--timeout', type=float, default=120, help='per-request timeout over HTTP')
+    parser.add_argument('--roadmap-timeout', type=float, default=120)
+    parser.add_argument('--poll-interval', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the JSON report here (default: stdout)')
+    parser.add_argument('--compare', help='earlier JSON report to compare against')
+    parser.add_argument('-v', '--verbose', action='store_true', help='print every failed flow')
+    args = parser.parse_args()
+    args.concurrency = args.concurrency or args.learners
+    args.run_id = uuid.uuid4().hex[:8]
+
+    os.environ['DJANGO_SETTINGS_MODULE'] = args.settings
+    import django
+    django.setup()
+
+    from django.db.backends.signals import connection_created
+    from django.test.utils import override_settings
+
+    overrides = {}
+    if args.llm == 'local':
+        overrides.update(LLM_PROVIDER='local', LLM_LOCAL_LATENCY_SECONDS=args.llm_latency,
+                         LLM_LOCAL_FAILURE_RATE=args.llm_failure_rate, LLM_LOCAL_SEED=args.seed)
+    if args.fast_passwords:
+        overrides['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    override_settings(**overrides).enable()
+
+    raise_open_file_limit()
+    stats = ClientStats()
+    server_stats = None if args.url else ServerStats()
+    stop = None
+
+    if args.url:
+        transport = HTTPTransport(args.url, args.timeout)
+    else:
+        connection_created.connect(server_stats.install)
+        if args.target == 'client':
+            transport = TestClientTransport(server_stats, args.concurrency)
+        else:
+            base_url, stop = (start_wsgi_server if args.target == 'wsgi' else start_asgi_server)(server_stats)
+            transport = HTTPTransport(base_url, args.timeout)
+
+    try:
+        elapsed = asyncio.run(run_learners(transport, stats, args))
+    finally:
+        if stop:
+            stop()
+
+    report = build_report(args, stats, server_stats, elapsed)
+    print_summary(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), report)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Computerized adaptive testing over the question bank.
+
+Items follow a two-parameter logistic (2PL) model:
+    P(correct | theta) = 1 / (1 + exp(-a * (theta - b)))
+Each step re-estimates ability (EAP on a fixed grid with a standard normal
+prior) and serves the unseen item with the most Fisher information at that
+estimate. The test stops once the standard error is small enough.
+"""
+from django.conf import settings
+from .models import QuestionBank
+from .question_bank import normalize_course_name
+from .metrics import count_cache
+import numpy as np
+import random
+import threading
+import time
+
+# Item parameters used until calibrate_questions has estimated real ones
+DEFAULT_DIFFICULTY = {'beginner': -1.0, 'intermediate': 0.0, 'advanced': 1.0}
+DEFAULT_DISCRIMINATION = 1.0
+
+THETA_GRID = np.linspace(-4.0, 4.0, 81)
+LOG_PRIOR = -0.5 * THETA_GRID ** 2
+
+# Pick at random among the top few items so one question isn't shown to everyone
+TOP_K = 3
+
+_lock = threading.Lock()
+_pools = {}  # course_key -> (expires_at, ItemPool)
+
+
+def min_questions():
+    return getattr(settings, 'ADAPTIVE_MIN_QUESTIONS', 5)
+
+
+def max_questions():
+    return getattr(settings, 'ADAPTIVE_MAX_QUESTIONS', 15)
+
+
+def target_standard_error():
+    return getattr(settings, 'ADAPTIVE_TARGET_SE', 0.62)
+
+
+class ItemPool:
+    """Bank items of one course as parallel arrays, for vectorized selection"""
+
+    def __init__(self, ids, discrimination, difficulty):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.a = np.asarray(discrimination, dtype=np.float64)
+        self.b = np.asarray(difficulty, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def load(cls, course_key):
+        rows = QuestionBank.objects.filter(course_key=course_key, source='generated').values_list(
+            'id', 'irt_discrimination', 'irt_difficulty', 'difficulty'
+        )
+        ids, a, b = [], [], []
+        for bank_id, discrimination, difficulty, level in rows:
+            ids.append(bank_id)
+            a.append(discrimination if discrimination is not None else DEFAULT_DISCRIMINATION)
+            b.append(difficulty if difficulty is not None else DEFAULT_DIFFICULTY.get(level, 0.0))
+        return cls(ids, a, b)
+
+    def information(self, theta):
+        p = 1.0 / (1.0 + np.exp(-self.a * (theta - self.b)))
+        return self.a ** 2 * p * (1.0 - p)
+
+    def select(self, theta, exclude_ids=(), rng=None):
+        """(bank_id, a, b) of a most informative unseen item, or None when exhausted"""
+        info = self.information(theta)
+        if len(exclude_ids):
+            info[np.isin(self.ids, exclude_ids)] = -np.inf
+
+        available = np.count_nonzero(np.isfinite(info))
+        if not available:
+            return None
+
+        k = min(TOP_K, available)
+        top = np.argpartition(info, -k)[-k:]
+        index = (rng or random).choice(list(top))
+        return int(self.ids[index]), float(self.a[index]), float(self.b[index])
+
+
+def get_item_pool(course_name):
+    """Item pool for a course, rebuilt at most every ADAPTIVE_POOL_TTL seconds"""
+    course_key = normalize_course_name(course_name)
+    now = time.monotonic()
+
+    entry = _pools.get(course_key)
+    hit = entry is not None and entry[0] >= now
+    count_cache('item_pool', hit=hit)
+    if not hit:
+        pool = ItemPool.load(course_key)
+        with _lock:
+            _pools[course_key] = (now + getattr(settings, 'ADAPTIVE_POOL_TTL', 60), pool)
+        return pool
+    return entry[1]
+
+
+def invalidate_item_pool(course_name):
+    with _lock:
+        _pools.pop(normalize_course_name(course_name), None)
+
+
+def estimate_ability(a, b, responses):
+    """EAP ability estimate and its standard error from (a, b, 0/1) triples"""
+    a = np.asarray(a, dtype=np.float64)[:, None]
+    b = np.asarray(b, dtype=np.float64)[:, None]
+    u = np.asarray(responses, dtype=np.float64)[:, None]
+
+    log_posterior = LOG_PRIOR.copy()
+    if len(u):
+        p = 1.0 / (1.0 + np.exp(-a * (THETA_GRID - b)))
+        p = np.clip(p, 1e-9, 1 - 1e-9)
+        log_posterior += (u * np.log(p) + (1 - u) * np.log(1 - p)).sum(axis=0)
+
+    weights = np.exp(log_posterior - log_posterior.max())
+    weights /= weights.sum()
+    theta = float((weights * THETA_GRID).sum())
+    se = float(np.sqrt((weights * (THETA_GRID - theta) ** 2).sum()))
+    return theta, se
+
+
+def new_state():
+    """Adaptive state kept in Assessment.quiz_data['adaptive']"""
+    theta, se = estimate_ability([], [], [])
+    return {'items': [], 'responses': [], 'theta': theta, 'se': se}
+
+
+def record_response(state, correct):
+    """Score the pending item and update the ability estimate in place"""
+    state['responses'].append(1 if correct else 0)
+    answered = state['items'][:len(state['responses'])]
+    state['theta'], state['se'] = estimate_ability(
+        [a for _, a, _ in answered], [b for _, _, b in answered], state['responses']
+    )
+    return state
+
+
+def should_stop(state):
+    answered = len(state['responses'])
+    if answered >= max_questions():
+        return True
+    return answered >= min_questions() and state['se'] <= target_standard_error()
+
+
+def next_item(state, pool, rng=None):
+    """Pick and record the next item; returns its bank id, or None when the pool is exhausted"""
+    item = pool.select(state['theta'], [bank_id for bank_id, _, _ in state['items']], rng=rng)
+    if item is None:
+        return None
+    state['items'].append(list(item))
+    return item[0]
+
+
+def skill_level_for(theta):
+    """Map the ability estimate onto the SkillProfile levels"""
+    if theta < -1.0:
+        return 'absolute_beginner'
+    if theta < 0.0:
+        return 'beginner'
+    if theta < 1.0:
+        return 'intermediate'
+    return 'advanced'
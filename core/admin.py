@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import LearnerProfile, Course, Assessment, SkillProfile
+from .models import (LearnerProfile, Course, Assessment, AssessmentQuestion, SkillProfile, QuestionBank,
+                     CalibrationRun, PregeneratedQuiz, Roadmap, RoadmapJob)
 
 @admin.register(LearnerProfile)
 class LearnerProfileAdmin(admin.ModelAdmin):
@@ -11,13 +12,54 @@ class CourseAdmin(admin.ModelAdmin):
     list_display = ['title', 'difficulty_range', 'course_id']
     search_fields = ['title']
 
+class AssessmentQuestionInline(admin.TabularInline):
+    model = AssessmentQuestion
+    raw_id_fields = ['question']
+    extra = 0
+
 @admin.register(Assessment)
 class AssessmentAdmin(admin.ModelAdmin):
     list_display = ['user', 'course', 'status', 'started_at']
+    list_select_related = ['user', 'course']
     search_fields = ['user__username']
     readonly_fields = ['quiz_data', 'user_answers', 'evaluation_results']
+    inlines = [AssessmentQuestionInline]
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            # The list never shows the JSON columns
+            queryset = queryset.defer('quiz_data', 'user_answers', 'evaluation_results')
+        return queryset
 
 @admin.register(SkillProfile)
 class SkillProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'skill_level']
     search_fields = ['user__username']
+
+@admin.register(QuestionBank)
+class QuestionBankAdmin(admin.ModelAdmin):
+    list_display = ['course_name', 'difficulty', 'topic', 'source', 'irt_difficulty', 'irt_discrimination', 'created_at']
+    list_filter = ['difficulty', 'source']
+    search_fields = ['course_key', 'question_text']
+
+@admin.register(CalibrationRun)
+class CalibrationRunAdmin(admin.ModelAdmin):
+    list_display = ['id', 'full', 'watermark', 'assessments', 'responses', 'calibrated_questions', 'finished_at']
+
+@admin.register(PregeneratedQuiz)
+class PregeneratedQuizAdmin(admin.ModelAdmin):
+    list_display = ['course_name', 'created_at']
+    search_fields = ['course_key']
+    exclude = ['quiz_data']
+
+@admin.register(Roadmap)
+class RoadmapAdmin(admin.ModelAdmin):
+    list_display = ['assessment', 'created_at', 'updated_at']
+    readonly_fields = ['roadmap_data']
+
+@admin.register(RoadmapJob)
+class RoadmapJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user', 'assessment', 'status', 'created_at', 'finished_at']
+    list_filter = ['status']
+    raw_id_fields = ['roadmap']
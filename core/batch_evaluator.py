@@ -0,0 +1,172 @@
+"""
+Vectorized scoring for many assessments at once.
+
+Answer keys and responses are packed into learner x question matrices of
+integer codes, so correctness and per-difficulty/per-topic counts come from a
+handful of NumPy reductions. Output matches evaluator.score_quiz exactly.
+"""
+import numpy as np
+from .evaluator import build_learner_profile
+
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+DIFFICULTY_CODES = {name: code for code, name in enumerate(DIFFICULTIES)}
+
+
+class _Vocabulary:
+    """Maps arbitrary JSON values to integer codes, preserving == semantics"""
+
+    def __init__(self):
+        self.codes = {}
+
+    def code(self, value):
+        try:
+            return self.codes.setdefault(value, len(self.codes))
+        except TypeError:
+            # Lists/dicts from malformed payloads
+            return self.codes.setdefault(('__unhashable__', repr(value)), len(self.codes))
+
+
+def pack(quizzes, answers):
+    """
+    Pack question lists and answer dicts into code matrices.
+    Unknown difficulties raise KeyError, like the per-assessment evaluator.
+    """
+    learners = len(quizzes)
+    width = max((len(questions) for questions in quizzes), default=0)
+
+    mask = np.zeros((learners, width), dtype=bool)
+    key = np.full((learners, width), -1, dtype=np.int32)
+    response = np.full((learners, width), -2, dtype=np.int32)
+    difficulty = np.zeros((learners, width), dtype=np.int8)
+    topic = np.zeros((learners, width), dtype=np.int32)
+
+    answer_vocab = _Vocabulary()
+    topic_vocab = _Vocabulary()
+    topic_names = []
+    topic_order = []
+
+    for row, (questions, user_answers) in enumerate(zip(quizzes, answers)):
+        seen = []
+        for col, question in enumerate(questions):
+            mask[row, col] = True
+            difficulty[row, col] = DIFFICULTY_CODES[question['difficulty']]
+            key[row, col] = answer_vocab.code(question['correct_answer'])
+            response[row, col] = answer_vocab.code(user_answers.get(question['question_id'], {}).get('answer'))
+
+            name = question['topic']
+            code = topic_vocab.code(name)
+            if code == len(topic_names):
+                topic_names.append(name)
+            topic[row, col] = code
+            if code not in seen:
+                seen.append(code)
+        topic_order.append(seen)
+
+    return {
+        'mask': mask,
+        'key': key,
+        'response': response,
+        'difficulty': difficulty,
+        'topic': topic,
+        'topic_names': topic_names,
+        'topic_order': topic_order,
+    }
+
+
+def score_batch(quizzes, answers, times):
+    """
+    Score many assessments at once.
+    quizzes: list of question lists, answers: list of user_answers dicts,
+    times: list of time_taken values. Returns one result dict per learner.
+    """
+    packed = pack(quizzes, answers)
+    mask = packed['mask']
+    learners, width = mask.shape
+
+    correct = (packed['key'] == packed['response']) & mask
+    total_questions = mask.sum(axis=1)
+    total_correct = correct.sum(axis=1)
+
+    # Per-difficulty totals via one bincount over (learner, difficulty) cells
+    rows = np.broadcast_to(np.arange(learners)[:, None], (learners, width))
+    cell = (rows * len(DIFFICULTIES) + packed['difficulty'])[mask]
+    size = learners * len(DIFFICULTIES)
+    difficulty_total = np.bincount(cell, minlength=size).reshape(learners, -1)
+    difficulty_correct = np.bincount(cell, weights=correct[mask], minlength=size).reshape(learners, -1)
+
+    # Per-topic totals over the sparse set of (learner, topic) pairs
+    topic_count = len(packed['topic_names'])
+    pairs = (rows.astype(np.int64) * max(topic_count, 1) + packed['topic'])[mask]
+    unique_pairs, inverse, pair_total = np.unique(pairs, return_inverse=True, return_counts=True)
+    pair_correct = np.bincount(inverse, weights=correct[mask], minlength=len(unique_pairs))
+    pair_index = {int(pair): i for i, pair in enumerate(unique_pairs)}
+
+    results = []
+    for row in range(learners):
+        questions = quizzes[row]
+        total = int(total_questions[row])
+        right = int(total_correct[row])
+        time_taken = times[row]
+
+        evaluation_results = {
+            'overall_score': 0,
+            'total_correct': right,
+            'total_questions': len(questions),
+            'score_by_difficulty': {
+                name: {
+                    'correct': int(difficulty_correct[row, code]),
+                    'total': int(difficulty_total[row, code])
+                }
+                for code, name in enumerate(DIFFICULTIES)
+            },
+            'topic_performance': {},
+            'incorrect_questions': [],
+            'time_analysis': {
+                'total_seconds': time_taken,
+                'avg_per_question': time_taken / len(questions) if len(questions) > 0 else 0,
+                'pace': 'normal'
+            }
+        }
+
+        for code in packed['topic_order'][row]:
+            i = pair_index[row * max(topic_count, 1) + code]
+            topic_total = int(pair_total[i])
+            topic_correct = int(pair_correct[i])
+            evaluation_results['topic_performance'][packed['topic_names'][code]] = {
+                'correct': topic_correct,
+                'total': topic_total,
+                'proficiency_percent': (topic_correct / topic_total) * 100 if topic_total > 0 else 0
+            }
+
+        user_answers = answers[row]
+        for col in np.flatnonzero(mask[row] & ~correct[row]):
+            question = questions[col]
+            evaluation_results['incorrect_questions'].append({
+                'question_id': question['question_id'],
+                'question_number': question['question_number'],
+                'topic': question['topic'],
+                'difficulty': question['difficulty'],
+                'user_answer': user_answers.get(question['question_id'], {}).get('answer'),
+                'correct_answer': question['correct_answer'],
+                'explanation': question.get('explanation', '')
+            })
+
+        evaluation_results['overall_score'] = (right / total) * 100 if total > 0 else 0
+
+        avg_time = evaluation_results['time_analysis']['avg_per_question']
+        if avg_time < 40:
+            evaluation_results['time_analysis']['pace'] = 'fast'
+        elif avg_time > 90:
+            evaluation_results['time_analysis']['pace'] = 'slow'
+
+        results.append(evaluation_results)
+
+    return results
+
+
+def evaluate_batch(quizzes, answers, times, weekly_hours):
+    """score_batch plus the learner profile, matching evaluator.evaluate_quiz"""
+    results = score_batch(quizzes, answers, times)
+    for evaluation_results, hours in zip(results, weekly_hours):
+        evaluation_results['learner_profile'] = build_learner_profile(evaluation_results, hours)
+    return results
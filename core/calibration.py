@@ -0,0 +1,90 @@
+"""
+Item calibration from response data.
+
+Responses are reduced to additive per-question sums, so chunks and
+incremental runs simply add up. Parameters come from the classical item
+statistics (proportion correct and the biserial correlation with the
+learner's rest score), converted to 2PL discrimination and difficulty
+(Lord, 1980). The rest score stands in for ability, so this is meant for
+fixed-form quizzes, not adaptive ones.
+"""
+from statistics import NormalDist
+import numpy as np
+
+STAT_FIELDS = ['responses', 'sum_correct', 'sum_rest', 'sum_rest_sq', 'sum_correct_rest']
+
+# Normal-ogive to logistic scale
+LOGISTIC_SCALE = 1.702
+
+# Empirical difficulty bands for relabeling questions
+LABEL_BANDS = [(-0.5, 'beginner'), (0.5, 'intermediate')]
+
+
+def chunk_statistics(assessment_index, item_ids, correct):
+    """
+    Per-question sums for one chunk of responses.
+
+    assessment_index: which assessment (0..n-1) each response belongs to
+    item_ids: bank question id of each response
+    correct: 1/0 per response
+    Returns (unique item ids, array of shape (items, 5) in STAT_FIELDS order).
+    """
+    assessment_index = np.asarray(assessment_index, dtype=np.int64)
+    item_ids = np.asarray(item_ids, dtype=np.int64)
+    correct = np.asarray(correct, dtype=np.float64)
+
+    totals = np.bincount(assessment_index, weights=correct)
+    counts = np.bincount(assessment_index)
+    others = counts[assessment_index] - 1
+
+    # A single-question assessment has no rest score
+    valid = others > 0
+    rest = (totals[assessment_index] - correct)[valid] / others[valid]
+    correct = correct[valid]
+
+    items, inverse = np.unique(item_ids[valid], return_inverse=True)
+    size = len(items)
+    sums = np.column_stack([
+        np.bincount(inverse, minlength=size).astype(np.float64),
+        np.bincount(inverse, weights=correct, minlength=size),
+        np.bincount(inverse, weights=rest, minlength=size),
+        np.bincount(inverse, weights=rest * rest, minlength=size),
+        np.bincount(inverse, weights=correct * rest, minlength=size),
+    ]) if size else np.zeros((0, len(STAT_FIELDS)))
+    return items, sums
+
+
+def fit_parameters(sums, min_responses=30):
+    """
+    2PL (discrimination, difficulty) per row of sums.
+    Rows with too few responses or no rest-score spread get NaN.
+    """
+    sums = np.asarray(sums, dtype=np.float64).reshape(-1, len(STAT_FIELDS))
+    n, s_u, s_x, s_xx, s_ux = sums.T
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = np.clip(s_u / n, 0.02, 0.98)
+        q = 1.0 - p
+        mean_x = s_x / n
+        var_x = s_xx / n - mean_x ** 2
+        cov = s_ux / n - (s_u / n) * mean_x
+        point_biserial = cov / np.sqrt(p * q * var_x)
+
+        z = np.array([NormalDist().inv_cdf(value) for value in p])
+        ordinate = np.exp(-0.5 * z ** 2) / np.sqrt(2 * np.pi)
+        biserial = np.clip(point_biserial * np.sqrt(p * q) / ordinate, 0.05, 0.95)
+
+        discrimination = LOGISTIC_SCALE * biserial / np.sqrt(1.0 - biserial ** 2)
+        difficulty = np.clip(-z / biserial, -4.0, 4.0)
+
+    unusable = (n < min_responses) | ~(var_x > 1e-9) | ~np.isfinite(point_biserial)
+    discrimination[unusable] = np.nan
+    difficulty[unusable] = np.nan
+    return discrimination, difficulty
+
+
+def difficulty_label(difficulty):
+    for upper, label in LABEL_BANDS:
+        if difficulty < upper:
+            return label
+    return 'advanced'
@@ -0,0 +1,124 @@
+from collections import deque
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker.
+
+    closed    - calls go through, outcomes are tracked over a sliding window
+    open      - calls are rejected immediately until reset_timeout has passed
+    half_open - a limited number of probe calls decide whether to close or re-open
+
+    State is per process; every worker trips independently.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_rate_threshold=0.5, minimum_calls=5, window_size=20,
+                 reset_timeout=30, half_open_max_calls=1, clock=time.monotonic):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = None
+        self._probes_in_flight = 0
+        self.trip_count = 0
+        self.rejected_count = 0
+        self.last_failure = None
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self):
+        if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes_in_flight = 0
+            logger.info(f"Circuit '{self.name}' half-open, probing")
+
+    def _trip(self):
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._probes_in_flight = 0
+        self.trip_count += 1
+        logger.warning(f"Circuit '{self.name}' opened (trip #{self.trip_count}, failure rate {self._failure_rate():.0%})")
+
+    def _failure_rate(self):
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def allow_request(self):
+        """Return True if a call may go ahead. Callers must report the outcome."""
+        with self._lock:
+            self._maybe_half_open()
+
+            if self._state == self.CLOSED:
+                return True
+
+            if self._state == self.HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+
+            self.rejected_count += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                logger.info(f"Circuit '{self.name}' closed after successful probe")
+                self._state = self.CLOSED
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def release(self):
+        """Report a call that ended without a verdict (the caller stopped waiting), freeing its probe slot"""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes_in_flight:
+                self._probes_in_flight -= 1
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.last_failure = str(error)[:200] if error else None
+
+            if self._state == self.HALF_OPEN:
+                self._trip()
+                return
+
+            self._outcomes.append(False)
+            if (self._state == self.CLOSED
+                    and len(self._outcomes) >= self.minimum_calls
+                    and self._failure_rate() >= self.failure_rate_threshold):
+                self._trip()
+
+    def snapshot(self):
+        """Current state and counters, for monitoring"""
+        with self._lock:
+            self._maybe_half_open()
+            return {
+                'name': self.name,
+                'state': self._state,
+                'failure_rate': round(self._failure_rate(), 3),
+                'window_calls': len(self._outcomes),
+                'trip_count': self.trip_count,
+                'rejected_count': self.rejected_count,
+                'seconds_until_probe': (
+                    max(0.0, round(self.reset_timeout - (self._clock() - self._opened_at), 1))
+                    if self._state == self.OPEN else None
+                ),
+                'last_failure': self.last_failure,
+            }
@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.db.models import Count, Max
+from rest_framework.renderers import JSONRenderer
+from .models import Course
+from .metrics import count_cache
+import hashlib
+import threading
+import time
+
+_lock = threading.Lock()
+_catalog = {}  # (version, detail) -> (built at, etag, body)
+_version = None  # (checked at, version)
+
+
+def recheck_seconds():
+    return getattr(settings, 'COURSE_CATALOG_RECHECK_SECONDS', 5)
+
+
+def max_age():
+    return getattr(settings, 'COURSE_CATALOG_MAX_AGE', 300)
+
+
+def catalog_version():
+    """
+    Course count and latest updated_at, read from the database so every
+    process sees changes made anywhere (seed_courses, admin edits on another
+    worker). Re-read at most every COURSE_CATALOG_RECHECK_SECONDS.
+    """
+    global _version
+    now = time.monotonic()
+    checked = _version
+    if checked is None or checked[0] + recheck_seconds() < now:
+        stats = Course.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+        checked = _version = (now, (stats['count'], stats['updated']))
+    return checked[1]
+
+
+def invalidate_catalog():
+    """Re-read the version on the next request; called by the Course signals (core/signals.py)"""
+    global _version
+    _version = None
+
+
+def _render(detail):
+    from .serializers import CourseSerializer, CourseListSerializer
+
+    courses = Course.objects.filter(is_available=True)
+    if detail:
+        data = CourseSerializer(courses, many=True).data
+    else:
+        data = CourseListSerializer(courses.only(*CourseListSerializer.Meta.fields), many=True).data
+
+    body = JSONRenderer().render(data)
+    etag = '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+    return etag, body
+
+
+def get_catalog(detail=False):
+    """
+    Serialized catalog of available courses as (etag, JSON bytes).
+    Built once per catalog version and process, and rebuilt after
+    COURSE_CATALOG_MAX_AGE seconds in case a change bypassed updated_at.
+    The ETag hashes the body, so a rebuild with no change keeps it.
+    """
+    version = catalog_version()
+    key = (version, detail)
+    now = time.monotonic()
+
+    entry = _catalog.get(key)
+    hit = entry is not None and entry[0] + max_age() >= now
+    count_cache('course_catalog', hit=hit)
+    if not hit:
+        # Read the version before querying: a change during the query leaves this
+        # entry under the old version, where it is never served again
+        entry = (now, *_render(detail))
+        with _lock:
+            for stale in [k for k in _catalog if k[0] != version]:
+                del _catalog[stale]
+            _catalog[key] = entry
+    return entry[1:]
@@ -1,4 +1,8 @@
+from django.conf import settings
+from .metrics import EVALUATION_SECONDS
+from .request_metrics import track
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -7,8 +11,42 @@ def evaluate_assessment(assessment, user_answers, time_taken):
     Comprehensive evaluation with scoring + analysis
     """
     
-    quiz_data = assessment.quiz_data
-    questions = quiz_data['questions']
+    from .question_bank import assessment_questions
+    
+    started = time.perf_counter()
+    with track('evaluator'):
+        evaluation_results = score_quiz(
+            assessment_questions(assessment), user_answers, time_taken,
+            vectorized=getattr(settings, 'VECTORIZED_EVALUATION', False)
+        )
+        
+        # Generate learner profile with analysis (without LLM)
+        learner_profile = generate_learner_profile_analysis(evaluation_results, assessment)
+        evaluation_results['learner_profile'] = learner_profile
+    
+    EVALUATION_SECONDS.observe(time.perf_counter() - started)
+    return evaluation_results
+
+
+def evaluate_quiz(quiz_data, user_answers, time_taken, weekly_hours):
+    """
+    Same as evaluate_assessment but on plain data, so it can run in
+    worker processes without database access
+    """
+    evaluation_results = score_quiz(quiz_data['questions'], user_answers, time_taken)
+    evaluation_results['learner_profile'] = build_learner_profile(evaluation_results, weekly_hours)
+    return evaluation_results
+
+
+def score_quiz(questions, user_answers, time_taken, vectorized=False):
+    """
+    Score answers against the quiz (no learner profile).
+    vectorized=True runs the NumPy batch scorer on a batch of one.
+    """
+    
+    if vectorized:
+        from .batch_evaluator import score_batch
+        return score_batch([questions], [user_answers], [time_taken])[0]
     
     # Automatic scoring
     evaluation_results = {
@@ -86,20 +124,36 @@ def evaluate_assessment(assessment, user_answers, time_taken):
     elif avg_time > 90:
         evaluation_results['time_analysis']['pace'] = 'slow'
     
-    # Generate learner profile with analysis (without LLM)
-    learner_profile = generate_learner_profile_analysis(evaluation_results, assessment)
-    evaluation_results['learner_profile'] = learner_profile
-    
     return evaluation_results
 
 
+def skill_profile_fields(evaluation_results):
+    """SkillProfile column values for an evaluation"""
+    
+    learner_profile = evaluation_results['learner_profile']
+    return {
+        'skill_level': learner_profile['skill_level'],
+        'confidence_score': learner_profile['confidence_score'],
+        'learning_pace': learner_profile['learning_pace'],
+        'strengths': learner_profile['strengths'],
+        'weaknesses': learner_profile['weaknesses'],
+        'estimated_weeks': learner_profile['estimated_weeks_to_proficiency'],
+        'raw_results': evaluation_results,
+    }
+
+
 def generate_learner_profile_analysis(eval_results, assessment):
     """
     Generate learner profile by analyzing results
     (No LLM call - pure Python analysis)
     """
     
-    user = assessment.user
+    return build_learner_profile(eval_results, assessment.user.profile.weekly_hours)
+
+
+def build_learner_profile(eval_results, weekly_hours):
+    """Learner profile from scored results and the learner's weekly hours"""
+    
     overall_score = eval_results['overall_score']
     topic_perf = eval_results['topic_performance']
     difficulty_scores = eval_results['score_by_difficulty']
@@ -175,12 +229,12 @@ def generate_learner_profile_analysis(eval_results, assessment):
     else:
         estimated_weeks = 8
     
-    # Adjust based on user's weekly hours
-    weekly_hours = assessment.user.profile.weekly_hours
-    if weekly_hours <= 3:
-        estimated_weeks = int(estimated_weeks * 1.5)
-    elif weekly_hours >= 10:
-        estimated_weeks = int(estimated_weeks * 0.7)
+    # Adjust based on user's weekly hours (unknown for learners without a profile)
+    if weekly_hours is not None:
+        if weekly_hours <= 3:
+            estimated_weeks = int(estimated_weeks * 1.5)
+        elif weekly_hours >= 10:
+            estimated_weeks = int(estimated_weeks * 0.7)
     
     # Generate next steps
     next_steps = generate_next_steps(skill_level, weaknesses, strengths)
@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from .models import RoadmapJob
+from .roadmap_store import roadmap_fingerprint, get_stored_roadmap, save_roadmap
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_executor = None
+_queued = set()  # Job ids handed to this process's pool and not yet finished
+
+
+def _get_executor():
+    """Roadmap worker pool, sized separately from the web server's workers"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ROADMAP_JOB_WORKERS', 4),
+                thread_name_prefix='roadmap-job'
+            )
+        return _executor
+
+
+def enqueue_roadmap_job(job_id):
+    """Hand a pending job to the in-process worker pool"""
+    with _lock:
+        _queued.add(job_id)
+    _get_executor().submit(run_roadmap_job, job_id)
+
+
+def run_roadmap_job(job_id):
+    """Generate the roadmap for one job and store the result on it"""
+    from .roadmap_generator import generate_learning_roadmap, get_roadmap_inputs
+    
+    close_old_connections()
+    try:
+        # Claim the job; a duplicate enqueue finds it no longer pending
+        claimed = RoadmapJob.objects.filter(id=job_id, status='pending').update(
+            status='running', started_at=timezone.now()
+        )
+        if not claimed:
+            return
+        
+        job = RoadmapJob.objects.select_related('assessment__course', 'user__profile').defer(
+            'assessment__quiz_data', 'assessment__user_answers'
+        ).get(id=job_id)
+        
+        try:
+            roadmap_inputs = get_roadmap_inputs(job.assessment, job.user)
+            fingerprint = roadmap_fingerprint(**roadmap_inputs)
+            
+            # Another job may have produced the same roadmap while this one waited
+            if not job.regenerate:
+                job.roadmap = get_stored_roadmap(job.assessment, fingerprint)
+            
+            if job.roadmap is None:
+                roadmap_data = generate_learning_roadmap(**roadmap_inputs)
+                if roadmap_data:
+                    job.roadmap = save_roadmap(job.assessment, fingerprint, roadmap_data)
+            
+            job.status = 'completed' if job.roadmap else 'failed'
+            job.error = '' if job.roadmap else 'Failed to generate roadmap'
+            logger.info(f"Roadmap job {job_id} finished for user {job.user_id} - Topic: {roadmap_inputs['topic']}")
+        except Exception as e:
+            logger.error(f"Roadmap job {job_id} failed: {str(e)}")
+            job.status = 'failed'
+            job.error = str(e)[:255]
+        
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'roadmap', 'error', 'finished_at'])
+    finally:
+        with _lock:
+            _queued.discard(job_id)
+        close_old_connections()
+
+
+def requeue_if_stale(job):
+    """
+    Re-enqueue a job whose worker went away (e.g. the process restarted).
+    Returns True if the job was handed to the pool again.
+    """
+    stale_after = timedelta(seconds=getattr(settings, 'ROADMAP_JOB_STALE_SECONDS', 120))
+    cutoff = timezone.now() - stale_after
+    
+    with _lock:
+        if job.id in _queued:
+            return False
+    
+    if job.status == 'pending' and job.created_at < cutoff:
+        enqueue_roadmap_job(job.id)
+        return True
+    
+    if job.status == 'running' and job.started_at and job.started_at < cutoff:
+        reset = RoadmapJob.objects.filter(id=job.id, status='running', started_at=job.started_at).update(
+            status='pending', started_at=None
+        )
+        if reset:
+            enqueue_roadmap_job(job.id)
+            return True
+    
+    return False
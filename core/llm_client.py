@@ -0,0 +1,237 @@
+from django.conf import settings
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from .circuit_breaker import CircuitBreaker
+from . import metrics, request_metrics
+from .llm_providers import get_provider, provider_name
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """Raised when an LLM call fails or exceeds its timeout"""
+
+
+class CircuitOpenError(LLMError):
+    """Raised without calling the LLM while the circuit breaker is open"""
+
+
+class StreamComplete(Exception):
+    """
+    Thrown into a stream_text/astream_text generator by a consumer that already
+    has the whole answer (e.g. its JSON closed before the trailing prose).
+    Ends the call as a success; a plain close() leaves the breaker untouched.
+    """
+
+
+_lock = threading.Lock()
+_executor = None
+_breaker = None
+
+# Concurrency limiters are bound to the event loop that created them
+_loop_semaphores = weakref.WeakKeyDictionary()
+
+
+def default_timeout():
+    return getattr(settings, 'LLM_TIMEOUT_SECONDS', 30)
+
+
+def max_concurrency():
+    return getattr(settings, 'LLM_MAX_CONCURRENCY', 64)
+
+
+def get_breaker():
+    """Circuit breaker guarding every LLM call in this process"""
+    global _breaker
+    with _lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(
+                provider_name(),
+                failure_rate_threshold=getattr(settings, 'LLM_BREAKER_FAILURE_RATE', 0.5),
+                minimum_calls=getattr(settings, 'LLM_BREAKER_MINIMUM_CALLS', 5),
+                window_size=getattr(settings, 'LLM_BREAKER_WINDOW', 20),
+                reset_timeout=getattr(settings, 'LLM_BREAKER_RESET_SECONDS', 30),
+            )
+        return _breaker
+
+
+def _check_breaker():
+    breaker = get_breaker()
+    if not breaker.allow_request():
+        metrics.LLM_REQUESTS.labels(provider=breaker.name, outcome='rejected').inc()
+        metrics.LLM_CIRCUIT_OPEN.labels(provider=breaker.name).set(1)
+        raise CircuitOpenError(f"LLM circuit '{breaker.name}' is open, skipping call")
+    return breaker
+
+
+def _observe(breaker, outcome, seconds):
+    """Record a finished call (outcome is 'success', 'error', 'timeout' or 'cancelled')"""
+    request_metrics.record('llm', seconds)
+    metrics.LLM_REQUESTS.labels(provider=breaker.name, outcome=outcome).inc()
+    metrics.LLM_SECONDS.labels(provider=breaker.name).observe(seconds)
+    metrics.LLM_CIRCUIT_OPEN.labels(provider=breaker.name).set(breaker.state == breaker.OPEN)
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_concurrency(), thread_name_prefix='llm')
+        return _executor
+
+
+def _get_semaphore():
+    """Concurrency limiter for the running event loop"""
+    loop = asyncio.get_running_loop()
+    semaphore = _loop_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max_concurrency())
+        _loop_semaphores[loop] = semaphore
+    return semaphore
+
+
+def generate_text(prompt, timeout=None):
+    """
+    Blocking LLM call with a deadline. Returns the response text.
+    Raises CircuitOpenError straight away while the breaker is open.
+    """
+    timeout = timeout or default_timeout()
+    breaker = _check_breaker()
+
+    started, outcome = time.perf_counter(), 'error'
+    try:
+        future = _get_executor().submit(get_provider().generate, prompt)
+        text = future.result(timeout=timeout)
+        outcome = 'success'
+    except FutureTimeoutError:
+        future.cancel()
+        outcome = 'timeout'
+        breaker.record_failure('timeout')
+        raise LLMError(f"LLM call timed out after {timeout}s")
+    except Exception as e:
+        breaker.record_failure(e)
+        raise LLMError(str(e)) from e
+    finally:
+        _observe(breaker, outcome, time.perf_counter() - started)
+
+    breaker.record_success()
+    return text
+
+
+async def agenerate_text(prompt, timeout=None):
+    """Non-blocking LLM call with a deadline and a per-loop concurrency limit"""
+    timeout = timeout or default_timeout()
+
+    async with _get_semaphore():
+        breaker = _check_breaker()
+
+        started, outcome = time.perf_counter(), 'error'
+        try:
+            text = await asyncio.wait_for(get_provider().agenerate(prompt), timeout=timeout)
+            outcome = 'success'
+        except asyncio.TimeoutError:
+            outcome = 'timeout'
+            breaker.record_failure('timeout')
+            raise LLMError(f"LLM call timed out after {timeout}s")
+        except Exception as e:
+            breaker.record_failure(e)
+            raise LLMError(str(e)) from e
+        finally:
+            _observe(breaker, outcome, time.perf_counter() - started)
+
+    breaker.record_success()
+    return text
+
+
+def stream_text(prompt, timeout=None):
+    """
+    Streaming LLM call: yields text chunks as the model produces them.
+    The deadline covers the whole stream. Throwing StreamComplete into the
+    generator ends the call early as a success. Closing it (e.g. the client
+    went away) ends the call without telling the breaker anything about the
+    model's health.
+    """
+    timeout = timeout or default_timeout()
+    breaker = _check_breaker()
+    deadline = time.monotonic() + timeout
+    executor = _get_executor()
+    end = object()
+    waited = 0.0  # time spent waiting on the model, not on the consumer
+    outcome = 'error'
+
+    try:
+        chunks = get_provider().stream(prompt)
+        while True:
+            started = time.perf_counter()
+            future = executor.submit(next, chunks, end)
+            try:
+                text = future.result(timeout=max(deadline - time.monotonic(), 0))
+            finally:
+                waited += time.perf_counter() - started
+            if text is end:
+                break
+            yield text
+        outcome = 'success'
+    except StreamComplete:
+        outcome = 'success'
+    except FutureTimeoutError:
+        future.cancel()
+        outcome = 'timeout'
+        breaker.record_failure('timeout')
+        raise LLMError(f"LLM stream timed out after {timeout}s")
+    except GeneratorExit:
+        outcome = 'cancelled'
+        breaker.release()
+        raise
+    except Exception as e:
+        breaker.record_failure(e)
+        raise LLMError(str(e)) from e
+    finally:
+        _observe(breaker, outcome, waited)
+
+    breaker.record_success()
+
+
+async def astream_text(prompt, timeout=None):
+    """Async version of stream_text, holding a concurrency slot for the whole stream"""
+    timeout = timeout or default_timeout()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    async with _get_semaphore():
+        breaker = _check_breaker()
+
+        waited, outcome = 0.0, 'error'
+        try:
+            chunks = get_provider().astream(prompt)
+            while True:
+                started = time.perf_counter()
+                try:
+                    text = await asyncio.wait_for(chunks.__anext__(), timeout=max(deadline - loop.time(), 0))
+                except StopAsyncIteration:
+                    break
+                finally:
+                    waited += time.perf_counter() - started
+                yield text
+            outcome = 'success'
+        except StreamComplete:
+            outcome = 'success'
+        except asyncio.TimeoutError:
+            outcome = 'timeout'
+            breaker.record_failure('timeout')
+            raise LLMError(f"LLM stream timed out after {timeout}s")
+        except GeneratorExit:
+            outcome = 'cancelled'
+            breaker.release()
+            raise
+        except Exception as e:
+            breaker.record_failure(e)
+            raise LLMError(str(e)) from e
+        finally:
+            _observe(breaker, outcome, waited)
+
+    breaker.record_success()
@@ -0,0 +1,232 @@
+"""
+Incremental extraction of JSON from LLM output.
+
+Models wrap JSON in ```json fences, add a sentence before or after it, or
+stop halfway through. The extractor scans text as it streams in, skips
+everything outside the first complete JSON object and hands back each item
+of one array (e.g. "questions") as soon as that item closes, so items can be
+validated - and kept - before the rest of the response arrives.
+"""
+import json
+import logging
+from .llm_client import StreamComplete
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractedJSON:
+    """Result of an extraction: the parsed object (if it completed) and the valid array items"""
+
+    def __init__(self, document, items, rejected, complete):
+        self.document = document
+        self.items = items
+        self.rejected = rejected
+        self.complete = complete
+
+    def as_dict(self, array_key):
+        """The object with its array replaced by the valid items (just the items if it never completed)"""
+        data = dict(self.document) if isinstance(self.document, dict) else {}
+        data[array_key] = list(self.items)
+        return data
+
+
+class JSONStreamExtractor:
+    """
+    Feed text chunks in order; returns the newly accepted items of `array_key`
+    after each chunk. Strings are tracked so braces and fences inside values
+    (code snippets) don't confuse the scan.
+    """
+
+    def __init__(self, array_key=None, validate_item=None):
+        self.array_key = array_key
+        self.validate_item = validate_item
+        self.items = []
+        self.rejected = 0
+        self.document = None
+        self.done = False
+
+        self._buffer = ''
+        self._pos = 0
+        self._reset_scan()
+
+    def _reset_scan(self, start=None):
+        self._start = start     # offset of the candidate object's opening brace
+        self._stack = []        # open containers; '[' entries are (char, is_target_array)
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_key = None
+        self._item_start = None
+        self._candidate_items = 0
+
+    def feed(self, text):
+        if self.done or not text:
+            return []
+        self._buffer += text
+        accepted_before = len(self.items)
+        self._scan()
+        return self.items[accepted_before:]
+
+    def _scan(self):
+        buffer = self._buffer
+        while self._pos < len(buffer) and not self.done:
+            i = self._pos
+            char = buffer[i]
+            self._pos += 1
+
+            if self._start is None:
+                if char == '{':
+                    self._reset_scan(start=i)
+                    self._stack.append('{')
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        # Strings directly in the top object alternate key, value
+                        self._last_key = buffer[self._string_start + 1:i]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == '{':
+                if self._in_target_array() and len(self._stack) == 2:
+                    self._item_start = i
+                self._stack.append('{')
+            elif char == '[':
+                target = len(self._stack) == 1 and self.array_key is not None and self._last_key == self.array_key
+                self._stack.append(('[', target))
+            elif char in '}]':
+                if not self._stack:
+                    continue
+                self._stack.pop()
+                if char == '}' and self._item_start is not None and len(self._stack) == 2:
+                    self._accept_item(buffer[self._item_start:i + 1])
+                    self._item_start = None
+                elif not self._stack:
+                    self._finish_candidate(buffer[self._start:i + 1])
+
+    def _in_target_array(self):
+        return bool(self._stack) and isinstance(self._stack[-1], tuple) and self._stack[-1][1]
+
+    def _accept_item(self, raw):
+        self._candidate_items += 1
+        try:
+            item = json.loads(raw)
+        except ValueError:
+            self.rejected += 1
+            return
+        if self.validate_item is None or self.validate_item(item):
+            self.items.append(item)
+        else:
+            self.rejected += 1
+
+    def _finish_candidate(self, raw):
+        try:
+            document = json.loads(raw)
+        except ValueError:
+            document = None
+
+        if document is None and not self._candidate_items:
+            # A brace in the prose before the JSON - look for the next object
+            self._pos = self._start + 1
+            self._reset_scan()
+            return
+
+        self.document = document
+        self.done = True
+
+    def close(self):
+        """Stop reading; a truncated object still keeps the items that completed"""
+        if not self.done and self._start is not None:
+            logger.warning(f'LLM output ended inside its JSON, keeping {len(self.items)} complete items')
+        self.done = True
+        return ExtractedJSON(self.document, self.items, self.rejected, self.document is not None)
+
+
+def extract_json(text, array_key=None, validate_item=None):
+    """Extract the first JSON object from complete LLM output"""
+    extractor = JSONStreamExtractor(array_key, validate_item)
+    extractor.feed(text)
+    return extractor.close()
+
+
+def _end_stream(chunks, complete):
+    """Stop a chunk stream; complete tells the LLM client the answer arrived in full"""
+    if complete and hasattr(chunks, 'throw'):
+        try:
+            chunks.throw(StreamComplete())
+        except (StreamComplete, StopIteration):
+            pass
+    close = getattr(chunks, 'close', None)
+    if close:
+        close()
+
+
+async def _aend_stream(chunks, complete):
+    if complete and hasattr(chunks, 'athrow'):
+        try:
+            await chunks.athrow(StreamComplete())
+        except (StreamComplete, StopAsyncIteration):
+            pass
+    aclose = getattr(chunks, 'aclose', None)
+    if aclose:
+        await aclose()
+
+
+def stream_items(chunks, extractor):
+    """
+    Feed streamed text chunks to an extractor, yielding each accepted item as
+    soon as it completes. Stops reading once the first JSON object has closed.
+    """
+    try:
+        for chunk in chunks:
+            yield from extractor.feed(chunk)
+            if extractor.done:
+                break
+    except Exception as e:
+        # A stream that fails part way still keeps the items it delivered
+        if not extractor.items:
+            raise
+        logger.warning(f'LLM stream failed after {len(extractor.items)} items: {str(e)}')
+    finally:
+        # Ends the LLM call early when trailing prose is all that is left
+        _end_stream(chunks, complete=extractor.done)
+
+
+async def astream_items(chunks, extractor):
+    """Async version of stream_items for an async iterator of text chunks"""
+    try:
+        async for chunk in chunks:
+            for item in extractor.feed(chunk):
+                yield item
+            if extractor.done:
+                break
+    except Exception as e:
+        if not extractor.items:
+            raise
+        logger.warning(f'LLM stream failed after {len(extractor.items)} items: {str(e)}')
+    finally:
+        await _aend_stream(chunks, complete=extractor.done)
+
+
+def parse_stream(chunks, array_key=None, validate_item=None):
+    """Consume streamed text chunks until the first JSON object completes"""
+    extractor = JSONStreamExtractor(array_key, validate_item)
+    for _ in stream_items(chunks, extractor):
+        pass
+    return extractor.close()
+
+
+async def aparse_stream(chunks, array_key=None, validate_item=None):
+    """Async version of parse_stream"""
+    extractor = JSONStreamExtractor(array_key, validate_item)
+    async for _ in astream_items(chunks, extractor):
+        pass
+    return extractor.close()
@@ -0,0 +1,52 @@
+"""
+LLM provider registry.
+
+Providers are registered by dotted path and imported on first use, so the
+SDK behind one (google.generativeai pulls in grpc and protobuf) is only
+loaded by processes that actually call an LLM - not by every worker boot,
+management command or migration.
+
+The LLM_PROVIDER setting picks the backend: 'gemini' (default), 'local' (an
+offline stub for benchmarks, see local.py) or the dotted path of any
+LLMProvider subclass.
+"""
+from django.conf import settings
+from django.utils.module_loading import import_string
+from .base import LLMProvider
+import threading
+
+PROVIDERS = {
+    'gemini': 'core.llm_providers.gemini.GeminiProvider',
+    'local': 'core.llm_providers.local.LocalProvider',
+}
+
+DEFAULT_PROVIDER = 'gemini'
+
+_lock = threading.Lock()
+_instances = {}
+
+
+def register_provider(name, path):
+    """Make a provider class available by name, e.g. register_provider('ollama', 'myapp.llm.OllamaProvider')"""
+    with _lock:
+        PROVIDERS[name] = path
+        _instances.pop(name, None)
+
+
+def provider_name():
+    return getattr(settings, 'LLM_PROVIDER', DEFAULT_PROVIDER) or DEFAULT_PROVIDER
+
+
+def get_provider(name=None):
+    """Shared instance of the named (default: configured) provider, imported and configured on first use"""
+    name = name or provider_name()
+    provider = _instances.get(name)
+    if provider is None:
+        with _lock:
+            provider = _instances.get(name)
+            if provider is None:
+                if name not in PROVIDERS and '.' not in name:
+                    raise ValueError(f"Unknown LLM provider '{name}'")
+                provider = import_string(PROVIDERS.get(name, name))()
+                _instances[name] = provider
+    return provider
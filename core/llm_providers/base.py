@@ -0,0 +1,32 @@
+import asyncio
+
+
+class LLMProvider:
+    """
+    Interface every LLM backend implements. Only generate() is required; the
+    streaming and async methods fall back to it (on a worker thread for the
+    async ones). Errors are raised as-is - llm_client turns them into LLMError
+    and counts them against the circuit breaker.
+    """
+
+    name = None
+
+    def generate(self, prompt):
+        """Complete response text for a prompt"""
+        raise NotImplementedError
+
+    def stream(self, prompt):
+        """Response text in chunks as the model produces them"""
+        yield self.generate(prompt)
+
+    async def agenerate(self, prompt):
+        return await asyncio.to_thread(self.generate, prompt)
+
+    async def astream(self, prompt):
+        chunks = self.stream(prompt)
+        end = object()
+        while True:
+            text = await asyncio.to_thread(next, chunks, end)
+            if text is end:
+                return
+            yield text
@@ -0,0 +1,77 @@
+import google.generativeai as genai
+from django.conf import settings
+from .base import LLMProvider
+import asyncio
+import threading
+import weakref
+
+MODEL_NAME = 'gemini-2.0-flash'
+
+
+def _chunk_text(chunk):
+    """Text of one streamed chunk; chunks that only carry metadata have none"""
+    try:
+        return chunk.text
+    except ValueError:
+        return ''
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini through google-generativeai; the SDK is configured once per process"""
+
+    name = 'gemini'
+
+    def __init__(self):
+        options = {}
+        endpoint = getattr(settings, 'GEMINI_API_ENDPOINT', None)
+        if endpoint:
+            # e.g. 'http://127.0.0.1:8765' with GEMINI_TRANSPORT='rest' for a local fake server
+            options['client_options'] = {'api_endpoint': endpoint}
+        transport = getattr(settings, 'GEMINI_TRANSPORT', None)
+        if transport:
+            options['transport'] = transport
+
+        genai.configure(api_key=settings.GEMINI_API_KEY, **options)
+        self.uses_rest = transport == 'rest'
+        self.model = genai.GenerativeModel(MODEL_NAME)
+
+        # Async clients are bound to the event loop that created them
+        self._lock = threading.Lock()
+        self._loop_models = weakref.WeakKeyDictionary()
+
+    def _loop_model(self):
+        loop = asyncio.get_running_loop()
+        model = self._loop_models.get(loop)
+        if model is None:
+            with self._lock:
+                model = genai.GenerativeModel(MODEL_NAME)
+            self._loop_models[loop] = model
+        return model
+
+    def generate(self, prompt):
+        return self.model.generate_content(prompt).text
+
+    def stream(self, prompt):
+        for chunk in self.model.generate_content(prompt, stream=True):
+            text = _chunk_text(chunk)
+            if text:
+                yield text
+
+    async def agenerate(self, prompt):
+        if self.uses_rest:
+            # The REST transport has no async client
+            return await super().agenerate(prompt)
+        response = await self._loop_model().generate_content_async(prompt)
+        return response.text
+
+    async def astream(self, prompt):
+        if self.uses_rest:
+            async for text in super().astream(prompt):
+                yield text
+            return
+
+        response = await self._loop_model().generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            text = _chunk_text(chunk)
+            if text:
+                yield text
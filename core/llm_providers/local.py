@@ -0,0 +1,186 @@
+"""
+Offline LLM backend for benchmarks and load tests.
+
+Answers the quiz, batched quiz and roadmap prompts with schema-valid JSON
+(wrapped in ```json fences, like the real model) after an artificial delay,
+and fails a configurable share of calls. Output is deterministic: the n-th
+call with a given prompt always returns the same text and the same
+success or failure for a given LLM_LOCAL_SEED, while repeated prompts still
+get fresh questions so the question bank and dedup behave as in production.
+"""
+from django.conf import settings
+from .base import LLMProvider
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+
+CHUNK_SIZE = 200
+
+_QUIZ = re.compile(r'exactly (\d+) multiple-choice questions about (.+?)\.\n')
+_BATCH_QUIZ = re.compile(r'exactly (\d+) multiple-choice questions about each of these topics:\n((?:- .*\n)+)')
+_ROADMAP = re.compile(r'(\d+)-week personalized learning roadmap for (.+?)\.\n')
+_WEEKLY_HOURS = re.compile(r'Available: (\d+)')
+
+_CONCEPTS = ['variables', 'control flow', 'functions', 'recursion', 'closures', 'iterators', 'generators',
+             'error handling', 'modules', 'classes', 'inheritance', 'interfaces', 'generics', 'collections',
+             'concurrency', 'memory management', 'testing', 'debugging', 'performance', 'data structures',
+             'algorithms', 'file handling', 'networking', 'serialization', 'type systems', 'design patterns']
+_SUBJECTS = ['the compiler', 'the runtime', 'a caller', 'the standard library', 'a unit test', 'the garbage collector',
+             'a background worker', 'the scheduler', 'an API client', 'the interpreter', 'a code reviewer']
+_VERBS = ['rejects', 'caches', 'copies', 'rewrites', 'ignores', 'validates', 'reorders', 'inlines', 'locks',
+          'allocates', 'discards', 'retries', 'shares', 'defers', 'logs', 'releases', 'batches', 'indexes']
+_OBJECTS = ['every argument', 'the return value', 'shared state', 'the loop counter', 'each element', 'the stack frame',
+            'pending tasks', 'the input buffer', 'default values', 'nested scopes', 'the result set', 'stale entries']
+_QUALIFIERS = ['before the first call', 'only at compile time', 'on every iteration', 'when an exception is raised',
+               'after the scope ends', 'lazily on first use', 'once per process', 'whenever the input changes',
+               'in a separate thread', 'unless it is immutable']
+_DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+_RESOURCE_TYPES = ['video', 'article', 'documentation', 'course', 'exercise']
+
+
+class LocalProviderError(RuntimeError):
+    """A failure injected by LLM_LOCAL_FAILURE_RATE"""
+
+
+def _statement(rng):
+    return f"{rng.choice(_SUBJECTS)} {rng.choice(_VERBS)} {rng.choice(_OBJECTS)} {rng.choice(_QUALIFIERS)}"
+
+
+def _question(course_name, number, rng):
+    concept = rng.choice(_CONCEPTS)
+    return {
+        'question_id': f'q{number}',
+        'question_number': number,
+        'difficulty': _DIFFICULTIES[(number - 1) * len(_DIFFICULTIES) // 10 % len(_DIFFICULTIES)],
+        'topic': f'{course_name} {concept.title()}',
+        'question_text': f'In {course_name}, which statement about {concept} is true when {_statement(rng)}?',
+        'code_snippet': '',
+        'options': {key: _statement(rng).capitalize() for key in 'ABCD'},
+        'correct_answer': rng.choice('ABCD'),
+        'explanation': f'Because {_statement(rng)}.',
+        'concept_tested': concept,
+    }
+
+
+def _questions(course_name, count, rng):
+    return [_question(course_name, number, rng) for number in range(1, count + 1)]
+
+
+def _roadmap(topic, total_weeks, weekly_hours, rng):
+    weeks = []
+    for number in range(1, total_weeks + 1):
+        focus = rng.sample(_CONCEPTS, 2)
+        weeks.append({
+            'week': number,
+            'title': f'Week {number}: {focus[0].title()} in {topic}',
+            'focus_areas': [area.title() for area in focus],
+            'learning_objectives': [f'Understand {area} in {topic}' for area in focus],
+            'resources': [{
+                'type': rng.choice(_RESOURCE_TYPES),
+                'title': f'{topic} {area.title()}',
+                'description': f'How {_statement(rng)}',
+                'time_estimate': f'{rng.randint(1, 3)} hours',
+            } for area in focus],
+            'practice_exercises': [f'Write a small {topic} program using {area}' for area in focus],
+            'daily_tasks': [f'{day}: Practise {rng.choice(focus)}' for day in ('Monday', 'Wednesday', 'Friday')],
+            'milestone': f'Use {focus[0]} confidently in {topic}',
+            'estimated_hours': weekly_hours,
+        })
+    return {
+        'weeks': weeks,
+        'milestones': [{'week': week, 'title': f'Checkpoint {week // 3}', 'description': f'Review weeks {week - 2}-{week}'}
+                       for week in range(3, total_weeks + 1, 3)],
+        'success_tips': [f'Revisit {concept} every week' for concept in rng.sample(_CONCEPTS, 2)],
+        'project_ideas': [{'week': week, 'title': f'{topic} project {week // 4}', 'description': f'Build a tool around {rng.choice(_CONCEPTS)}',
+                           'complexity': _DIFFICULTIES[min(week // 5, 2)], 'duration': '3 days'}
+                          for week in range(4, total_weeks + 1, 4)],
+    }
+
+
+def respond(prompt, rng):
+    """Response text for one of the app's prompts (plain text for anything else)"""
+    batch, quiz, roadmap = _BATCH_QUIZ.search(prompt), _QUIZ.search(prompt), _ROADMAP.search(prompt)
+    if batch:
+        count = int(batch.group(1))
+        topics = [line[2:] for line in batch.group(2).splitlines()]
+        data = {'quizzes': [{'course_name': topic, 'questions': _questions(topic, count, rng)} for topic in topics]}
+    elif quiz:
+        data = {'questions': _questions(quiz.group(2), int(quiz.group(1)), rng)}
+    elif roadmap:
+        hours = _WEEKLY_HOURS.search(prompt)
+        data = _roadmap(roadmap.group(2), int(roadmap.group(1)), int(hours.group(1)) if hours else 5, rng)
+    else:
+        return f'Local provider reply to a {len(prompt)} character prompt.'
+    return '```json\n' + json.dumps(data, indent=1) + '\n```'
+
+
+class LocalProvider(LLMProvider):
+    """
+    Deterministic stand-in for a real model. Each call waits
+    LLM_LOCAL_LATENCY_SECONDS (+/- LLM_LOCAL_JITTER_SECONDS) before its first
+    chunk and LLM_LOCAL_CHUNK_DELAY_SECONDS between chunks, and fails with
+    probability LLM_LOCAL_FAILURE_RATE.
+    """
+
+    name = 'local'
+
+    def __init__(self):
+        self.latency = float(getattr(settings, 'LLM_LOCAL_LATENCY_SECONDS', 0))
+        self.jitter = float(getattr(settings, 'LLM_LOCAL_JITTER_SECONDS', 0))
+        self.chunk_delay = float(getattr(settings, 'LLM_LOCAL_CHUNK_DELAY_SECONDS', 0))
+        self.failure_rate = float(getattr(settings, 'LLM_LOCAL_FAILURE_RATE', 0))
+        self.seed = getattr(settings, 'LLM_LOCAL_SEED', 0)
+
+        self._lock = threading.Lock()
+        self._calls = {}  # prompt digest -> calls so far
+
+    def _plan(self, prompt):
+        """(first chunk delay, whether the call fails, response chunks) for the next call with this prompt"""
+        digest = hashlib.sha1(prompt.encode('utf-8')).hexdigest()
+        with self._lock:
+            call = self._calls.get(digest, 0)
+            self._calls[digest] = call + 1
+
+        rng = random.Random(f'{self.seed}:{digest}:{call}')
+        delay = max(self.latency + rng.uniform(-self.jitter, self.jitter), 0)
+        failed = rng.random() < self.failure_rate
+        text = respond(prompt, rng)
+        return delay, failed, [text[i:i + CHUNK_SIZE] for i in range(0, len(text), CHUNK_SIZE)]
+
+    def generate(self, prompt):
+        delay, failed, chunks = self._plan(prompt)
+        time.sleep(delay + self.chunk_delay * (len(chunks) - 1))
+        if failed:
+            raise LocalProviderError('Simulated LLM failure')
+        return ''.join(chunks)
+
+    def stream(self, prompt):
+        delay, failed, chunks = self._plan(prompt)
+        time.sleep(delay)
+        if failed:
+            raise LocalProviderError('Simulated LLM failure')
+        for position, chunk in enumerate(chunks):
+            if position and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield chunk
+
+    async def agenerate(self, prompt):
+        delay, failed, chunks = self._plan(prompt)
+        await asyncio.sleep(delay + self.chunk_delay * (len(chunks) - 1))
+        if failed:
+            raise LocalProviderError('Simulated LLM failure')
+        return ''.join(chunks)
+
+    async def astream(self, prompt):
+        delay, failed, chunks = self._plan(prompt)
+        await asyncio.sleep(delay)
+        if failed:
+            raise LocalProviderError('Simulated LLM failure')
+        for position, chunk in enumerate(chunks):
+            if position and self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            yield chunk
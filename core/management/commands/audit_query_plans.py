@@ -0,0 +1,145 @@
+import os
+import re
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.backends.base.creation import TEST_DATABASE_PREFIX
+from django.db.models import Q
+from django.db.models.functions import Lower
+from core.models import Assessment, Course, SkillProfile
+
+
+class Command(BaseCommand):
+    help = 'Load a synthetic dataset and check with EXPLAIN that the hot queries use their indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=5000)
+        parser.add_argument('--assessments-per-user', type=int, default=10)
+        parser.add_argument('--courses', type=int, default=2000,
+                            help='Synthetic courses, 5%% of them available')
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the synthetic rows instead of rolling them back')
+        parser.add_argument('--show-plans', action='store_true')
+        parser.add_argument('--i-know', action='store_true',
+                            help='Load the synthetic rows into a database that is not a test database')
+
+    def handle(self, *args, **options):
+        if not options['i_know'] and not self.on_test_database():
+            raise CommandError(
+                f"Refusing to load synthetic rows into {connection.settings_dict['NAME']!r}; "
+                'point DATABASES at a test database or pass --i-know'
+            )
+
+        with transaction.atomic():
+            sample = self.load(options)
+            self.analyze()
+            failures = self.audit(sample, options['show_plans'])
+            if not options['keep']:
+                transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{failures} queries do not use their index')
+        self.stdout.write(self.style.SUCCESS('All hot queries use an index'))
+
+    def on_test_database(self):
+        settings_dict = connection.settings_dict
+        if connection.vendor == 'sqlite' and connection.creation.is_in_memory_db(settings_dict['NAME']):
+            return True
+        name = os.path.basename(str(settings_dict['NAME']))
+        return name.startswith(TEST_DATABASE_PREFIX) or name == settings_dict.get('TEST', {}).get('NAME')
+
+    def load(self, options):
+        self.stdout.write(f"Loading {options['users']} users x {options['assessments_per_user']} assessments...")
+
+        # Only rows created by this run are read back, never real accounts
+        prefix = f'audit-{uuid.uuid4().hex[:12]}-'
+        users = [user.id for user in User.objects.bulk_create([
+            User(username=f'{prefix}{i}@example.com', email=f'{prefix.title()}{i}@Example.com')
+            for i in range(options['users'])
+        ], batch_size=1000)]
+
+        assessments = []
+        for user_id in users:
+            for n in range(options['assessments_per_user']):
+                assessments.append(Assessment(
+                    user_id=user_id,
+                    quiz_data={'quiz_metadata': {}},
+                    status='completed' if n % 2 else 'in_progress',
+                    custom_course_name='Audit',
+                ))
+        Assessment.objects.bulk_create(assessments, batch_size=2000)
+
+        completed = [assessment for assessment in assessments if assessment.status == 'completed']
+        SkillProfile.objects.bulk_create([
+            SkillProfile(user_id=assessment.user_id, assessment_id=assessment.id, skill_level='beginner',
+                         confidence_score=50, learning_pace='moderate', estimated_weeks=4, raw_results={})
+            for assessment in completed
+        ], batch_size=2000)
+
+        Course.objects.bulk_create([
+            Course(course_id=f'{prefix}course-{i}', title=f'Audit course {i}', description='',
+                   difficulty_range='Beginner', is_available=(i % 20 == 0))
+            for i in range(options['courses'])
+        ], batch_size=1000)
+
+        sample = completed[len(completed) // 2]
+        return {
+            'user_id': sample.user_id,
+            'assessment_id': sample.id,
+            'started_at': Assessment.objects.values_list('started_at', flat=True).get(id=sample.id),
+            'email': User.objects.values_list('email', flat=True).get(id=sample.user_id).lower(),
+        }
+
+    def analyze(self):
+        tables = [User._meta.db_table, Assessment._meta.db_table, SkillProfile._meta.db_table, Course._meta.db_table]
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(f"ANALYZE {', '.join(tables)}")
+            elif connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+
+    def hot_queries(self, sample):
+        """(label, queryset as the views run it, index expected or None for any index)"""
+        return [
+            ('assessment by id and owner',
+             Assessment.objects.filter(id=sample['assessment_id'], user_id=sample['user_id']), None),
+            ('assessments of a user, newest first',
+             Assessment.objects.filter(user_id=sample['user_id']), 'assessment_user_started_idx'),
+            ('assessments of a user by status',
+             Assessment.objects.filter(user_id=sample['user_id'], status='completed'), 'assessment_user_status_idx'),
+            ('history page after a cursor',
+             Assessment.objects.filter(user_id=sample['user_id'], started_at__lte=sample['started_at']).filter(
+                 Q(started_at__lt=sample['started_at']) | Q(id__lt=sample['assessment_id'])
+             ).order_by('-started_at', '-id'), 'assessment_user_started_idx'),
+            ('skill profile of an assessment',
+             SkillProfile.objects.filter(assessment_id=sample['assessment_id']), None),
+            ('email already registered',
+             User.objects.alias(email_lower=Lower('email')).filter(email_lower=sample['email']).exclude(email=''),
+             'user_email_lower_uniq'),
+            ('available courses',
+             Course.objects.filter(is_available=True), 'course_available_idx'),
+        ]
+
+    def full_scan(self, plan, table):
+        if connection.vendor == 'postgresql':
+            return f'Seq Scan on {table}' in plan
+        if connection.vendor == 'sqlite':
+            return re.search(rf'\bSCAN (TABLE )?{table}\b(?! USING)', plan) is not None
+        return False
+
+    def audit(self, sample, show_plans):
+        failures = 0
+        for label, queryset, index in self.hot_queries(sample):
+            plan = queryset.explain()
+            table = queryset.model._meta.db_table
+
+            ok = not self.full_scan(plan, table) and (index is None or index in plan)
+            failures += not ok
+
+            status = self.style.SUCCESS('ok  ') if ok else self.style.ERROR('FAIL')
+            self.stdout.write(f"{status} {label}" + (f" ({index})" if index else ''))
+            if show_plans or not ok:
+                self.stdout.write('       ' + plan.replace('\n', '\n       '))
+        return failures
@@ -0,0 +1,166 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from core.calibration import STAT_FIELDS, chunk_statistics, fit_parameters, difficulty_label
+from core.models import Assessment, AssessmentQuestion, QuestionBank, QuestionCalibration, CalibrationRun
+
+
+class Command(BaseCommand):
+    help = 'Fit question difficulty and discrimination from completed assessments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='Recompute from every assessment instead of those completed since the last run')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Assessments read and reduced per chunk')
+        parser.add_argument('--min-responses', type=int, default=30,
+                            help='Responses a question needs before its parameters are stored')
+        parser.add_argument('--relabel', action='store_true',
+                            help='Also replace difficulty labels with the empirical difficulty band')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Fit and report but do not write anything')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        last_run = CalibrationRun.objects.filter(finished_at__isnull=False).order_by('-id').first()
+        full = options['full'] or last_run is None
+        watermark = None if full else last_run.watermark
+
+        # Adaptive quizzes target the learner, so their rest scores don't measure ability
+        queryset = Assessment.objects.filter(
+            status='completed', completed_at__isnull=False
+        ).exclude(quiz_data__has_key='adaptive')
+        if watermark:
+            queryset = queryset.filter(completed_at__gt=watermark)
+
+        rows = queryset.order_by().values_list('id', 'completed_at', 'user_answers').iterator(
+            chunk_size=options['chunk_size']
+        )
+
+        self.answer_keys = {}
+        totals = {}
+        assessments = responses = 0
+        new_watermark = watermark
+
+        for chunk in self._chunks(rows, options['chunk_size']):
+            items, sums = self._reduce(chunk)
+            for item_id, row in zip(items.tolist(), sums):
+                if item_id in totals:
+                    totals[item_id] += row
+                else:
+                    totals[item_id] = row.copy()
+
+            assessments += len(chunk)
+            responses += int(sums[:, 0].sum())
+            latest = max(completed_at for _, completed_at, _ in chunk)
+            new_watermark = latest if new_watermark is None else max(new_watermark, latest)
+            self.stdout.write(f'  {assessments} assessments, {responses} responses')
+
+        if options['dry_run']:
+            ids = list(totals)
+            a, b = fit_parameters(np.array([totals[i] for i in ids]), options['min_responses'])
+            fitted = int(np.count_nonzero(~np.isnan(b)))
+            self.stdout.write(self.style.SUCCESS(
+                f'Would calibrate {fitted} of {len(ids)} questions from {responses} new responses [dry run]'
+            ))
+            return
+
+        with transaction.atomic():
+            calibrated = self._store(totals, full, options)
+            CalibrationRun.objects.create(
+                full=full,
+                watermark=new_watermark,
+                assessments=assessments,
+                responses=responses,
+                calibrated_questions=calibrated,
+                finished_at=timezone.now(),
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{"Full" if full else "Incremental"} calibration: {assessments} assessments, {responses} responses, '
+            f'{calibrated} questions calibrated in {time.monotonic() - started:.1f}s'
+        ))
+
+    def _chunks(self, rows, chunk_size):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _reduce(self, chunk):
+        """Score the chunk's linked questions and reduce them to per-question sums"""
+        index = {assessment_id: i for i, (assessment_id, _, _) in enumerate(chunk)}
+        answers = [user_answers or {} for _, _, user_answers in chunk]
+
+        links = list(AssessmentQuestion.objects.filter(assessment_id__in=index).values_list(
+            'assessment_id', 'position', 'question_id'
+        ))
+        missing = {question_id for _, _, question_id in links if question_id not in self.answer_keys}
+        if missing:
+            self.answer_keys.update(
+                QuestionBank.objects.filter(id__in=missing).values_list('id', 'correct_answer')
+            )
+
+        assessment_index = np.fromiter((index[a] for a, _, _ in links), dtype=np.int64, count=len(links))
+        item_ids = np.fromiter((q for _, _, q in links), dtype=np.int64, count=len(links))
+        correct = np.fromiter(
+            (
+                (answers[index[a]].get(f'q{position}') or {}).get('answer') == self.answer_keys[q]
+                for a, position, q in links
+            ),
+            dtype=np.float64, count=len(links)
+        )
+        return chunk_statistics(assessment_index, item_ids, correct)
+
+    def _store(self, totals, full, options):
+        """Merge sums into QuestionCalibration and refit the touched questions"""
+        if full:
+            QuestionCalibration.objects.all().delete()
+            QuestionBank.objects.filter(irt_difficulty__isnull=False).update(
+                irt_difficulty=None, irt_discrimination=None
+            )
+
+        existing = QuestionCalibration.objects.in_bulk(list(totals))
+        creates, updates = [], []
+        for question_id, sums in totals.items():
+            calibration = existing.get(question_id)
+            if calibration is None:
+                calibration = QuestionCalibration(question_id=question_id)
+                creates.append(calibration)
+            else:
+                sums = sums + np.array([getattr(calibration, field) for field in STAT_FIELDS])
+                updates.append(calibration)
+            for field, value in zip(STAT_FIELDS, sums.tolist()):
+                setattr(calibration, field, int(value) if field == 'responses' else value)
+
+        QuestionCalibration.objects.bulk_create(creates, batch_size=1000)
+        QuestionCalibration.objects.bulk_update(updates, STAT_FIELDS, batch_size=1000)
+
+        calibrations = creates + updates
+        a, b = fit_parameters(
+            np.array([[getattr(c, field) for field in STAT_FIELDS] for c in calibrations]),
+            options['min_responses']
+        )
+
+        questions = []
+        for calibration, discrimination, difficulty in zip(calibrations, a, b):
+            if np.isnan(difficulty):
+                continue
+            question = QuestionBank(
+                id=calibration.question_id,
+                irt_discrimination=round(float(discrimination), 4),
+                irt_difficulty=round(float(difficulty), 4),
+            )
+            question.difficulty = difficulty_label(difficulty)
+            questions.append(question)
+
+        fields = ['irt_discrimination', 'irt_difficulty'] + (['difficulty'] if options['relabel'] else [])
+        QuestionBank.objects.bulk_update(questions, fields, batch_size=1000)
+        return len(questions)
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core.quiz_pool import popular_topics, fill_pool, pool_target
+
+
+class Command(BaseCommand):
+    help = 'Keep a pool of ready-to-serve quizzes for popular assessment topics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', type=int, default=None,
+                            help='Quizzes to keep per topic (default: QUIZ_POOL_TARGET)')
+        parser.add_argument('--custom-limit', type=int, default=20,
+                            help='How many of the most requested custom courses to include')
+        parser.add_argument('--loop', action='store_true',
+                            help='Run forever, refilling the pool every --interval seconds')
+        parser.add_argument('--interval', type=int, default=300,
+                            help='Seconds between refills in --loop mode')
+
+    def handle(self, *args, **options):
+        target = options['target'] if options['target'] is not None else pool_target()
+
+        while True:
+            topics = popular_topics(custom_limit=options['custom_limit'])
+            self.stdout.write(f'Refilling pool for {len(topics)} topics (target {target} each)')
+
+            created = fill_pool(topics, target=target)
+            self.stdout.write(
+                self.style.SUCCESS(f'Pre-generated {created} quizzes')
+            )
+
+            if not options['loop']:
+                break
+
+            close_old_connections()
+            time.sleep(options['interval'])
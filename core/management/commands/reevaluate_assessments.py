@@ -0,0 +1,189 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from core.batch_evaluator import evaluate_batch
+from core.evaluator import evaluate_quiz, skill_profile_fields
+from core.models import Assessment, SkillProfile
+from core.question_bank import load_quiz_questions
+
+
+def reevaluate_chunk(rows):
+    """Re-score a chunk of (id, quiz_data, user_answers, old_results, weekly_hours) rows"""
+    times = [((old_results or {}).get('time_analysis') or {}).get('total_seconds', 0)
+             for _, _, _, old_results, _ in rows]
+    try:
+        scored = evaluate_batch(
+            [quiz_data['questions'] for _, quiz_data, _, _, _ in rows],
+            [user_answers or {} for _, _, user_answers, _, _ in rows],
+            times,
+            [weekly_hours for *_, weekly_hours in rows],
+        )
+        return [(row[0], evaluation_results) for row, evaluation_results in zip(rows, scored)]
+    except Exception:
+        # A malformed row poisons the whole batch; score one by one to isolate it
+        pass
+
+    results = []
+    for (assessment_id, quiz_data, user_answers, _, weekly_hours), time_taken in zip(rows, times):
+        try:
+            results.append((assessment_id, evaluate_quiz(quiz_data, user_answers or {}, time_taken, weekly_hours)))
+        except Exception as e:
+            results.append((assessment_id, e))
+    return results
+
+
+class Command(BaseCommand):
+    help = 'Re-score completed fixed-length assessments with the current evaluator and refresh their skill profiles'
+
+    SKILL_PROFILE_FIELDS = ['skill_level', 'confidence_score', 'learning_pace', 'strengths',
+                            'weaknesses', 'estimated_weeks', 'raw_results']
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only assessments completed on/after this date or datetime')
+        parser.add_argument('--until', help='Only assessments completed before this date or datetime')
+        parser.add_argument('--user', help='User id, username or email')
+        parser.add_argument('--course', help='Course id (e.g. python_basics) or custom course name')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Rows fetched, scored and written per chunk')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Scoring processes (1 scores in-process)')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Score everything but do not write results')
+
+    def _parse_moment(self, value, option):
+        moment = parse_datetime(value) or parse_date(value)
+        if moment is None:
+            raise CommandError(f'Invalid {option}: {value}')
+        if hasattr(moment, 'hour') and timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
+
+    def get_queryset(self, options):
+        # Adaptive results come from the ability estimate, which the fixed-quiz scorer would overwrite
+        queryset = Assessment.objects.filter(status='completed').exclude(
+            evaluation_results__isnull=True
+        ).exclude(quiz_data__has_key='adaptive')
+
+        if options['since']:
+            moment = self._parse_moment(options['since'], '--since')
+            lookup = 'completed_at__gte' if hasattr(moment, 'hour') else 'completed_at__date__gte'
+            queryset = queryset.filter(**{lookup: moment})
+
+        if options['until']:
+            moment = self._parse_moment(options['until'], '--until')
+            lookup = 'completed_at__lt' if hasattr(moment, 'hour') else 'completed_at__date__lt'
+            queryset = queryset.filter(**{lookup: moment})
+
+        if options['user']:
+            value = options['user']
+            user_filter = Q(user__username=value) | Q(user__email=value)
+            if value.isdigit():
+                user_filter |= Q(user_id=int(value))
+            queryset = queryset.filter(user_filter)
+
+        if options['course']:
+            value = options['course']
+            queryset = queryset.filter(Q(course__course_id=value) | Q(custom_course_name__iexact=value))
+
+        return queryset.order_by('id')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        workers = max(1, options['workers'])
+        queryset = self.get_queryset(options)
+
+        rows = queryset.values_list(
+            'id', 'quiz_data', 'user_answers', 'evaluation_results', 'user__profile__weekly_hours'
+        ).iterator(chunk_size=chunk_size)
+
+        self.processed = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+        if workers == 1:
+            for chunk in self._chunks(rows, chunk_size):
+                self._write(reevaluate_chunk(chunk), options['dry_run'])
+        else:
+            # Keep a bounded number of chunks in flight so memory stays flat
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = set()
+                for chunk in self._chunks(rows, chunk_size):
+                    pending.add(executor.submit(reevaluate_chunk, chunk))
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            self._write(future.result(), options['dry_run'])
+                for future in pending:
+                    self._write(future.result(), options['dry_run'])
+
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(self.style.SUCCESS(
+            f'Re-evaluated {self.processed} assessments in {elapsed:.1f}s '
+            f'({self.processed / elapsed if elapsed else 0:.0f}/s), {self.failed} failed'
+            + (' [dry run, nothing written]' if options['dry_run'] else '')
+        ))
+
+    def _chunks(self, rows, chunk_size):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield self._with_questions(chunk)
+                chunk = []
+        if chunk:
+            yield self._with_questions(chunk)
+
+    def _with_questions(self, chunk):
+        """Fill in questions for assessments that reference the question bank"""
+        linked = load_quiz_questions([row[0] for row in chunk if 'questions' not in (row[1] or {})])
+        return [
+            (assessment_id, dict(quiz_data or {}, questions=linked.get(assessment_id, [])), *rest)
+            if assessment_id in linked else (assessment_id, quiz_data, *rest)
+            for assessment_id, quiz_data, *rest in chunk
+        ]
+
+    def _write(self, results, dry_run):
+        updates = []
+        for assessment_id, evaluation_results in results:
+            if isinstance(evaluation_results, Exception):
+                self.failed += 1
+                self.stderr.write(f'Assessment {assessment_id} failed: {evaluation_results}')
+                continue
+            updates.append(Assessment(id=assessment_id, evaluation_results=evaluation_results))
+
+        if updates and not dry_run:
+            with transaction.atomic():
+                Assessment.objects.bulk_update(updates, ['evaluation_results'])
+                self._write_skill_profiles(updates)
+
+        self.processed += len(updates)
+        elapsed = time.monotonic() - self.started
+        self.stdout.write(
+            f'  {self.processed} done, {self.failed} failed '
+            f'({self.processed / elapsed if elapsed else 0:.0f} assessments/s)'
+        )
+
+    def _write_skill_profiles(self, assessments):
+        """Refresh existing skill profiles and backfill missing ones, one query each"""
+        results = {a.id: a.evaluation_results for a in assessments}
+
+        existing = list(SkillProfile.objects.filter(assessment_id__in=results).only('id', 'assessment_id'))
+        for skill_profile in existing:
+            for field, value in skill_profile_fields(results[skill_profile.assessment_id]).items():
+                setattr(skill_profile, field, value)
+        SkillProfile.objects.bulk_update(existing, self.SKILL_PROFILE_FIELDS)
+
+        have = {skill_profile.assessment_id for skill_profile in existing}
+        missing = Assessment.objects.filter(id__in=set(results) - have).values_list('id', 'user_id', 'course_id')
+        # ignore_conflicts: a newer retake may already own the (user, course) profile
+        SkillProfile.objects.bulk_create([
+            SkillProfile(assessment_id=assessment_id, user_id=user_id, course_id=course_id,
+                         **skill_profile_fields(results[assessment_id]))
+            for assessment_id, user_id, course_id in missing
+        ], ignore_conflicts=True)
@@ -0,0 +1,381 @@
+"""
+Prometheus-style metrics, served at /metrics in the text exposition format.
+
+Counters, gauges and histograms are defined at the bottom of this module and
+updated from the code paths they describe. Without METRICS_DIR, values live
+in process memory, which is right for a single process (runserver, one
+uvicorn worker). With METRICS_DIR set to a directory shared by every worker
+(gunicorn, several uvicorn workers), each process writes its values to its
+own memory-mapped files there, and /metrics adds them up across processes,
+so every worker answers a scrape with the same totals.
+
+Clear METRICS_DIR before the server starts. Counters and histograms of
+workers that exit are kept, so totals never go backwards. Their gauges are
+dropped by calling mark_process_dead from gunicorn's child_exit hook:
+
+    def child_exit(server, worker):
+        from core.metrics import mark_process_dead
+        mark_process_dead(worker.pid)
+"""
+from django.conf import settings
+import bisect
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+GAUGE_MODES = ('all', 'sum', 'max', 'min')
+
+REGISTRY = {}  # name -> metric
+
+_lock = threading.Lock()
+_pid = None
+_files = {}  # file kind -> _ValueFile of this process
+_values = {}  # key -> value, when METRICS_DIR is not set
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None)
+
+
+class _ValueFile:
+    """
+    Float values by key in a memory-mapped file that only this process writes.
+    Layout: used bytes (int32, padded to 8), then entries of key length
+    (int32), key padded so the value is 8-byte aligned, value (double).
+    The used size is written after the entry, so readers never see half of one.
+    """
+
+    INITIAL_SIZE = 1 << 16
+
+    def __init__(self, path):
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size == 0:
+            self._file.truncate(self.INITIAL_SIZE)
+            size = self.INITIAL_SIZE
+        self._size = size
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._positions = {}
+
+        self._used = struct.unpack_from('i', self._map, 0)[0]
+        if self._used == 0:
+            self._used = 8
+            struct.pack_into('i', self._map, 0, self._used)
+        for key, _, position in _entries(self._map, self._used):
+            self._positions[key] = position
+
+    def _add_key(self, key):
+        encoded = key.encode('utf-8')
+        padded = encoded + b' ' * (8 - (len(encoded) + 4) % 8)
+        entry = struct.pack(f'i{len(padded)}sd', len(encoded), padded, 0.0)
+        while self._used + len(entry) > self._size:
+            self._size *= 2
+            self._file.truncate(self._size)
+            self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), self._size)
+        self._map[self._used:self._used + len(entry)] = entry
+        self._positions[key] = self._used + 4 + len(padded)
+        self._used += len(entry)
+        struct.pack_into('i', self._map, 0, self._used)
+
+    def read(self, key):
+        if key not in self._positions:
+            self._add_key(key)
+        return struct.unpack_from('d', self._map, self._positions[key])[0]
+
+    def write(self, key, value):
+        if key not in self._positions:
+            self._add_key(key)
+        struct.pack_into('d', self._map, self._positions[key], value)
+
+
+def _entries(data, used):
+    """(key, value, value offset) of every entry in a value file"""
+    position = 8
+    while position < used:
+        length = struct.unpack_from('i', data, position)[0]
+        key = bytes(data[position + 4:position + 4 + length]).decode('utf-8')
+        position += 4 + length + (8 - (length + 4) % 8)
+        yield key, struct.unpack_from('d', data, position)[0], position
+        position += 8
+
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < 8:
+        return []
+    return [(key, value) for key, value, _ in _entries(data, struct.unpack_from('i', data, 0)[0])]
+
+
+def _update(file_kind, key, amount=None, value=None):
+    """Add amount to, or set value on, one of this process's values"""
+    global _pid
+    directory = metrics_dir()
+    with _lock:
+        if not directory:
+            _values[key] = value if amount is None else _values.get(key, 0.0) + amount
+            return
+
+        pid = os.getpid()
+        if pid != _pid:
+            # Forked: the parent's files belong to the parent
+            _files.clear()
+            _pid = pid
+        values = _files.get(file_kind)
+        if values is None:
+            values = _files[file_kind] = _ValueFile(os.path.join(directory, f'{file_kind}_{pid}.db'))
+        values.write(key, value if amount is None else values.read(key) + amount)
+
+
+def mark_process_dead(pid):
+    """Drop the gauges of a worker that has exited"""
+    directory = metrics_dir()
+    if not directory:
+        return
+    for path in glob.glob(os.path.join(directory, f'gauge_*_{pid}.db')):
+        os.remove(path)
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._keys = {}
+        REGISTRY[name] = self
+
+    def labels(self, **labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return _Child(self, tuple((name, str(labels[name])) for name in self.labelnames))
+
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} needs labels {self.labelnames}")
+        return ()
+
+    def _key(self, sample, labels):
+        key = self._keys.get((sample, labels))
+        if key is None:
+            key = self._keys[(sample, labels)] = json.dumps([self.name, sample, labels])
+        return key
+
+
+class _Child:
+    """A metric with its label values bound"""
+
+    def __init__(self, metric, labels):
+        self._metric = metric
+        self._labels = labels
+
+    def __getattr__(self, name):
+        method = getattr(self._metric, f'_{name}')
+        return lambda *args: method(self._labels, *args)
+
+
+class Counter(_Metric):
+    """Monotonic total; name it with a _total suffix"""
+
+    type = 'counter'
+
+    def inc(self, amount=1):
+        self._inc(self._unlabelled(), amount)
+
+    def _inc(self, labels, amount=1):
+        if amount < 0:
+            raise ValueError('Counters only go up')
+        _update('counter', self._key(self.name, labels), amount=amount)
+
+
+class Gauge(_Metric):
+    """
+    Current value. mode says how values from several processes combine:
+    'all' keeps one series per process (pid label), 'sum', 'max' or 'min'
+    reports a single one.
+    """
+
+    type = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), mode='all'):
+        if mode not in GAUGE_MODES:
+            raise ValueError(f"Gauge mode must be one of {GAUGE_MODES}")
+        super().__init__(name, documentation, labelnames)
+        self.mode = mode
+
+    def set(self, value):
+        self._set(self._unlabelled(), value)
+
+    def inc(self, amount=1):
+        self._inc(self._unlabelled(), amount)
+
+    def _set(self, labels, value):
+        _update(f'gauge_{self.mode}', self._key(self.name, labels), value=float(value))
+
+    def _inc(self, labels, amount=1):
+        _update(f'gauge_{self.mode}', self._key(self.name, labels), amount=amount)
+
+    def _dec(self, labels, amount=1):
+        self._inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, plus their sum and count"""
+
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value):
+        self._observe(self._unlabelled(), value)
+
+    def _observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        bound = _format_value(self.buckets[index]) if index < len(self.buckets) else '+Inf'
+        # Buckets are stored per bucket and made cumulative when rendered
+        _update('histogram', self._key(self.name + '_bucket', labels + (('le', bound),)), amount=1)
+        _update('histogram', self._key(self.name + '_sum', labels), amount=value)
+
+
+def _collect():
+    """{(metric, sample, labels): value} over every process"""
+    directory = metrics_dir()
+    if not directory:
+        with _lock:
+            values = dict(_values)
+        return {tuple(_decode(key)): value for key, value in values.items()}
+
+    samples = {}
+    for path in glob.glob(os.path.join(directory, '*.db')):
+        file_kind, _, pid = os.path.basename(path)[:-3].rpartition('_')
+        mode = file_kind.partition('_')[2]
+        try:
+            entries = _read_file(path)
+        except FileNotFoundError:
+            continue  # removed by mark_process_dead meanwhile
+
+        for key, value in entries:
+            name, sample, labels = _decode(key)
+            if mode == 'all':
+                labels += (('pid', pid),)
+            sample_key = (name, sample, labels)
+            if sample_key not in samples:
+                samples[sample_key] = value
+            elif mode == 'max':
+                samples[sample_key] = max(samples[sample_key], value)
+            elif mode == 'min':
+                samples[sample_key] = min(samples[sample_key], value)
+            else:
+                samples[sample_key] += value
+    return samples
+
+
+def _decode(key):
+    name, sample, labels = json.loads(key)
+    return name, sample, tuple(tuple(pair) for pair in labels)
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+def render():
+    """Every registered metric in the Prometheus text exposition format"""
+    by_metric = {}
+    for (name, sample, labels), value in _collect().items():
+        by_metric.setdefault(name, []).append((sample, labels, value))
+
+    lines = []
+    for name, metric in sorted(REGISTRY.items()):
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.type}')
+        samples = by_metric.get(name, [])
+
+        if metric.type != 'histogram':
+            if not samples and not metric.labelnames:
+                samples = [(name, (), 0.0)]
+            for sample, labels, value in sorted(samples):
+                lines.append(f'{sample}{_format_labels(labels)} {_format_value(value)}')
+            continue
+
+        series = {}  # labels without le -> {'buckets': {le: count}, 'sum': value}
+        if not metric.labelnames:
+            series[()] = {'buckets': {}, 'sum': 0.0}
+        for sample, labels, value in samples:
+            if sample.endswith('_bucket'):
+                entry = series.setdefault(tuple(l for l in labels if l[0] != 'le'), {'buckets': {}, 'sum': 0.0})
+                entry['buckets'][dict(labels)['le']] = value
+            else:
+                series.setdefault(labels, {'buckets': {}, 'sum': 0.0})['sum'] = value
+
+        for labels, entry in sorted(series.items()):
+            cumulative = 0.0
+            for bound in [_format_value(b) for b in metric.buckets] + ['+Inf']:
+                cumulative += entry['buckets'].get(bound, 0.0)
+                lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {_format_value(cumulative)}')
+            lines.append(f'{name}_count{_format_labels(labels)} {_format_value(cumulative)}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(entry["sum"])}')
+
+    return '\n'.join(lines) + '\n'
+
+
+# Application metrics
+
+LLM_REQUESTS = Counter(
+    'adaptlearn_llm_requests_total',
+    'LLM calls by provider and outcome (success, error, timeout, cancelled by the caller, rejected while the circuit is open)',
+    ['provider', 'outcome'],
+)
+LLM_SECONDS = Histogram(
+    'adaptlearn_llm_request_seconds',
+    'Time spent waiting on the LLM per call',
+    ['provider'],
+)
+LLM_CIRCUIT_OPEN = Gauge(
+    'adaptlearn_llm_circuit_open',
+    '1 while the LLM circuit breaker is open in at least one worker',
+    ['provider'], mode='max',
+)
+QUIZZES = Counter(
+    'adaptlearn_quizzes_total',
+    'Quizzes served by source (pool, bank, llm, bank_partial when the LLM failed, fallback)',
+    ['source'],
+)
+ROADMAPS = Counter(
+    'adaptlearn_roadmaps_total',
+    'Roadmaps served by source (stored, cache, llm, fallback)',
+    ['source'],
+)
+EVALUATION_SECONDS = Histogram(
+    'adaptlearn_evaluation_seconds',
+    'Time to score an assessment and build the learner profile',
+)
+CACHE_REQUESTS = Counter(
+    'adaptlearn_cache_requests_total',
+    'Cache lookups by cache and result (hit, miss)',
+    ['cache', 'result'],
+)
+
+
+def count_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache=cache, result='hit' if hit else 'miss').inc()
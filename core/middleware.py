@@ -0,0 +1,65 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from . import request_metrics
+
+
+class RequestMetricsMiddleware:
+    """
+    Collects DB, LLM and evaluator time per request (see core/request_metrics.py)
+    and reports it in a Server-Timing header. Streamed responses are recorded
+    once the stream ends; their header covers the time to the first byte.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics, token = request_metrics.begin()
+        try:
+            response = self.get_response(request)
+        finally:
+            request_metrics.end(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics, token = request_metrics.begin()
+        try:
+            response = await self.get_response(request)
+        finally:
+            request_metrics.end(token)
+        return self._finish(request, response, metrics)
+
+    def _finish(self, request, response, metrics):
+        response['Server-Timing'] = metrics.server_timing()
+        if not response.streaming:
+            request_metrics.observe(request, response.status_code, metrics)
+        elif response.is_async:
+            response.streaming_content = self._aobserve_after(response.streaming_content, request, response, metrics)
+        else:
+            response.streaming_content = self._observe_after(response.streaming_content, request, response, metrics)
+        return response
+
+    def _observe_after(self, content, request, response, metrics):
+        # Work done while the body streams still belongs to this request
+        token = request_metrics.resume(metrics)
+        try:
+            yield from content
+        finally:
+            request_metrics.end(token)
+            request_metrics.observe(request, response.status_code, metrics)
+
+    async def _aobserve_after(self, content, request, response, metrics):
+        token = request_metrics.resume(metrics)
+        try:
+            async for chunk in content:
+                yield chunk
+        finally:
+            request_metrics.end(token)
+            request_metrics.observe(request, response.status_code, metrics)
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_alter_skillprofile_course'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionBank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course_key', models.CharField(max_length=200)),
+                ('course_name', models.CharField(max_length=200)),
+                ('topic', models.CharField(max_length=200)),
+                ('difficulty', models.CharField(choices=[('beginner', 'Beginner'), ('intermediate', 'Intermediate'), ('advanced', 'Advanced')], max_length=20)),
+                ('question_text', models.TextField()),
+                ('code_snippet', models.TextField(blank=True, default='')),
+                ('options', models.JSONField()),
+                ('correct_answer', models.CharField(max_length=1)),
+                ('explanation', models.TextField(blank=True, default='')),
+                ('concept_tested', models.CharField(blank=True, default='', max_length=200)),
+                ('text_hash', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course_key', 'difficulty', 'topic'], name='core_questi_course__2550d9_idx')],
+                'unique_together': {('course_key', 'text_hash')},
+            },
+        ),
+    ]
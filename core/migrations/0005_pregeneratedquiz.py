@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_questionbank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PregeneratedQuiz',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('course_key', models.CharField(max_length=200)),
+                ('course_name', models.CharField(max_length=200)),
+                ('quiz_data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course_key', 'created_at'], name='core_pregen_course__aece81_idx')],
+            },
+        ),
+    ]
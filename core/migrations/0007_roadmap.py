@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_roadmapjob'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='roadmapjob',
+            name='result',
+        ),
+        migrations.AddField(
+            model_name='roadmapjob',
+            name='regenerate',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='Roadmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('roadmap_data', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roadmaps', to='core.assessment')),
+            ],
+            options={
+                'unique_together': {('assessment', 'fingerprint')},
+            },
+        ),
+        migrations.AddField(
+            model_name='roadmapjob',
+            name='roadmap',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.roadmap'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_roadmap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionbank',
+            name='source',
+            field=models.CharField(choices=[('generated', 'Generated'), ('assessment', 'Assessment')], default='generated', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='AssessmentQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('assessment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assessment_questions', to='core.assessment')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='assessment_questions', to='core.questionbank')),
+            ],
+            options={
+                'ordering': ['position'],
+                'unique_together': {('assessment', 'position')},
+            },
+        ),
+    ]
@@ -0,0 +1,125 @@
+import hashlib
+
+from django.db import migrations
+
+# Frozen copies of the app helpers, so the migration does not change with them
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+BANK_FIELDS = ['topic', 'difficulty', 'question_text', 'code_snippet', 'options',
+               'correct_answer', 'explanation', 'concept_tested']
+
+
+def normalize_course_name(course_name):
+    return ' '.join((course_name or '').lower().split())
+
+
+def question_hash(question):
+    options = question.get('options') or {}
+    parts = [' '.join(str(question.get('question_text', '')).lower().split())]
+    parts.extend(' '.join(str(options.get(key, '')).lower().split()) for key in sorted(options))
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def is_normalizable(question, position):
+    """Only questions the bank can reproduce exactly, ids included, are moved"""
+    try:
+        return (
+            question.get('question_id') == f'q{position}'
+            and question.get('question_number') == position
+            and question['difficulty'] in DIFFICULTIES
+            and isinstance(question['topic'], str) and len(question['topic']) <= 200
+            and isinstance(question['explanation'], str)
+            and isinstance(question['question_text'], str)
+            and all(key in question['options'] for key in ['A', 'B', 'C', 'D'])
+            and question['correct_answer'] in ['A', 'B', 'C', 'D']
+        )
+    except (KeyError, TypeError, AttributeError):
+        return False
+
+
+def scores_identically(row, question):
+    return all(getattr(row, field) == question[field] for field in ['topic', 'difficulty', 'correct_answer', 'explanation'])
+
+
+def forwards(apps, schema_editor):
+    Assessment = apps.get_model('core', 'Assessment')
+    AssessmentQuestion = apps.get_model('core', 'AssessmentQuestion')
+    QuestionBank = apps.get_model('core', 'QuestionBank')
+
+    assessments = Assessment.objects.select_related('course').only(
+        'id', 'quiz_data', 'custom_course_name', 'course__title'
+    )
+    for assessment in assessments.iterator(chunk_size=500):
+        quiz_data = assessment.quiz_data or {}
+        questions = quiz_data.get('questions')
+        if not isinstance(questions, list) or not questions:
+            continue
+        if not all(is_normalizable(q, position) for position, q in enumerate(questions, start=1)):
+            continue
+
+        course_name = assessment.custom_course_name or (assessment.course.title if assessment.course else 'General')
+        course_key = normalize_course_name(course_name)
+        hashes = [question_hash(q) for q in questions]
+
+        rows = {row.text_hash: row for row in QuestionBank.objects.filter(course_key=course_key, text_hash__in=set(hashes))}
+        missing = {}
+        for q, text_hash in zip(questions, hashes):
+            if text_hash not in rows and text_hash not in missing:
+                missing[text_hash] = QuestionBank(
+                    course_key=course_key,
+                    course_name=course_name,
+                    topic=q['topic'],
+                    difficulty=q['difficulty'],
+                    question_text=q['question_text'],
+                    code_snippet=q.get('code_snippet') or '',
+                    options={key: q['options'][key] for key in ['A', 'B', 'C', 'D']},
+                    correct_answer=q['correct_answer'],
+                    explanation=q['explanation'],
+                    concept_tested=str(q.get('concept_tested') or '')[:200],
+                    text_hash=text_hash,
+                    source='assessment',
+                )
+        if missing:
+            QuestionBank.objects.bulk_create(missing.values(), ignore_conflicts=True)
+            rows.update((row.text_hash, row) for row in QuestionBank.objects.filter(course_key=course_key, text_hash__in=missing))
+
+        resolved = [rows.get(text_hash) for text_hash in hashes]
+        if not all(row is not None and scores_identically(row, q) for row, q in zip(resolved, questions)):
+            continue
+
+        AssessmentQuestion.objects.bulk_create([
+            AssessmentQuestion(assessment_id=assessment.id, question_id=row.id, position=position)
+            for position, row in enumerate(resolved, start=1)
+        ])
+        Assessment.objects.filter(id=assessment.id).update(
+            quiz_data={'quiz_metadata': quiz_data.get('quiz_metadata', {})}
+        )
+
+
+def backwards(apps, schema_editor):
+    Assessment = apps.get_model('core', 'Assessment')
+    AssessmentQuestion = apps.get_model('core', 'AssessmentQuestion')
+
+    assessment_ids = AssessmentQuestion.objects.values_list('assessment_id', flat=True).distinct()
+    for assessment in Assessment.objects.filter(id__in=assessment_ids).only('id', 'quiz_data').iterator(chunk_size=500):
+        links = AssessmentQuestion.objects.filter(assessment_id=assessment.id).select_related('question').order_by('position')
+        questions = [
+            dict(
+                {field: getattr(link.question, field) for field in BANK_FIELDS},
+                question_id=f'q{link.position}',
+                question_number=link.position,
+            )
+            for link in links
+        ]
+        Assessment.objects.filter(id=assessment.id).update(quiz_data=dict(assessment.quiz_data or {}, questions=questions))
+    AssessmentQuestion.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_assessmentquestion'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
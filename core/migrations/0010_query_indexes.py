@@ -0,0 +1,67 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Refuse to build the unique email index over case-variant duplicates, naming them instead"""
+    User = apps.get_model('auth', 'User')
+    duplicates = (
+        User.objects.exclude(email='')
+        .annotate(email_lower=Lower('email'))
+        .values('email_lower')
+        .annotate(users=Count('id'))
+        .filter(users__gt=1)
+        .order_by('email_lower')
+    )
+    conflicts = []
+    for row in duplicates:
+        ids = sorted(User.objects.filter(email__iexact=row['email_lower']).values_list('id', flat=True))
+        conflicts.append(f"  {row['email_lower']}: user ids {', '.join(map(str, ids))}")
+    if conflicts:
+        raise RuntimeError(
+            "These emails belong to more than one account when compared case-insensitively, so "
+            "the unique index on LOWER(auth_user.email) cannot be created. Merge or delete the "
+            "extra accounts, or change their emails, then run migrate again:\n" + '\n'.join(conflicts)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0009_normalize_assessment_questions'),
+    ]
+
+    operations = [
+        # Composites first, so user lookups stay indexed while the FK index is dropped
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['user', '-started_at'], name='assessment_user_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['user', 'status', '-started_at'], name='assessment_user_status_idx'),
+        ),
+        migrations.AlterField(
+            model_name='assessment',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['course_id'], name='course_available_idx'),
+        ),
+        # auth.User is not ours to add Meta indexes to. Emails double as usernames;
+        # this rejects case variants of a registered email. Existing variants must be resolved first.
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            # Predicate spelled like .exclude(email='') so SQLite can match it too
+            sql="CREATE UNIQUE INDEX user_email_lower_uniq ON auth_user (LOWER(email)) WHERE NOT (email = '')",
+            reverse_sql='DROP INDEX IF EXISTS user_email_lower_uniq',
+        ),
+    ]
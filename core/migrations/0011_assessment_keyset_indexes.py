@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='assessment',
+            name='assessment_user_started_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='assessment',
+            name='assessment_user_status_idx',
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['user', '-started_at', '-id'], name='assessment_user_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assessment',
+            index=models.Index(fields=['user', 'status', '-started_at', '-id'], name='assessment_user_status_idx'),
+        ),
+    ]
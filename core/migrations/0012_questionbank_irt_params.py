@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_assessment_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionbank',
+            name='irt_difficulty',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='questionbank',
+            name='irt_discrimination',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
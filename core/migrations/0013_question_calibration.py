@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_questionbank_irt_params'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalibrationRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full', models.BooleanField(default=False)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('assessments', models.PositiveIntegerField(default=0)),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('calibrated_questions', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionCalibration',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='calibration', serialize=False, to='core.questionbank')),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('sum_correct', models.FloatField(default=0)),
+                ('sum_rest', models.FloatField(default=0)),
+                ('sum_rest_sq', models.FloatField(default=0)),
+                ('sum_correct_rest', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_question_calibration'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionbank',
+            name='minhash',
+            field=models.BinaryField(null=True),
+        ),
+    ]
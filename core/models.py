@@ -42,6 +42,14 @@ class Course(models.Model):
     learning_outcomes = models.JSONField(default=list)
     is_available = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Moves the catalog version (core/course_catalog.py); queryset.update() must set it explicitly
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            # The catalog only ever lists available courses
+            models.Index(fields=['course_id'], condition=models.Q(is_available=True), name='course_available_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -53,9 +61,9 @@ class Assessment(models.Model):
         ('completed', 'Completed'),
     ]
     
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)  # Leads the composite indexes below
     course = models.ForeignKey(Course, on_delete=models.CASCADE, null=True, blank=True)  # Optional for custom courses
-    quiz_data = models.JSONField()
+    quiz_data = models.JSONField()  # Metadata only once questions live in AssessmentQuestion
     user_answers = models.JSONField(default=dict, blank=True)
     evaluation_results = models.JSONField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_progress')
@@ -65,6 +73,12 @@ class Assessment(models.Model):
     
     class Meta:
         ordering = ['-started_at']
+        indexes = [
+            # Trailing id matches the (started_at, id) keyset of the history API
+            models.Index(fields=['user', '-started_at', '-id'], name='assessment_user_started_idx'),
+            # Also serves status filters under the default ordering
+            models.Index(fields=['user', 'status', '-started_at', '-id'], name='assessment_user_status_idx'),
+        ]
     
     def __str__(self):
         course_name = self.custom_course_name or (self.course.title if self.course else 'Unknown')
@@ -102,3 +116,137 @@ class SkillProfile(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.skill_level}"
+
+
+class QuestionBank(models.Model):
+    DIFFICULTY_LEVELS = [
+        ('beginner', 'Beginner'),
+        ('intermediate', 'Intermediate'),
+        ('advanced', 'Advanced'),
+    ]
+    
+    SOURCES = [
+        ('generated', 'Generated'),  # Validated LLM question, sampled into new quizzes
+        ('assessment', 'Assessment'),  # Fallback/imported question, only referenced by assessments
+    ]
+    
+    course_key = models.CharField(max_length=200)  # Normalized course name
+    course_name = models.CharField(max_length=200)
+    topic = models.CharField(max_length=200)
+    difficulty = models.CharField(max_length=20, choices=DIFFICULTY_LEVELS)
+    question_text = models.TextField()
+    code_snippet = models.TextField(blank=True, default='')
+    options = models.JSONField()
+    correct_answer = models.CharField(max_length=1)
+    explanation = models.TextField(blank=True, default='')
+    concept_tested = models.CharField(max_length=200, blank=True, default='')
+    text_hash = models.CharField(max_length=64)
+    source = models.CharField(max_length=20, choices=SOURCES, default='generated')
+    # 2PL item parameters for adaptive testing; null until calibrated (see core/adaptive.py)
+    irt_discrimination = models.FloatField(null=True, blank=True)
+    irt_difficulty = models.FloatField(null=True, blank=True)
+    # MinHash signature for near-duplicate checks; filled lazily for older rows (see core/question_dedup.py)
+    minhash = models.BinaryField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['course_key', 'text_hash']
+        indexes = [
+            models.Index(fields=['course_key', 'difficulty', 'topic']),
+        ]
+    
+    def __str__(self):
+        return f"{self.course_name} ({self.difficulty}) - {self.question_text[:50]}"
+
+
+class AssessmentQuestion(models.Model):
+    """Question shown at a given position of an assessment"""
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='assessment_questions')
+    question = models.ForeignKey(QuestionBank, on_delete=models.PROTECT, related_name='assessment_questions')
+    position = models.PositiveSmallIntegerField()  # 1-based; question_id is f"q{position}"
+    
+    class Meta:
+        unique_together = ['assessment', 'position']
+        ordering = ['position']
+    
+    def __str__(self):
+        return f"Assessment {self.assessment_id} q{self.position}"
+
+
+class QuestionCalibration(models.Model):
+    """Running response statistics for one bank question (see core/calibration.py)"""
+    question = models.OneToOneField(QuestionBank, on_delete=models.CASCADE, primary_key=True, related_name='calibration')
+    responses = models.PositiveIntegerField(default=0)
+    sum_correct = models.FloatField(default=0)
+    sum_rest = models.FloatField(default=0)  # Learner's proportion correct on the other questions
+    sum_rest_sq = models.FloatField(default=0)
+    sum_correct_rest = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Calibration of question {self.question_id} ({self.responses} responses)"
+
+
+class CalibrationRun(models.Model):
+    """One calibrate_questions run; the latest watermark drives incremental runs"""
+    full = models.BooleanField(default=False)
+    watermark = models.DateTimeField(null=True, blank=True)  # Latest completed_at included
+    assessments = models.PositiveIntegerField(default=0)
+    responses = models.PositiveIntegerField(default=0)
+    calibrated_questions = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"Calibration run {self.id} ({'full' if self.full else 'incremental'})"
+
+
+class PregeneratedQuiz(models.Model):
+    course_key = models.CharField(max_length=200)  # Normalized course name
+    course_name = models.CharField(max_length=200)
+    quiz_data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['course_key', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.course_name} (pooled {self.created_at:%Y-%m-%d %H:%M})"
+
+
+class Roadmap(models.Model):
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='roadmaps')
+    fingerprint = models.CharField(max_length=64)  # Hash of the generator inputs
+    roadmap_data = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['assessment', 'fingerprint']
+    
+    def __str__(self):
+        return f"Roadmap for assessment {self.assessment_id}"
+
+
+class RoadmapJob(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    assessment = models.ForeignKey(Assessment, on_delete=models.CASCADE, related_name='roadmap_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    regenerate = models.BooleanField(default=False)
+    roadmap = models.ForeignKey(Roadmap, on_delete=models.SET_NULL, null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"Roadmap job {self.id} ({self.status})"
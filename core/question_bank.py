@@ -0,0 +1,238 @@
+from django.conf import settings
+from .models import QuestionBank, AssessmentQuestion
+import hashlib
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+# Same difficulty mix as the fallback quiz
+QUIZ_DIFFICULTY_MIX = [
+    ('beginner', 4),
+    ('intermediate', 4),
+    ('advanced', 2),
+]
+
+QUIZ_SIZE = sum(count for _, count in QUIZ_DIFFICULTY_MIX)
+
+BANK_FIELDS = ['topic', 'difficulty', 'question_text', 'code_snippet', 'options',
+               'correct_answer', 'explanation', 'concept_tested']
+
+
+def normalize_course_name(course_name):
+    """Normalize a course name so 'Python', ' python ' and 'PYTHON' share one bank"""
+    return ' '.join((course_name or '').lower().split())
+
+
+def question_hash(question):
+    """Stable hash of a question's text and options, used to keep the bank distinct"""
+    options = question.get('options') or {}
+    parts = [' '.join(str(question.get('question_text', '')).lower().split())]
+    parts.extend(' '.join(str(options.get(key, '')).lower().split()) for key in sorted(options))
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+
+
+def min_bank_size():
+    """Number of distinct questions a course needs before quizzes are served from the bank"""
+    return getattr(settings, 'QUESTION_BANK_MIN_QUESTIONS', 30)
+
+
+def _bank_row(course_key, course_name, q, text_hash, source='generated', signature=None):
+    return QuestionBank(
+        course_key=course_key,
+        course_name=course_name,
+        topic=str(q['topic'])[:200],
+        difficulty=q['difficulty'],
+        question_text=q['question_text'],
+        code_snippet=q.get('code_snippet') or '',
+        options={key: q['options'][key] for key in ['A', 'B', 'C', 'D']},
+        correct_answer=q['correct_answer'],
+        explanation=q.get('explanation') or '',
+        concept_tested=str(q.get('concept_tested') or '')[:200],
+        text_hash=text_hash,
+        source=source,
+        minhash=signature.tobytes() if signature is not None else None,
+    )
+
+
+def question_dict(row, number):
+    """Quiz question built from a bank row at 1-based position number"""
+    return dict(
+        {field: getattr(row, field) for field in BANK_FIELDS},
+        question_id=f"q{number}",
+        question_number=number,
+        bank_id=row.id
+    )
+
+
+def store_questions(course_name, questions):
+    """
+    Add validated LLM questions to the bank, ignoring ones already stored
+    and near-duplicates of the topic's bank or of each other.
+    """
+    from .quiz_generator import validate_question
+    from .question_dedup import get_bank_index, signatures
+
+    course_key = normalize_course_name(course_name)
+    candidates = {}
+
+    for q in questions:
+        if not validate_question(q) or q['difficulty'] not in dict(QuestionBank.DIFFICULTY_LEVELS):
+            continue
+        candidates.setdefault(question_hash(q), q)
+
+    existing = set(QuestionBank.objects.filter(
+        course_key=course_key, text_hash__in=list(candidates)
+    ).values_list('text_hash', flat=True))
+
+    if existing:
+        # The LLM vouched for questions first seen inline in an assessment
+        QuestionBank.objects.filter(
+            course_key=course_key, text_hash__in=existing, source='assessment'
+        ).update(source='generated')
+
+    new = [(text_hash, q) for text_hash, q in candidates.items() if text_hash not in existing]
+    index = get_bank_index(course_name)
+    rows = [
+        _bank_row(course_key, course_name, q, text_hash, signature=signature)
+        for (text_hash, q), signature in zip(new, signatures([q for _, q in new]))
+        if index.add_if_new(text_hash, signature)
+    ]
+    if len(rows) < len(new):
+        logger.info(f"Skipped {len(new) - len(rows)} near-duplicate questions for: {course_key}")
+
+    if rows:
+        QuestionBank.objects.bulk_create(rows, ignore_conflicts=True)
+        logger.info(f"Stored {len(rows)} questions in bank for: {course_key}")
+
+    return len(rows)
+
+
+def bank_size(course_name):
+    """Count distinct bank questions for a course"""
+    return QuestionBank.objects.filter(course_key=normalize_course_name(course_name), source='generated').count()
+
+
+def build_quiz_from_bank(course_name, min_questions=None, rng=None):
+    """
+    Build a fresh 10-question quiz by sampling the bank.
+    Returns None when the bank is too thin for this course.
+    """
+    rng = rng or random.SystemRandom()
+    if min_questions is None:
+        min_questions = min_bank_size()
+
+    course_key = normalize_course_name(course_name)
+    pool = {}
+    for bank_id, difficulty in QuestionBank.objects.filter(course_key=course_key, source='generated').values_list('id', 'difficulty'):
+        pool.setdefault(difficulty, []).append(bank_id)
+
+    total = sum(len(ids) for ids in pool.values())
+    if total < max(min_questions, QUIZ_SIZE):
+        return None
+
+    # Sample the standard mix, borrowing from other levels when one is short
+    picked = []
+    for difficulty, count in QUIZ_DIFFICULTY_MIX:
+        ids = pool.get(difficulty, [])
+        take = rng.sample(ids, min(count, len(ids)))
+        picked.extend(take)
+        taken = set(take)
+        pool[difficulty] = [i for i in ids if i not in taken]
+
+    if len(picked) < QUIZ_SIZE:
+        leftovers = [i for ids in pool.values() for i in ids]
+        picked.extend(rng.sample(leftovers, QUIZ_SIZE - len(picked)))
+
+    rows = QuestionBank.objects.in_bulk(picked)
+    order = {difficulty: index for index, (difficulty, _) in enumerate(QUIZ_DIFFICULTY_MIX)}
+    questions = sorted((rows[i] for i in picked if i in rows), key=lambda row: order.get(row.difficulty, 0))
+
+    return {
+        "quiz_metadata": {
+            "course_name": course_name,
+            "total_questions": len(questions),
+            "estimated_time_minutes": len(questions)
+        },
+        "questions": [question_dict(row, number) for number, row in enumerate(questions, start=1)]
+    }
+
+
+def sample_bank_questions(course_name, count, rng=None):
+    """Up to count random bank rows for a course"""
+    rng = rng or random.SystemRandom()
+    ids = list(QuestionBank.objects.filter(
+        course_key=normalize_course_name(course_name), source='generated'
+    ).values_list('id', flat=True))
+    rows = QuestionBank.objects.in_bulk(rng.sample(ids, min(count, len(ids))))
+    return list(rows.values())
+
+
+def _scores_identically(row, q):
+    """True if the bank row grades and reports exactly like the inline question"""
+    return all(getattr(row, field) == q[field] for field in ['topic', 'difficulty', 'correct_answer', 'explanation'])
+
+
+def resolve_quiz_questions(course_name, questions):
+    """
+    Map quiz questions onto bank rows, adding the ones the bank lacks as
+    'assessment' rows. Returns rows in quiz order, or None when the quiz
+    cannot be represented exactly and has to stay inline in quiz_data.
+    """
+    from .quiz_generator import validate_question
+    from .question_dedup import signatures
+
+    levels = dict(QuestionBank.DIFFICULTY_LEVELS)
+    if not questions or not all(
+        validate_question(q) and q['difficulty'] in levels
+        and isinstance(q['topic'], str) and len(q['topic']) <= 200
+        and isinstance(q['explanation'], str)
+        for q in questions
+    ):
+        return None
+
+    course_key = normalize_course_name(course_name)
+    hashes = [question_hash(q) for q in questions]
+    rows = {row.text_hash: row for row in QuestionBank.objects.filter(course_key=course_key, text_hash__in=set(hashes))}
+
+    missing = {}
+    for q, text_hash in zip(questions, hashes):
+        if text_hash not in rows and text_hash not in missing:
+            missing[text_hash] = _bank_row(course_key, course_name, q, text_hash, source='assessment',
+                                           signature=signatures([q])[0])
+    if missing:
+        QuestionBank.objects.bulk_create(missing.values(), ignore_conflicts=True)
+        rows.update((row.text_hash, row) for row in QuestionBank.objects.filter(course_key=course_key, text_hash__in=missing))
+
+    resolved = [rows.get(text_hash) for text_hash in hashes]
+    if not all(row is not None and _scores_identically(row, q) for row, q in zip(resolved, questions)):
+        return None
+    return resolved
+
+
+def link_questions(assessment, rows):
+    """Record the assessment's questions in quiz order"""
+    AssessmentQuestion.objects.bulk_create([
+        AssessmentQuestion(assessment=assessment, question=row, position=number)
+        for number, row in enumerate(rows, start=1)
+    ])
+
+
+def load_quiz_questions(assessment_ids):
+    """Question dicts per assessment id, two queries for any number of assessments"""
+    links = list(AssessmentQuestion.objects.filter(assessment_id__in=assessment_ids)
+                 .order_by('assessment_id', 'position')
+                 .values_list('assessment_id', 'position', 'question_id'))
+    rows = QuestionBank.objects.only('id', *BANK_FIELDS).in_bulk({question_id for _, _, question_id in links})
+
+    questions = {}
+    for assessment_id, position, question_id in links:
+        questions.setdefault(assessment_id, []).append(question_dict(rows[question_id], position))
+    return questions
+
+
+def assessment_questions(assessment):
+    """Full questions (with answer keys) for an assessment, inline or normalized"""
+    if 'questions' in (assessment.quiz_data or {}):
+        return assessment.quiz_data['questions']
+    return load_quiz_questions([assessment.id]).get(assessment.id, [])
@@ -0,0 +1,206 @@
+"""
+Near-duplicate detection for generated questions.
+
+Exact repeats are caught by question_hash. Reworded repeats are caught with
+MinHash over character 5-grams of the question text and options: two
+questions whose signatures agree in at least SIMILARITY_THRESHOLD of their
+slots count as the same question. Locality-sensitive hashing (BANDS bands
+of ROWS slots) narrows a lookup to the few bank questions that share a band,
+so checking a question costs the same for ten questions or a few hundred
+thousand. Signatures are stored on QuestionBank.minhash, so a topic's index
+is rebuilt from the database without re-hashing its questions.
+"""
+from django.conf import settings
+from .models import QuestionBank
+from .question_bank import normalize_course_name, question_hash
+from .metrics import count_cache
+import numpy as np
+import re
+import threading
+import time
+import zlib
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+# Estimated Jaccard similarity at which two questions count as duplicates
+SIMILARITY_THRESHOLD = 0.8
+MATCHES_NEEDED = int(np.ceil(SIMILARITY_THRESHOLD * NUM_PERM))
+
+# Universal hashing (a*x + b) mod p; a, b < 2**32 keeps a*x + b inside uint64
+_PRIME = np.uint64(4294967311)
+_random = np.random.RandomState(20240601)
+_A = _random.randint(1, 2 ** 32, NUM_PERM, dtype=np.uint64)[:, None]
+_B = _random.randint(0, 2 ** 32, NUM_PERM, dtype=np.uint64)[:, None]
+_BAND_MIX = _random.randint(1, 2 ** 63, ROWS, dtype=np.uint64) | np.uint64(1)
+_BAND_SALT = _random.randint(0, 2 ** 63, BANDS, dtype=np.uint64)
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+# Unsorted additions are merged into the sorted band arrays past this many
+MERGE_THRESHOLD = 4096
+
+_lock = threading.Lock()
+_indexes = {}  # course_key -> (expires_at, NearDuplicateIndex)
+
+
+def index_ttl():
+    return getattr(settings, 'QUESTION_DEDUP_INDEX_TTL', 300)
+
+
+def normalized_text(question):
+    """Question text and options, lowercased with punctuation and spacing folded"""
+    options = question.get('options') or {}
+    parts = [str(question.get('question_text', ''))]
+    if isinstance(options, dict):
+        parts.extend(str(options[key]) for key in sorted(options))
+    return ' '.join(_NON_WORD.sub(' ', ' '.join(parts).lower()).split())
+
+
+def _shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        grams = {text}
+    else:
+        grams = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def signatures(questions, chunk_size=500):
+    """MinHash signatures of many questions, shape (n, NUM_PERM)"""
+    result = np.empty((len(questions), NUM_PERM), dtype=np.uint32)
+    for start in range(0, len(questions), chunk_size):
+        shingles = [_shingles(normalized_text(q)) for q in questions[start:start + chunk_size]]
+        offsets = np.cumsum([0] + [len(s) for s in shingles[:-1]])
+        values = (_A * np.concatenate(shingles)[None, :] + _B) % _PRIME
+        # Values past 2**32 (15 of them) wrap; harmless for similarity
+        result[start:start + len(shingles)] = np.minimum.reduceat(values, offsets, axis=1).T.astype(np.uint32)
+    return result
+
+
+def fingerprint(question):
+    """(exact text hash, MinHash signature) of one question"""
+    return question_hash(question), signatures([question])[0]
+
+
+def _band_keys(sigs):
+    """One uint64 key per band per signature, shape (n, BANDS); keys of different bands never meet"""
+    bands = sigs.reshape(len(sigs), BANDS, ROWS).astype(np.uint64)
+    return (bands * _BAND_MIX).sum(axis=2) + _BAND_SALT
+
+
+class NearDuplicateIndex:
+    """Exact hashes plus MinHash LSH buckets, kept in sorted arrays for compact, fast lookups"""
+
+    def __init__(self, text_hashes=(), sigs=None):
+        self._lock = threading.Lock()
+        self.hashes = set(text_hashes)
+        self._sigs = np.empty((0, NUM_PERM), dtype=np.uint32) if sigs is None else np.asarray(sigs, dtype=np.uint32)
+        self._size = len(self._sigs)
+        self._sorted_keys = np.empty(0, dtype=np.uint64)
+        self._sorted_ids = np.empty(0, dtype=np.int64)
+        self._pending = {}  # band key -> ids not yet merged into the sorted arrays
+        self._pending_count = 0
+        self._merge(np.arange(self._size))
+
+    def __len__(self):
+        return self._size
+
+    def _merge(self, ids):
+        if not len(ids):
+            return
+        keys = _band_keys(self._sigs[ids]).ravel()
+        all_keys = np.concatenate([self._sorted_keys, keys])
+        all_ids = np.concatenate([self._sorted_ids, np.repeat(ids, BANDS)])
+        order = np.argsort(all_keys, kind='stable')
+        self._sorted_keys, self._sorted_ids = all_keys[order], all_ids[order]
+
+    def _candidates(self, keys):
+        lo = np.searchsorted(self._sorted_keys, keys, side='left')
+        hi = np.searchsorted(self._sorted_keys, keys, side='right')
+        found = [self._sorted_ids[a:b] for a, b in zip(lo, hi) if b > a]
+        for key in keys.tolist():
+            ids = self._pending.get(key)
+            if ids:
+                found.append(np.asarray(ids, dtype=np.int64))
+        return np.unique(np.concatenate(found)) if found else np.empty(0, dtype=np.int64)
+
+    def is_duplicate(self, text_hash, signature):
+        if text_hash in self.hashes:
+            return True
+        candidates = self._candidates(_band_keys(signature[None, :])[0])
+        if not len(candidates):
+            return False
+        matches = np.count_nonzero(self._sigs[candidates] == signature, axis=1)
+        return bool((matches >= MATCHES_NEEDED).any())
+
+    def add(self, text_hash, signature):
+        if self._size == len(self._sigs):
+            grown = np.empty((max(64, 2 * self._size), NUM_PERM), dtype=np.uint32)
+            grown[:self._size] = self._sigs[:self._size]
+            self._sigs = grown
+        position = self._size
+        self._sigs[position] = signature
+        self._size += 1
+        self.hashes.add(text_hash)
+
+        for key in _band_keys(signature[None, :])[0].tolist():
+            self._pending.setdefault(key, []).append(position)
+        self._pending_count += 1
+        if self._pending_count >= MERGE_THRESHOLD:
+            self._merge(np.arange(position + 1 - self._pending_count, position + 1))
+            self._pending, self._pending_count = {}, 0
+
+    def add_if_new(self, text_hash, signature):
+        """Record the question unless it duplicates one already indexed; True if it was new"""
+        with self._lock:
+            if self.is_duplicate(text_hash, signature):
+                return False
+            self.add(text_hash, signature)
+            return True
+
+    def add_question_if_new(self, question):
+        return self.add_if_new(*fingerprint(question))
+
+
+def unique_questions(questions):
+    """Questions in order, without exact or near duplicates of earlier ones"""
+    index = NearDuplicateIndex()
+    return [q for q in questions if index.add_question_if_new(q)]
+
+
+def _load_index(course_key):
+    """Index every bank question of a topic, signing rows stored before signatures existed"""
+    rows = list(QuestionBank.objects.filter(course_key=course_key).values_list('id', 'text_hash', 'minhash'))
+
+    unsigned = [bank_id for bank_id, _, minhash in rows if minhash is None]
+    if unsigned:
+        fresh = {}
+        for start in range(0, len(unsigned), 1000):
+            chunk = list(QuestionBank.objects.filter(id__in=unsigned[start:start + 1000]).only('id', 'question_text', 'options'))
+            sigs = signatures([{'question_text': row.question_text, 'options': row.options} for row in chunk])
+            for row, sig in zip(chunk, sigs):
+                row.minhash = sig.tobytes()
+                fresh[row.id] = row.minhash
+            QuestionBank.objects.bulk_update(chunk, ['minhash'], batch_size=1000)
+        rows = [(bank_id, text_hash, fresh.get(bank_id, minhash)) for bank_id, text_hash, minhash in rows]
+
+    sigs = np.frombuffer(b''.join(bytes(minhash) for _, _, minhash in rows), dtype=np.uint32).reshape(-1, NUM_PERM)
+    return NearDuplicateIndex([text_hash for _, text_hash, _ in rows], sigs.copy())
+
+
+def get_bank_index(course_name):
+    """Near-duplicate index of a topic's bank, rebuilt at most every QUESTION_DEDUP_INDEX_TTL seconds"""
+    course_key = normalize_course_name(course_name)
+    now = time.monotonic()
+
+    entry = _indexes.get(course_key)
+    hit = entry is not None and entry[0] >= now
+    count_cache('question_dedup_index', hit=hit)
+    if not hit:
+        index = _load_index(course_key)
+        with _lock:
+            _indexes[course_key] = (now + index_ttl(), index)
+        return index
+    return entry[1]
@@ -1,64 +1,278 @@
-import google.generativeai as genai
+from asgiref.sync import sync_to_async
 from django.conf import settings
-import json
 import logging
 import random
+from .llm_client import stream_text, astream_text, default_timeout
+from .metrics import QUIZZES
+from .llm_parsing import JSONStreamExtractor, extract_json, parse_stream, aparse_stream, stream_items, astream_items
+from .question_bank import (
+    QUIZ_SIZE, build_quiz_from_bank, store_questions, normalize_course_name, question_dict, question_hash,
+    sample_bank_questions,
+)
+from .question_dedup import NearDuplicateIndex, unique_questions
 
 logger = logging.getLogger(__name__)
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
 def generate_assessment_quiz(course_name, user=None):
     """
     Generate dynamic personalized quiz using Gemini API (10 questions)
     Different questions generated each time for the same topic
     """
+    quiz_data = _bank_quiz(course_name)
+    if quiz_data:
+        return quiz_data
+    
+    return _llm_quiz_or_fallback(course_name, try_llm_generation(course_name))
+
+
+async def agenerate_assessment_quiz(course_name, user=None):
+    """Async version of generate_assessment_quiz that never blocks the event loop"""
+    quiz_data = await sync_to_async(_bank_quiz)(course_name)
+    if quiz_data:
+        return quiz_data
+    
+    quiz_data = await atry_llm_generation(course_name)
+    return await sync_to_async(_llm_quiz_or_fallback)(course_name, quiz_data)
+
+
+def stream_assessment_quiz(course_name, user=None):
+    """
+    Streaming version of generate_assessment_quiz.
+    Yields ('question', question) for each LLM question as soon as it has been
+    validated, then ('quiz', quiz_data) with the finished quiz. Streamed
+    questions keep their numbers in the finished quiz unless the LLM fails
+    and a fallback quiz replaces them.
+    """
+    quiz_data = _bank_quiz(course_name)
+    if quiz_data:
+        yield 'quiz', quiz_data
+        return
     
-    # Try LLM generation first
-    quiz_data = try_llm_generation(course_name)
+    extractor = JSONStreamExtractor('questions', unique_question_validator())
+    try:
+        chunks = stream_text(build_quiz_prompt(course_name))
+        for number, question in enumerate(stream_items(chunks, extractor), 1):
+            if _number_streamed_question(question, number):
+                yield 'question', question
+        quiz_data = quiz_from_extraction(extractor.close(), course_name)
+    except Exception as e:
+        logger.error(f"LLM generation failed for {course_name}: {str(e)}")
+    
+    yield 'quiz', _llm_quiz_or_fallback(course_name, quiz_data)
+
+
+async def astream_assessment_quiz(course_name, user=None):
+    """Async version of stream_assessment_quiz"""
+    quiz_data = await sync_to_async(_bank_quiz)(course_name)
+    if quiz_data:
+        yield 'quiz', quiz_data
+        return
+    
+    extractor = JSONStreamExtractor('questions', unique_question_validator())
+    try:
+        chunks = astream_text(build_quiz_prompt(course_name))
+        number = 0
+        async for question in astream_items(chunks, extractor):
+            number += 1
+            if _number_streamed_question(question, number):
+                yield 'question', question
+        quiz_data = await sync_to_async(quiz_from_extraction)(extractor.close(), course_name)
+    except Exception as e:
+        logger.error(f"LLM generation failed for {course_name}: {str(e)}")
+    
+    yield 'quiz', await sync_to_async(_llm_quiz_or_fallback)(course_name, quiz_data)
+
+
+# The four entry points above differ only in how they call the LLM; these
+# make the bank -> LLM -> partial bank -> fallback decision for all of them
+
+def _bank_quiz(course_name):
+    """A quiz served from the question bank, or None while it holds too few distinct questions"""
+    quiz_data = build_quiz_from_bank(course_name)
+    if quiz_data:
+        logger.info(f"Quiz built from question bank for: {course_name}")
+        QUIZZES.labels(source='bank').inc()
+    return quiz_data
+
+
+def _llm_quiz_or_fallback(course_name, quiz_data):
+    """The LLM's quiz, or if it failed whatever the bank has, then the static quiz"""
+    source = 'llm'
+    if not quiz_data:
+        quiz_data = build_quiz_from_bank(course_name, min_questions=0)
+        source = 'bank_partial'
     
-    # If LLM fails, use reliable fallback
     if not quiz_data:
         logger.warning(f"LLM failed for {course_name}, using fallback")
         quiz_data = generate_fallback_quiz(course_name)
+        source = 'fallback'
     
+    QUIZZES.labels(source=source).inc()
     return quiz_data
 
 
+def _number_streamed_question(question, number):
+    """Number a streamed question in place; False for extras, which only go to the bank"""
+    question['question_id'] = f"q{number}"
+    question['question_number'] = number
+    return number <= QUIZ_SIZE
+
+
+def _example_question(course_name):
+    """One question in the JSON shape the prompts ask for"""
+    return f"""{{"question_id": "q1", "question_number": 1, "difficulty": "beginner", "topic": "{course_name} Basics", "question_text": "What is a key concept of {course_name}?", "code_snippet": "", "options": {{"A": "Option A", "B": "Option B", "C": "Option C", "D": "Option D"}}, "correct_answer": "A", "explanation": "Explanation here", "concept_tested": "Concept"}}"""
+
+
+def build_quiz_prompt(course_name):
+    """Prompt asking the LLM for a 10-question quiz"""
+    return f"""Generate exactly 10 multiple-choice questions about {course_name}.
+Return ONLY this JSON format with no other text:
+{{"questions": [{_example_question(course_name)}]}}"""
+
+
+def parse_quiz_response(response_text, course_name):
+    """Parse complete LLM output into a quiz, storing good questions in the bank"""
+    return quiz_from_extraction(extract_json(response_text, 'questions', validate_question), course_name)
+
+
+def quiz_from_extraction(extracted, course_name):
+    """Build a quiz from the questions that passed validation, or None if too few did"""
+    if extracted.rejected:
+        logger.warning(f"Dropped {extracted.rejected} malformed LLM questions for {course_name}")
+    return quiz_from_questions(extracted.items, course_name)
+
+
+def quiz_from_questions(questions, course_name):
+    """Build a quiz from validated LLM questions, storing them in the bank; None if too few"""
+    unique = unique_questions(questions)
+    if len(unique) < len(questions):
+        logger.warning(f"Dropped {len(questions) - len(unique)} repeated LLM questions for {course_name}")
+    questions = unique
+    
+    if len(questions) < 5:
+        return None
+    
+    # Dropped questions leave gaps, and answers are keyed by position
+    for number, question in enumerate(questions, 1):
+        question['question_id'] = f"q{number}"
+        question['question_number'] = number
+    
+    logger.info(f"LLM quiz generated for: {course_name} ({len(questions)} valid questions)")
+    try:
+        store_questions(course_name, questions)
+    except Exception as e:
+        logger.error(f"Question bank store failed for {course_name}: {str(e)}")
+    return format_quiz_data({'questions': questions}, course_name)
+
+
 def try_llm_generation(course_name):
     """Try to generate quiz using LLM"""
     try:
-        prompt = f"""Generate exactly 10 multiple-choice questions about {course_name}.
-Return ONLY this JSON format with no other text:
-{{"questions": [{{"question_id": "q1", "question_number": 1, "difficulty": "beginner", "topic": "{course_name} Basics", "question_text": "What is a key concept of {course_name}?", "code_snippet": "", "options": {{"A": "Option A", "B": "Option B", "C": "Option C", "D": "Option D"}}, "correct_answer": "A", "explanation": "Explanation here", "concept_tested": "Concept"}}]}}"""
-        
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Clean response
-        if '```':
-            response_text = response_text.split('```')[1]
-            if response_text.startswith('json'):
-                response_text = response_text[4:]
-        
-        response_text = response_text.strip()
-        
-        # Parse JSON
-        quiz_data = json.loads(response_text)
-        
-        # Basic validation
-        if 'questions' in quiz_data and len(quiz_data['questions']) >= 5:
-            logger.info(f"LLM quiz generated for: {course_name}")
-            return format_quiz_data(quiz_data, course_name)
+        chunks = stream_text(build_quiz_prompt(course_name))
+        extracted = parse_stream(chunks, 'questions', validate_question)
+        return quiz_from_extraction(extracted, course_name)
         
+    except Exception as e:
+        logger.error(f"LLM generation failed for {course_name}: {str(e)}")
         return None
+
+
+async def atry_llm_generation(course_name):
+    """Async version of try_llm_generation"""
+    try:
+        chunks = astream_text(build_quiz_prompt(course_name))
+        extracted = await aparse_stream(chunks, 'questions', validate_question)
+        return await sync_to_async(quiz_from_extraction)(extracted, course_name)
         
     except Exception as e:
         logger.error(f"LLM generation failed for {course_name}: {str(e)}")
         return None
 
 
+# Rough output size of one 10-question quiz, in tokens
+QUIZ_OUTPUT_TOKENS = 2000
+
+
+def batch_token_budget():
+    """Output tokens one batched quiz call may ask for"""
+    return getattr(settings, 'LLM_BATCH_TOKEN_BUDGET', 8000)
+
+
+def plan_batches(course_names, token_budget=None):
+    """Split topics into groups whose quizzes together fit one response"""
+    per_call = max(1, (token_budget or batch_token_budget()) // QUIZ_OUTPUT_TOKENS)
+    return [course_names[i:i + per_call] for i in range(0, len(course_names), per_call)]
+
+
+def build_batch_quiz_prompt(course_names):
+    """Prompt asking the LLM for a 10-question quiz on each of several topics"""
+    topics = '\n'.join(f"- {course_name}" for course_name in course_names)
+    return f"""Generate exactly 10 multiple-choice questions about each of these topics:
+{topics}
+Return ONLY this JSON format with no other text, one entry per topic in the order given, with course_name exactly as written above:
+{{"quizzes": [{{"course_name": "{course_names[0]}", "questions": [{_example_question(course_names[0])}]}}]}}"""
+
+
+def validate_quiz_part(part):
+    """A batched response entry needs a topic name and a question list"""
+    return isinstance(part, dict) and isinstance(part.get('course_name'), str) and isinstance(part.get('questions'), list)
+
+
+def generate_quizzes_batch(course_names, token_budget=None):
+    """
+    Generate quizzes for several topics in as few LLM calls as the token budget
+    allows. Each topic's part is validated on its own, and only topics whose
+    part is missing or invalid fall back to a single-topic call.
+    Returns {course_name: quiz_data or None}.
+    """
+    unique = {}
+    for course_name in course_names:
+        unique.setdefault(normalize_course_name(course_name), course_name)
+    course_names = list(unique.values())
+    
+    quizzes = {}
+    for batch in plan_batches(course_names, token_budget):
+        if len(batch) > 1:
+            quizzes.update(_generate_batch(batch))
+    
+    for course_name in course_names:
+        if course_name not in quizzes:
+            quizzes[course_name] = try_llm_generation(course_name)
+    
+    return quizzes
+
+
+def _generate_batch(course_names):
+    """One LLM call for several topics; returns the topics that came back valid"""
+    try:
+        # A batched answer is several quizzes long, so it gets a deadline per topic
+        chunks = stream_text(build_batch_quiz_prompt(course_names), timeout=default_timeout() * len(course_names))
+        extracted = parse_stream(chunks, 'quizzes', validate_quiz_part)
+    except Exception as e:
+        logger.error(f"Batched LLM generation failed for {len(course_names)} topics: {str(e)}")
+        return {}
+    
+    by_key = {normalize_course_name(course_name): course_name for course_name in course_names}
+    quizzes = {}
+    for position, part in enumerate(extracted.items):
+        course_name = by_key.get(normalize_course_name(part['course_name']))
+        if course_name is None and position < len(course_names):
+            # The model reworded the topic; entries are asked for in order
+            course_name = course_names[position]
+        if course_name is None or course_name in quizzes:
+            continue
+        
+        questions = [q for q in part['questions'] if validate_question(q)]
+        quiz_data = quiz_from_questions(questions, course_name)
+        if quiz_data and validate_quiz_structure(quiz_data):
+            quizzes[course_name] = quiz_data
+        else:
+            logger.warning(f"Batched quiz for {course_name} failed validation ({len(questions)} valid questions)")
+    
+    logger.info(f"Batched LLM generation: {len(quizzes)} of {len(course_names)} topics in one call")
+    return quizzes
+
+
 def generate_fallback_quiz(course_name):
     """Generate reliable fallback quiz"""
     return {
@@ -243,30 +457,59 @@ def generate_fallback_quiz(course_name):
 
 
 def format_quiz_data(quiz_data, course_name):
-    """Format LLM response into standard format"""
+    """Format LLM response into standard format, padded to QUIZ_SIZE questions"""
     if 'questions' not in quiz_data:
         return None
     
-    # Pad with fallback if not enough questions
-    fallback = generate_fallback_quiz(course_name)
-    questions = quiz_data['questions']
-    
-    while len(questions) < 10:
-        fallback_q = fallback['questions'][len(questions)]
-        questions.append(fallback_q)
-    
-    questions = questions[:10]
+    # Scoring and the quiz page expect a full quiz
+    questions = quiz_data['questions'][:QUIZ_SIZE]
+    if len(questions) < QUIZ_SIZE:
+        _pad_questions(questions, course_name)
     
     return {
         "quiz_metadata": {
             "course_name": course_name,
-            "total_questions": 10,
-            "estimated_time_minutes": 10
+            "total_questions": len(questions),
+            "estimated_time_minutes": len(questions)
         },
         "questions": questions
     }
 
 
+def _pad_questions(questions, course_name):
+    """
+    Top up a short quiz in place: bank questions first, then fallback ones,
+    skipping near-duplicates of questions already in the quiz. If that is
+    not enough, fallback questions only have to differ exactly.
+    """
+    def add(question):
+        number = len(questions) + 1
+        questions.append(dict(question, question_id=f"q{number}", question_number=number))
+    
+    seen = NearDuplicateIndex()
+    for q in questions:
+        seen.add_question_if_new(q)
+    
+    needed = QUIZ_SIZE - len(questions)
+    candidates = [question_dict(row, 0) for row in sample_bank_questions(course_name, needed * 3)]
+    fallback = generate_fallback_quiz(course_name)['questions']
+    for question in candidates + fallback:
+        if len(questions) >= QUIZ_SIZE:
+            return
+        if seen.add_question_if_new(question):
+            add(question)
+    
+    # The fallback quiz has QUIZ_SIZE distinct questions and the quiz holds fewer
+    # than QUIZ_SIZE, so enough of them are missing to always fill it here
+    hashes = {question_hash(q) for q in questions}
+    for question in fallback:
+        if len(questions) >= QUIZ_SIZE:
+            return
+        if question_hash(question) not in hashes:
+            hashes.add(question_hash(question))
+            add(question)
+
+
 def validate_quiz_structure(quiz_data):
     """Validate generated quiz meets requirements"""
     try:
@@ -278,18 +521,38 @@ def validate_quiz_structure(quiz_data):
         if len(questions) != 10:
             return False
         
+        return all(validate_question(q) for q in questions)
+    except:
+        return False
+
+
+def unique_question_validator():
+    """validate_question that also rejects repeats of questions it has already accepted"""
+    seen = NearDuplicateIndex()
+    
+    def validate(question):
+        return validate_question(question) and seen.add_question_if_new(question)
+    
+    return validate
+
+
+def validate_question(question):
+    """Validate a single question has every field the quiz needs"""
+    try:
         required_fields = ['question_id', 'difficulty', 'topic', 'question_text', 
                            'options', 'correct_answer', 'explanation']
         
-        for q in questions:
-            if not all(field in q for field in required_fields):
-                return False
-            
-            if not all(opt in q['options'] for opt in ['A', 'B', 'C', 'D']):
-                return False
-            
-            if q['correct_answer'] not in ['A', 'B', 'C', 'D']:
-                return False
+        if not all(field in question for field in required_fields):
+            return False
+        
+        if not isinstance(question['options'], dict) or not str(question['question_text']).strip():
+            return False
+        
+        if not all(opt in question['options'] for opt in ['A', 'B', 'C', 'D']):
+            return False
+        
+        if question['correct_answer'] not in ['A', 'B', 'C', 'D']:
+            return False
         
         return True
     except:
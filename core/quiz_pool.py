@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from .models import Course, Assessment, PregeneratedQuiz
+from .question_bank import normalize_course_name, build_quiz_from_bank
+from .metrics import QUIZZES, count_cache
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def pool_target():
+    """Number of ready-to-serve quizzes to keep per popular topic"""
+    return getattr(settings, 'QUIZ_POOL_TARGET', 3)
+
+
+def claim_pregenerated_quiz(course_name):
+    """
+    Atomically take one pre-built quiz for a course out of the pool.
+    Rows locked by a concurrent claim are skipped, so no quiz is handed out twice.
+    """
+    course_key = normalize_course_name(course_name)
+    
+    with transaction.atomic():
+        entry = (
+            PregeneratedQuiz.objects
+            .select_for_update(skip_locked=True)
+            .filter(course_key=course_key)
+            .order_by('created_at')
+            .first()
+        )
+        if entry is None:
+            count_cache('quiz_pool', hit=False)
+            return None
+        
+        quiz_data = entry.quiz_data
+        entry.delete()
+    
+    count_cache('quiz_pool', hit=True)
+    QUIZZES.labels(source='pool').inc()
+    logger.info(f"Claimed pre-generated quiz for: {course_name}")
+    quiz_data.setdefault('quiz_metadata', {})['course_name'] = course_name
+    return quiz_data
+
+
+def popular_topics(custom_limit=20):
+    """
+    Course names worth pre-generating: catalog course titles plus the most
+    requested custom courses. Deduplicated by normalize_course_name, the key
+    claim_pregenerated_quiz looks quizzes up by.
+    """
+    topics = {}
+    
+    for title in Course.objects.filter(is_available=True).values_list('title', flat=True):
+        topics.setdefault(normalize_course_name(title), title)
+    
+    # Count requests per normalized name, so 'Python' and 'python ' add up
+    requests, spelling = {}, {}
+    rows = (
+        Assessment.objects
+        .exclude(custom_course_name__isnull=True)
+        .exclude(custom_course_name='')
+        .values('custom_course_name')
+        .annotate(requests=Count('id'))
+        .order_by('-requests')
+    )
+    for row in rows:
+        key = normalize_course_name(row['custom_course_name'])
+        if not key:
+            continue
+        requests[key] = requests.get(key, 0) + row['requests']
+        spelling.setdefault(key, row['custom_course_name'].strip())  # Most requested spelling
+    
+    for key in sorted(requests, key=requests.get, reverse=True)[:custom_limit]:
+        topics.setdefault(key, spelling[key])
+    
+    return list(topics.values())
+
+
+def fill_pool(topics, target=None):
+    """
+    Generate quizzes until every topic has `target` pooled. Returns the number created.
+    Each round adds one quiz per topic still short: from the question bank where it
+    is deep enough, otherwise from batched LLM calls shared by all those topics.
+    """
+    from .quiz_generator import generate_quizzes_batch
+    
+    if target is None:
+        target = pool_target()
+    
+    keys = {topic: normalize_course_name(topic) for topic in topics}
+    pooled = dict(
+        PregeneratedQuiz.objects.filter(course_key__in=keys.values())
+        .values('course_key').annotate(count=Count('id')).values_list('course_key', 'count')
+    )
+    missing = {topic: target - pooled.get(key, 0) for topic, key in keys.items()}
+    missing = {topic: count for topic, count in missing.items() if count > 0}
+    
+    created = 0
+    while missing:
+        quizzes = {}
+        for topic in missing:
+            quiz_data = build_quiz_from_bank(topic)
+            if quiz_data:
+                quizzes[topic] = quiz_data
+        
+        pending = [topic for topic in missing if topic not in quizzes]
+        if pending:
+            quizzes.update(generate_quizzes_batch(pending))
+        
+        for topic in list(missing):
+            quiz_data = quizzes.get(topic)
+            # Never pool the static fallback quiz - it is free to build at request time
+            if not quiz_data:
+                logger.warning(f"Could not pre-generate quiz for {topic}, skipping")
+                del missing[topic]
+                continue
+            
+            PregeneratedQuiz.objects.create(course_key=keys[topic], course_name=topic, quiz_data=quiz_data)
+            created += 1
+            missing[topic] -= 1
+            if not missing[topic]:
+                del missing[topic]
+    
+    return created
@@ -0,0 +1,259 @@
+"""
+Per-request instrumentation.
+
+RequestMetricsMiddleware opens a RequestMetrics collector for each request
+in a context variable, so it follows the request into sync_to_async threads
+and streamed responses. Work done while it is open is added to it:
+
+- DB queries and their time, through a connection.execute_wrapper that every
+  connection gets when it is opened
+- LLM calls and the time spent waiting on them (llm_client)
+- evaluator time, less its queries (evaluator.evaluate_assessment)
+
+When the request finishes the totals go out as a Server-Timing header and a
+JSON log line, and are folded into per-endpoint histograms served by the
+admin-only /api/admin/request-metrics/ endpoint. The histograms are per
+process.
+"""
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from contextlib import contextmanager
+import bisect
+import contextvars
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+_lock = threading.Lock()
+_endpoints = {}  # endpoint -> EndpointStats
+_started_at = time.time()
+
+
+class RequestMetrics:
+    """Totals for one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.llm_calls = 0
+        self.llm_time = 0.0
+        self.evaluator_calls = 0
+        self.evaluator_time = 0.0
+
+    def add(self, kind, seconds, calls=1):
+        """kind is 'llm' or 'evaluator'"""
+        setattr(self, f'{kind}_calls', getattr(self, f'{kind}_calls') + calls)
+        setattr(self, f'{kind}_time', getattr(self, f'{kind}_time') + seconds)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def server_timing(self):
+        """Server-Timing header value; 'app' is what is left after DB, LLM and evaluator time"""
+        total = self.elapsed()
+        parts = [f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"']
+        if self.llm_calls:
+            parts.append(f'llm;dur={self.llm_time * 1000:.1f};desc="{self.llm_calls} calls"')
+        if self.evaluator_calls:
+            parts.append(f'eval;dur={self.evaluator_time * 1000:.1f}')
+        app = max(total - self.db_time - self.llm_time - self.evaluator_time, 0)
+        parts.append(f'app;dur={app * 1000:.1f}')
+        parts.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(parts)
+
+
+class Histogram:
+    """Cumulative bucket counts plus sum, as Prometheus keeps them"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (None past the last bucket)"""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def as_dict(self):
+        cumulative, seen = {}, 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            cumulative[str(bound)] = seen
+        cumulative['+Inf'] = self.count
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'mean': round(self.sum / self.count, 3) if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': cumulative,
+        }
+
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.server_errors = 0
+        self.llm_calls = 0
+        self.duration_ms = Histogram(DURATION_BUCKETS_MS)
+        self.db_queries = Histogram(QUERY_BUCKETS)
+        self.db_ms = Histogram(DURATION_BUCKETS_MS)
+        self.llm_ms = Histogram(DURATION_BUCKETS_MS)
+        self.evaluator_ms = Histogram(DURATION_BUCKETS_MS)
+
+    def observe(self, status, metrics, duration):
+        self.requests += 1
+        self.server_errors += status >= 500
+        self.llm_calls += metrics.llm_calls
+        self.duration_ms.observe(duration * 1000)
+        self.db_queries.observe(metrics.db_queries)
+        self.db_ms.observe(metrics.db_time * 1000)
+        if metrics.llm_calls:
+            self.llm_ms.observe(metrics.llm_time * 1000)
+        if metrics.evaluator_calls:
+            self.evaluator_ms.observe(metrics.evaluator_time * 1000)
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'server_errors': self.server_errors,
+            'llm_calls': self.llm_calls,
+            'duration_ms': self.duration_ms.as_dict(),
+            'db_queries': self.db_queries.as_dict(),
+            'db_ms': self.db_ms.as_dict(),
+            'llm_ms': self.llm_ms.as_dict(),
+            'evaluator_ms': self.evaluator_ms.as_dict(),
+        }
+
+
+def current_metrics():
+    """Collector of the request being served, or None outside a request"""
+    return _current.get()
+
+
+def record(kind, seconds, calls=1):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add(kind, seconds, calls)
+
+
+@contextmanager
+def track(kind):
+    """Time a block against the current request, e.g. with track('evaluator'): ... (its queries count as DB time)"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started, db_before = time.perf_counter(), metrics.db_time
+    try:
+        yield
+    finally:
+        metrics.add(kind, time.perf_counter() - started - (metrics.db_time - db_before))
+
+
+def _count_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+@receiver(connection_created)
+def install_query_counter(connection, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_count_query)
+
+
+def _install_on_open_connections():
+    for connection in connections.all(initialized_only=True):
+        install_query_counter(connection)
+
+
+def begin():
+    """Open a collector for the current context; returns it and the token to close it with"""
+    _install_on_open_connections()
+    metrics = RequestMetrics()
+    return metrics, resume(metrics)
+
+
+def resume(metrics):
+    """Make an open collector current again, e.g. while a streamed response is generated"""
+    return _current.set(metrics)
+
+
+def end(token):
+    try:
+        _current.reset(token)
+    except ValueError:
+        # A streamed response closed from another context; that context never saw the collector
+        pass
+
+
+def observe(request, status, metrics):
+    """Log a finished request and fold it into its endpoint's histograms"""
+    duration = metrics.elapsed()
+    match = getattr(request, 'resolver_match', None)
+    endpoint = (match.url_name or match.view_name) if match else 'unmatched'
+
+    with _lock:
+        stats = _endpoints.get(endpoint)
+        if stats is None:
+            stats = _endpoints[endpoint] = EndpointStats()
+        stats.observe(status, metrics, duration)
+
+    logger.info(json.dumps({
+        'event': 'request',
+        'endpoint': endpoint,
+        'method': request.method,
+        'path': request.path,
+        'status': status,
+        'duration_ms': round(duration * 1000, 1),
+        'db_queries': metrics.db_queries,
+        'db_ms': round(metrics.db_time * 1000, 1),
+        'llm_calls': metrics.llm_calls,
+        'llm_ms': round(metrics.llm_time * 1000, 1),
+        'evaluator_ms': round(metrics.evaluator_time * 1000, 1),
+    }))
+
+
+def snapshot():
+    """Aggregated histograms per endpoint since the process started (or the last reset)"""
+    with _lock:
+        endpoints = {endpoint: stats.as_dict() for endpoint, stats in sorted(_endpoints.items())}
+    return {'since': _started_at, 'endpoints': endpoints}
+
+
+def reset():
+    global _started_at
+    with _lock:
+        _endpoints.clear()
+        _started_at = time.time()
@@ -0,0 +1,90 @@
+from django.core.cache import caches
+from .metrics import count_cache
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+CACHE_ALIAS = 'roadmaps'
+STATS_PREFIX = 'roadmap_cache:'
+
+# Learners within the same band get the same roadmap template
+WEEKLY_HOURS_BUCKETS = [
+    (3, 'light'),
+    (6, 'moderate'),
+    (10, 'regular'),
+]
+
+
+def weekly_hours_bucket(weekly_hours):
+    try:
+        hours = float(weekly_hours)
+    except (TypeError, ValueError):
+        return 'unknown'
+    for upper, label in WEEKLY_HOURS_BUCKETS:
+        if hours <= upper:
+            return label
+    return 'intensive'
+
+
+def template_key(topic, skill_level, weaknesses, weekly_hours):
+    """Canonical cache key: topic, skill level, top-3 weaknesses and weekly hours bucket"""
+    canonical = json.dumps({
+        'topic': ' '.join(str(topic).lower().split()),
+        'skill_level': skill_level,
+        'weaknesses': [w.get('topic') for w in (weaknesses or [])[:3]],
+        'hours': weekly_hours_bucket(weekly_hours),
+    }, sort_keys=True)
+    return 'roadmap:' + hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _count(name):
+    stats = caches['default']
+    key = STATS_PREFIX + name
+    if not stats.add(key, 1, timeout=None):
+        try:
+            stats.incr(key)
+        except ValueError:
+            stats.set(key, 1, timeout=None)
+
+
+def _personalize(roadmap, weekly_hours):
+    return dict(roadmap, weekly_hours_required=weekly_hours)
+
+
+def get_cached_roadmap(topic, skill_level, weaknesses, weekly_hours):
+    """Shared roadmap for an equivalent learner profile, or None"""
+    try:
+        roadmap = _cache().get(template_key(topic, skill_level, weaknesses, weekly_hours))
+        _count('hits' if roadmap else 'misses')
+        count_cache('roadmap_template', hit=bool(roadmap))
+    except Exception as e:
+        logger.error(f"Roadmap cache read failed: {str(e)}")
+        return None
+    return _personalize(roadmap, weekly_hours) if roadmap else None
+
+
+def cache_roadmap(topic, skill_level, weaknesses, weekly_hours, roadmap):
+    """Share an LLM roadmap with every learner that maps to the same key"""
+    try:
+        _cache().set(template_key(topic, skill_level, weaknesses, weekly_hours), roadmap)
+    except Exception as e:
+        logger.error(f"Roadmap cache write failed: {str(e)}")
+
+
+def cache_stats():
+    """Hit/miss counters; LLM cost and latency scale with the miss rate"""
+    stats = caches['default'].get_many([STATS_PREFIX + 'hits', STATS_PREFIX + 'misses'])
+    hits = stats.get(STATS_PREFIX + 'hits', 0)
+    misses = stats.get(STATS_PREFIX + 'misses', 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 3) if total else None,
+    }
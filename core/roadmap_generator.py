@@ -1,12 +1,12 @@
-import google.generativeai as genai
-from django.conf import settings
-import json
+from asgiref.sync import sync_to_async
 import logging
+from .llm_client import stream_text, astream_text
+from .llm_parsing import extract_json, parse_stream, aparse_stream
+from .metrics import ROADMAPS
+from .roadmap_cache import get_cached_roadmap, cache_roadmap
 
 logger = logging.getLogger(__name__)
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
 def generate_learning_roadmap(topic, skill_level, weaknesses, strengths, weekly_hours):
     """Generate a personalized 12-week learning roadmap"""
     
@@ -17,17 +17,44 @@ def generate_learning_roadmap(topic, skill_level, weaknesses, strengths, weekly_
     if not roadmap:
         logger.warning(f"LLM roadmap failed for {topic}, using structured fallback")
         roadmap = generate_structured_roadmap(topic, skill_level, weaknesses, strengths, weekly_hours)
+        ROADMAPS.labels(source='fallback').inc()
     
     return roadmap
 
 
-def try_llm_roadmap(topic, skill_level, weaknesses, strengths, weekly_hours):
-    """Try to generate roadmap using LLM"""
-    try:
-        weak_topics = ', '.join([w['topic'] for w in weaknesses[:3]]) if weaknesses else 'None'
-        strong_topics = ', '.join([s['topic'] for s in strengths[:2]]) if strengths else 'None'
-        
-        prompt = """Create a detailed 12-week personalized learning roadmap for """ + topic + """.
+async def agenerate_learning_roadmap(topic, skill_level, weaknesses, strengths, weekly_hours):
+    """Async version of generate_learning_roadmap that never blocks the event loop"""
+    
+    roadmap = await atry_llm_roadmap(topic, skill_level, weaknesses, strengths, weekly_hours)
+    
+    if not roadmap:
+        logger.warning(f"LLM roadmap failed for {topic}, using structured fallback")
+        roadmap = generate_structured_roadmap(topic, skill_level, weaknesses, strengths, weekly_hours)
+        ROADMAPS.labels(source='fallback').inc()
+    
+    return roadmap
+
+
+def get_roadmap_inputs(assessment, user):
+    """Extract the roadmap generator arguments from an evaluated assessment"""
+    eval_results = assessment.evaluation_results
+    learner_profile = eval_results.get('learner_profile', {})
+    
+    return {
+        'topic': assessment.custom_course_name or (assessment.course.title if assessment.course else 'General'),
+        'skill_level': learner_profile.get('skill_level', 'beginner'),
+        'weaknesses': learner_profile.get('weaknesses', []),
+        'strengths': learner_profile.get('strengths', []),
+        'weekly_hours': user.profile.weekly_hours if hasattr(user, 'profile') else 5,
+    }
+
+
+def build_roadmap_prompt(topic, skill_level, weaknesses, strengths, weekly_hours):
+    """Prompt asking the LLM for a 12-week roadmap"""
+    weak_topics = ', '.join([w['topic'] for w in weaknesses[:3]]) if weaknesses else 'None'
+    strong_topics = ', '.join([s['topic'] for s in strengths[:2]]) if strengths else 'None'
+    
+    prompt = """Create a detailed 12-week personalized learning roadmap for """ + topic + """.
 
 Student Profile:
 - Current Level: """ + skill_level + """
@@ -60,26 +87,81 @@ Return ONLY valid JSON in this format:
     {"week": 4, "title": "Project", "description": "Build X", "complexity": "beginner", "duration": "3 days"}
   ]
 }"""
+    return prompt
+
+
+def validate_week(week):
+    """Validate a single roadmap week has a title and list-valued details"""
+    if not isinstance(week, dict):
+        return False
+    
+    if not isinstance(week.get('title'), str) or not week['title'].strip():
+        return False
+    
+    list_fields = ['focus_areas', 'learning_objectives', 'resources', 'practice_exercises', 'daily_tasks']
+    return all(isinstance(week.get(field, []), list) for field in list_fields)
+
+
+def parse_roadmap_response(response_text, topic, skill_level, weekly_hours):
+    """Parse complete LLM output into a roadmap"""
+    return roadmap_from_extraction(extract_json(response_text, 'weeks', validate_week), topic, skill_level, weekly_hours)
+
+
+def roadmap_from_extraction(extracted, topic, skill_level, weekly_hours):
+    """Build a roadmap from the weeks that passed validation, or None if too few did"""
+    if extracted.rejected:
+        logger.warning(f"Dropped {extracted.rejected} malformed LLM roadmap weeks for {topic}")
+    
+    if len(extracted.items) < 10:
+        return None
+    
+    for number, week in enumerate(extracted.items, 1):
+        week['week'] = number
+    
+    logger.info(f"LLM roadmap generated for: {topic}")
+    return format_roadmap_response(extracted.as_dict('weeks'), topic, skill_level, weekly_hours)
+
+
+def try_llm_roadmap(topic, skill_level, weaknesses, strengths, weekly_hours):
+    """Try to generate roadmap using LLM"""
+    try:
+        # Learners with an equivalent profile share one LLM roadmap
+        roadmap = get_cached_roadmap(topic, skill_level, weaknesses, weekly_hours)
+        if roadmap:
+            logger.info(f"Roadmap cache hit for: {topic}")
+            ROADMAPS.labels(source='cache').inc()
+            return roadmap
         
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        response = model.generate_content(prompt)
-        response_text = response.text.strip()
-        
-        # Clean response
-        if '```':
-            response_text = response_text.split('```')[1]
-            if response_text.startswith('json'):
-                response_text = response_text[4:]
+        prompt = build_roadmap_prompt(topic, skill_level, weaknesses, strengths, weekly_hours)
+        extracted = parse_stream(stream_text(prompt), 'weeks', validate_week)
+        roadmap = roadmap_from_extraction(extracted, topic, skill_level, weekly_hours)
         
-        response_text = response_text.strip()
-        roadmap_data = json.loads(response_text)
+        if roadmap:
+            ROADMAPS.labels(source='llm').inc()
+            cache_roadmap(topic, skill_level, weaknesses, weekly_hours, roadmap)
+        return roadmap
+    except Exception as e:
+        logger.error(f"LLM roadmap failed: {str(e)}")
+        return None
+
+
+async def atry_llm_roadmap(topic, skill_level, weaknesses, strengths, weekly_hours):
+    """Async version of try_llm_roadmap"""
+    try:
+        roadmap = await sync_to_async(get_cached_roadmap)(topic, skill_level, weaknesses, weekly_hours)
+        if roadmap:
+            logger.info(f"Roadmap cache hit for: {topic}")
+            ROADMAPS.labels(source='cache').inc()
+            return roadmap
         
-        # Validate
-        if 'weeks' in roadmap_data and len(roadmap_data['weeks']) >= 10:
-            logger.info(f"LLM roadmap generated for: {topic}")
-            return format_roadmap_response(roadmap_data, topic, skill_level, weekly_hours)
+        prompt = build_roadmap_prompt(topic, skill_level, weaknesses, strengths, weekly_hours)
+        extracted = await aparse_stream(astream_text(prompt), 'weeks', validate_week)
+        roadmap = roadmap_from_extraction(extracted, topic, skill_level, weekly_hours)
         
-        return None
+        if roadmap:
+            ROADMAPS.labels(source='llm').inc()
+            await sync_to_async(cache_roadmap)(topic, skill_level, weaknesses, weekly_hours, roadmap)
+        return roadmap
     except Exception as e:
         logger.error(f"LLM roadmap failed: {str(e)}")
         return None
@@ -0,0 +1,35 @@
+from .models import Roadmap
+from .metrics import ROADMAPS, count_cache
+import hashlib
+import json
+
+
+def roadmap_fingerprint(topic, skill_level, weaknesses, strengths, weekly_hours):
+    """Hash of everything that shapes a generated roadmap"""
+    canonical = json.dumps({
+        'topic': ' '.join(str(topic).lower().split()),
+        'skill_level': skill_level,
+        'weaknesses': [w.get('topic') for w in weaknesses or []],
+        'strengths': [s.get('topic') for s in strengths or []],
+        'weekly_hours': weekly_hours,
+    }, sort_keys=True)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def get_stored_roadmap(assessment, fingerprint):
+    """Previously generated roadmap for the same inputs, or None"""
+    roadmap = Roadmap.objects.filter(assessment=assessment, fingerprint=fingerprint).first()
+    count_cache('stored_roadmap', hit=roadmap is not None)
+    if roadmap is not None:
+        ROADMAPS.labels(source='stored').inc()
+    return roadmap
+
+
+def save_roadmap(assessment, fingerprint, roadmap_data):
+    """Store a roadmap, replacing any earlier one for the same inputs"""
+    roadmap, _ = Roadmap.objects.update_or_create(
+        assessment=assessment,
+        fingerprint=fingerprint,
+        defaults={'roadmap_data': roadmap_data}
+    )
+    return roadmap
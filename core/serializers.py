@@ -20,6 +20,14 @@ class CourseSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class CourseListSerializer(serializers.ModelSerializer):
+    """Catalog listing without the long description and outcome fields"""
+    class Meta:
+        model = Course
+        fields = ['id', 'course_id', 'title', 'icon_emoji', 'difficulty_range',
+                  'estimated_weeks_min', 'estimated_weeks_max', 'topics_covered']
+
+
 class AssessmentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Assessment
@@ -0,0 +1,24 @@
+from django.contrib.auth.models import User
+from django.test import Client, TestCase
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core.models import Assessment, LearnerProfile
+
+
+class APITestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('learner@example.com', 'learner@example.com', 'secret')
+        LearnerProfile.objects.create(user=self.user, learning_goal='upskill', weekly_hours=6, preferred_time='evening')
+        self.authorization = f'Token {Token.objects.create(user=self.user).key}'
+        # CSRF is enforced like in a browser; token clients must not need it
+        self.client = Client(enforce_csrf_checks=True, HTTP_AUTHORIZATION=self.authorization)
+
+    def post_json(self, path, data):
+        return self.client.post(path, data, content_type='application/json')
+
+    def evaluated_assessment(self):
+        return Assessment.objects.create(
+            user=self.user, custom_course_name='Rust', status='completed', completed_at=timezone.now(),
+            quiz_data={}, evaluation_results={'learner_profile': {'skill_level': 'beginner', 'weaknesses': [], 'strengths': []}},
+        )
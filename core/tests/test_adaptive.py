@@ -0,0 +1,102 @@
+import math
+import random
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core import adaptive
+
+
+def uncalibrated_pool(size=60):
+    """Bank items with the default parameters, evenly spread over the three difficulty levels"""
+    levels = list(adaptive.DEFAULT_DIFFICULTY)
+    return adaptive.ItemPool(
+        range(size),
+        [adaptive.DEFAULT_DISCRIMINATION] * size,
+        [adaptive.DEFAULT_DIFFICULTY[levels[i % len(levels)]] for i in range(size)],
+    )
+
+
+def answers_correctly(theta, a, b, rng):
+    return rng.random() < 1.0 / (1.0 + math.exp(-a * (theta - b)))
+
+
+class EstimateAbilityTests(SimpleTestCase):
+    def test_prior_only(self):
+        theta, se = adaptive.estimate_ability([], [], [])
+        self.assertAlmostEqual(theta, 0.0, places=6)
+        self.assertAlmostEqual(se, 1.0, places=2)
+
+    def test_estimate_follows_responses(self):
+        a, b = [1.0] * 6, [-1.0, -1.0, 0.0, 0.0, 1.0, 1.0]
+        low, _ = adaptive.estimate_ability(a, b, [0] * 6)
+        high, _ = adaptive.estimate_ability(a, b, [1] * 6)
+        self.assertLess(low, -0.5)
+        self.assertGreater(high, 0.5)
+
+    def test_standard_error_shrinks_with_responses(self):
+        _, few = adaptive.estimate_ability([1.0] * 3, [0.0] * 3, [1, 0, 1])
+        _, many = adaptive.estimate_ability([1.0] * 9, [0.0] * 9, [1, 0, 1] * 3)
+        self.assertLess(many, few)
+
+
+class ItemSelectionTests(SimpleTestCase):
+    def test_selects_items_near_the_ability(self):
+        pool = adaptive.ItemPool([1, 2, 3], [1.0, 1.0, 1.0], [-2.0, 0.0, 2.0])
+        with mock.patch.object(adaptive, 'TOP_K', 1):
+            self.assertEqual(pool.select(1.8)[0], 3)
+            self.assertEqual(pool.select(-1.8)[0], 1)
+            self.assertEqual(pool.select(0.1, exclude_ids=[2])[0], 3)
+
+    def test_exhausted_pool(self):
+        pool = adaptive.ItemPool([1], [1.0], [0.0])
+        self.assertIsNone(pool.select(0.0, exclude_ids=[1]))
+
+    def test_never_repeats_an_item(self):
+        pool, state, rng = uncalibrated_pool(12), adaptive.new_state(), random.Random(3)
+        while adaptive.next_item(state, pool, rng) is not None:
+            adaptive.record_response(state, rng.random() < 0.5)
+        self.assertEqual(sorted(bank_id for bank_id, _, _ in state['items']), list(range(12)))
+
+
+class SimulatedLearnerTests(SimpleTestCase):
+    """Adaptive tests should match the fixed 10-question quiz's precision with fewer questions"""
+
+    LEARNERS = 400
+
+    def simulate(self):
+        rng, pool = random.Random(1), uncalibrated_pool()
+        lengths, squared_errors = [], []
+        for _ in range(self.LEARNERS):
+            theta, state = rng.gauss(0, 1), adaptive.new_state()
+            while not adaptive.should_stop(state):
+                adaptive.next_item(state, pool, rng)
+                _, a, b = state['items'][-1]
+                adaptive.record_response(state, answers_correctly(theta, a, b, rng))
+            lengths.append(len(state['responses']))
+            squared_errors.append((state['theta'] - theta) ** 2)
+        return sum(lengths) / len(lengths), math.sqrt(sum(squared_errors) / len(squared_errors))
+
+    def fixed_quiz_error(self, length=10):
+        rng, pool = random.Random(2), uncalibrated_pool()
+        squared_errors = []
+        for _ in range(self.LEARNERS):
+            theta = rng.gauss(0, 1)
+            items = rng.sample(range(len(pool)), length)
+            a, b = [float(pool.a[i]) for i in items], [float(pool.b[i]) for i in items]
+            responses = [int(answers_correctly(theta, ai, bi, rng)) for ai, bi in zip(a, b)]
+            estimate, _ = adaptive.estimate_ability(a, b, responses)
+            squared_errors.append((estimate - theta) ** 2)
+        return math.sqrt(sum(squared_errors) / len(squared_errors))
+
+    def test_default_stop_is_shorter_than_the_fixed_quiz(self):
+        average_length, error = self.simulate()
+        self.assertLessEqual(average_length, 8.5)
+        self.assertLessEqual(error, self.fixed_quiz_error() + 0.05)
+
+    def test_stricter_target_asks_more_questions(self):
+        with self.settings(ADAPTIVE_TARGET_SE=0.55):
+            strict_length, strict_error = self.simulate()
+        default_length, default_error = self.simulate()
+        self.assertGreater(strict_length, default_length)
+        self.assertLess(strict_error, default_error + 0.02)
@@ -0,0 +1,28 @@
+from django.utils import timezone
+
+from core.models import Assessment
+from core.tests.base import APITestCase
+
+
+class AssessmentHistoryTests(APITestCase):
+    def test_keyset_pages_cover_every_assessment_once(self):
+        assessments = [Assessment.objects.create(user=self.user, custom_course_name=f'Topic {n}', quiz_data={})
+                       for n in range(7)]
+        # Ties on started_at are broken by id
+        tied = timezone.now()
+        Assessment.objects.filter(id__in=[a.id for a in assessments[2:5]]).update(started_at=tied)
+        expected = list(Assessment.objects.filter(user=self.user).order_by('-started_at', '-id').values_list('id', flat=True))
+
+        seen, cursor = [], None
+        while True:
+            params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+            page = self.client.get('/api/assessments/', params).json()
+            seen.extend(row['assessment_id'] for row in page['results'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/assessments/', {'cursor': 'garbage'}).status_code, 400)
@@ -0,0 +1,39 @@
+from unittest import mock
+
+from django.test import AsyncClient, Client
+
+from core.quiz_generator import generate_fallback_quiz
+from core.tests.base import APITestCase
+
+
+@mock.patch('core.quiz_pool.claim_pregenerated_quiz', side_effect=generate_fallback_quiz)
+class AsyncEndpointTests(APITestCase):
+    def test_start_async_accepts_token_without_csrf(self, claim):
+        response = self.post_json('/api/assessment/start-async/', {'course_name': 'Rust'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['quiz']['questions']), 10)
+
+    async def test_start_stream_async_accepts_token_without_csrf(self, claim):
+        client = AsyncClient(enforce_csrf_checks=True)
+        response = await client.post('/api/assessment/start-stream-async/', {'course_name': 'Rust'},
+                                     content_type='application/json', headers={'Authorization': self.authorization})
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join([chunk async for chunk in response.streaming_content]).decode().splitlines()
+        self.assertIn('"type": "complete"', lines[-1])
+
+    def test_generate_roadmap_async_accepts_token_without_csrf(self, claim):
+        response = self.post_json('/api/roadmap/generate-async/', {'assessment_id': self.evaluated_assessment().id})
+        self.assertEqual(response.status_code, 202)
+
+    def test_malformed_json_is_a_bad_request(self, claim):
+        for path in ('/api/assessment/start-async/', '/api/assessment/start-stream-async/', '/api/roadmap/generate-async/'):
+            for body in ('{"course_name": ', '["Rust"]'):
+                response = self.client.post(path, body, content_type='application/json')
+                self.assertEqual(response.status_code, 400, (path, body))
+                self.assertEqual(response.json(), {'error': 'Invalid JSON body'})
+
+    def test_async_endpoints_require_a_token_and_post(self, claim):
+        anonymous = Client(enforce_csrf_checks=True)
+        for path in ('/api/assessment/start-async/', '/api/assessment/start-stream-async/', '/api/roadmap/generate-async/'):
+            self.assertEqual(anonymous.post(path, {}, content_type='application/json').status_code, 401)
+            self.assertEqual(self.client.get(path).status_code, 405)
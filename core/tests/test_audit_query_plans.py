@@ -0,0 +1,36 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from core.management.commands.audit_query_plans import Command
+from core.models import Assessment
+
+
+class AuditQueryPlansTests(TestCase):
+    def test_audits_only_its_own_rows_and_rolls_them_back(self):
+        # A real account the old username__startswith='audit' lookup would have picked up
+        real = User.objects.create_user('audit1@example.com', 'audit1@example.com', 'secret')
+        Assessment.objects.create(user=real, custom_course_name='Rust', quiz_data={})
+
+        with mock.patch.object(Command, 'audit', return_value=0) as audit:
+            call_command('audit_query_plans', users=20, assessments_per_user=2, courses=20, stdout=StringIO())
+
+        sample = audit.call_args.args[0]
+        self.assertNotEqual(sample['user_id'], real.id)
+        self.assertTrue(sample['email'].startswith('audit-'))
+        self.assertEqual(list(User.objects.values_list('id', flat=True)), [real.id])
+        self.assertEqual(Assessment.objects.get().user_id, real.id)
+
+    def test_refuses_a_database_that_is_not_a_test_database(self):
+        with mock.patch.object(Command, 'on_test_database', return_value=False), \
+                mock.patch.object(Command, 'load') as load:
+            with self.assertRaisesMessage(CommandError, '--i-know'):
+                call_command('audit_query_plans', stdout=StringIO())
+            load.assert_not_called()
+
+            with mock.patch.object(Command, 'audit', return_value=0):
+                call_command('audit_query_plans', i_know=True, stdout=StringIO())
+            load.assert_called_once()
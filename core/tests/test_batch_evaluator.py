@@ -0,0 +1,83 @@
+import random
+
+from django.test import SimpleTestCase
+
+from core.batch_evaluator import evaluate_batch, score_batch
+from core.evaluator import evaluate_quiz, score_quiz
+
+TOPICS = ['Syntax', 'Types', 'Closures', 'Concurrency', 'Testing']
+DIFFICULTIES = ['beginner', 'intermediate', 'advanced']
+
+
+def random_quiz(rng, size):
+    return [{
+        'question_id': f'q{number}',
+        'question_number': number,
+        'difficulty': rng.choice(DIFFICULTIES),
+        'topic': rng.choice(TOPICS),
+        'correct_answer': rng.choice('ABCD'),
+        'explanation': f'Because {number}',
+    } for number in range(1, size + 1)]
+
+
+def random_answers(rng, questions):
+    answers = {}
+    for question in questions:
+        roll = rng.random()
+        if roll < 0.5:
+            answers[question['question_id']] = {'answer': question['correct_answer']}
+        elif roll < 0.8:
+            answers[question['question_id']] = {'answer': rng.choice('ABCD')}
+        elif roll < 0.9:
+            answers[question['question_id']] = {}
+        # else unanswered
+    return answers
+
+
+class BatchEvaluatorTests(SimpleTestCase):
+    """The NumPy scorer must give exactly what evaluator.score_quiz gives, learner by learner"""
+
+    def batch(self, seed, learners=50):
+        rng = random.Random(seed)
+        quizzes = [random_quiz(rng, rng.choice([0, 1, 5, 10, 10, 10, 15])) for _ in range(learners)]
+        answers = [random_answers(rng, questions) for questions in quizzes]
+        times = [rng.choice([0, 30, 300, 600, 1200]) for _ in range(learners)]
+        return quizzes, answers, times
+
+    def test_score_batch_matches_score_quiz(self):
+        for seed in range(5):
+            quizzes, answers, times = self.batch(seed)
+            expected = [score_quiz(q, a, t) for q, a, t in zip(quizzes, answers, times)]
+            self.assertEqual(score_batch(quizzes, answers, times), expected)
+
+    def test_evaluate_batch_matches_evaluate_quiz(self):
+        quizzes, answers, times = self.batch(seed=7)
+        hours = [random.Random(i).choice([2, 5, 10, 20]) for i in range(len(quizzes))]
+        expected = [
+            evaluate_quiz({'questions': q}, a, t, h)
+            for q, a, t, h in zip(quizzes, answers, times, hours)
+        ]
+        self.assertEqual(evaluate_batch(quizzes, answers, times, hours), expected)
+
+    def test_vectorized_score_quiz_matches(self):
+        quizzes, answers, times = self.batch(seed=11, learners=10)
+        for q, a, t in zip(quizzes, answers, times):
+            self.assertEqual(score_quiz(q, a, t, vectorized=True), score_quiz(q, a, t))
+
+    def test_malformed_answers_match(self):
+        questions = random_quiz(random.Random(3), 4)
+        answers = {
+            'q1': {'answer': ['A']},
+            'q2': {'answer': None},
+            'q3': {'answer': {'x': 1}},
+            'q4': {'answer': questions[3]['correct_answer']},
+        }
+        self.assertEqual(score_batch([questions], [answers], [60])[0], score_quiz(questions, answers, 60))
+
+    def test_unknown_difficulty_raises_like_score_quiz(self):
+        questions = random_quiz(random.Random(4), 2)
+        questions[1]['difficulty'] = 'expert'
+        with self.assertRaises(KeyError):
+            score_quiz(questions, {}, 10)
+        with self.assertRaises(KeyError):
+            score_batch([questions], [{}], [10])
@@ -0,0 +1,95 @@
+from django.test import SimpleTestCase
+
+from core.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            'test', failure_rate_threshold=0.5, minimum_calls=4, window_size=10,
+            reset_timeout=30, clock=self.clock,
+        )
+
+    def trip(self):
+        with self.assertLogs('core.circuit_breaker', 'WARNING'):
+            for _ in range(4):
+                self.assertTrue(self.breaker.allow_request())
+                self.breaker.record_failure('boom')
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_stays_closed_below_minimum_calls(self):
+        for _ in range(3):
+            self.breaker.record_failure('boom')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_stays_closed_below_failure_rate(self):
+        for _ in range(3):
+            self.breaker.record_success()
+        for _ in range(2):
+            self.breaker.record_failure('boom')
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_trips_at_failure_rate(self):
+        self.breaker.record_success()
+        self.breaker.record_success()
+        self.breaker.record_failure('boom')
+        with self.assertLogs('core.circuit_breaker', 'WARNING'):
+            self.breaker.record_failure('boom')
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.trip_count, 1)
+
+    def test_open_rejects_until_reset_timeout(self):
+        self.trip()
+        self.assertFalse(self.breaker.allow_request())
+        self.assertEqual(self.breaker.rejected_count, 1)
+
+        self.clock.now += 29
+        self.assertFalse(self.breaker.allow_request())
+        self.clock.now += 1
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+
+    def test_half_open_allows_one_probe(self):
+        self.trip()
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+    def test_successful_probe_closes(self):
+        self.trip()
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.breaker.snapshot()['window_calls'], 1)
+
+    def test_failed_probe_reopens(self):
+        self.trip()
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        with self.assertLogs('core.circuit_breaker', 'WARNING'):
+            self.breaker.record_failure('still down')
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.trip_count, 2)
+        self.assertEqual(self.breaker.snapshot()['seconds_until_probe'], 30)
+
+    def test_released_probe_frees_its_slot_without_a_verdict(self):
+        self.trip()
+        self.clock.now += 30
+        self.assertTrue(self.breaker.allow_request())
+        self.breaker.release()
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        self.assertTrue(self.breaker.allow_request())
+
+    def test_release_while_closed_changes_nothing(self):
+        self.breaker.release()
+        self.assertEqual(self.breaker.snapshot()['window_calls'], 0)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
@@ -0,0 +1,41 @@
+from django.utils import timezone
+
+from core import course_catalog
+from core.models import Course
+from core.tests.base import APITestCase
+
+
+class CourseCatalogTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        course_catalog.invalidate_catalog()
+        self.course = Course.objects.create(
+            course_id='rust', title='Rust', description='Systems programming', difficulty_range='beginner-advanced'
+        )
+
+    def test_etag_revalidation(self):
+        first = self.client.get('/api/courses/')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.json()[0]['title'], 'Rust')
+
+        again = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again['ETag'], first['ETag'])
+
+    def test_change_gives_a_new_etag(self):
+        etag = self.client.get('/api/courses/')['ETag']
+        self.course.title = 'Rust in Practice'
+        self.course.save()
+
+        response = self.client.get('/api/courses/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['title'], 'Rust in Practice')
+
+    def test_change_from_another_process_is_picked_up(self):
+        etag = self.client.get('/api/courses/')['ETag']
+        # An update() skips the signals, like a change made by another worker
+        Course.objects.filter(id=self.course.id).update(title='Renamed', updated_at=timezone.now())
+        course_catalog._version = (0, course_catalog._version[1])  # Recheck interval has passed
+
+        self.assertNotEqual(self.client.get('/api/courses/')['ETag'], etag)
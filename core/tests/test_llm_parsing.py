@@ -0,0 +1,127 @@
+import json
+
+from django.test import SimpleTestCase
+
+from core.llm_client import StreamComplete
+from core.llm_parsing import JSONStreamExtractor, extract_json, parse_stream, stream_items
+
+
+def item(number, **extra):
+    return dict({'id': number, 'text': f'Question {number}'}, **extra)
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def has_text(value):
+    return isinstance(value, dict) and bool(value.get('text'))
+
+
+class JSONStreamExtractorTests(SimpleTestCase):
+    def test_items_arrive_as_they_close(self):
+        text = json.dumps({'questions': [item(1), item(2)]})
+        extractor = JSONStreamExtractor('questions')
+        first_item_end = text.index('}') + 1
+
+        self.assertEqual(extractor.feed(text[:first_item_end - 1]), [])
+        self.assertEqual(extractor.feed(text[first_item_end - 1:first_item_end]), [item(1)])
+        self.assertEqual(extractor.feed(text[first_item_end:]), [item(2)])
+        self.assertTrue(extractor.done)
+
+    def test_any_chunking_gives_the_same_result(self):
+        text = 'Sure! ```json\n' + json.dumps({'questions': [item(n) for n in range(1, 6)]}) + '\n``` Enjoy.'
+        expected = extract_json(text, 'questions')
+        for size in (1, 2, 7, 64):
+            extracted = parse_stream(iter(chunked(text, size)), 'questions')
+            self.assertEqual(extracted.items, expected.items)
+            self.assertTrue(extracted.complete)
+
+    def test_truncated_output_keeps_completed_items(self):
+        text = json.dumps({'questions': [item(1), item(2), item(3)]})
+        truncated = text[:text.index('Question 3')]
+
+        with self.assertLogs('core.llm_parsing', 'WARNING'):
+            extracted = parse_stream(iter(chunked(truncated, 10)), 'questions')
+
+        self.assertFalse(extracted.complete)
+        self.assertIsNone(extracted.document)
+        self.assertEqual(extracted.items, [item(1), item(2)])
+        self.assertEqual(extracted.as_dict('questions'), {'questions': [item(1), item(2)]})
+
+    def test_invalid_items_are_counted_not_kept(self):
+        text = json.dumps({'questions': [item(1), {'text': ''}, item(3)]})
+        extracted = extract_json(text, 'questions', has_text)
+        self.assertEqual(extracted.items, [item(1), item(3)])
+        self.assertEqual(extracted.rejected, 1)
+
+    def test_braces_in_prose_and_strings(self):
+        snippet = 'if (x) { return "}"; }'
+        text = 'Use {braces} carefully. ' + json.dumps({'questions': [item(1, code=snippet)]})
+        extracted = extract_json(text, 'questions')
+        self.assertTrue(extracted.complete)
+        self.assertEqual(extracted.items, [item(1, code=snippet)])
+
+    def test_only_the_top_level_array_is_itemized(self):
+        text = json.dumps({'meta': [{'x': 1}], 'questions': [item(1, tags=[{'t': 1}])]})
+        extracted = extract_json(text, 'questions')
+        self.assertEqual(extracted.items, [item(1, tags=[{'t': 1}])])
+        self.assertEqual(extracted.document['meta'], [{'x': 1}])
+
+
+class StreamItemsTests(SimpleTestCase):
+    def test_failure_after_some_items_keeps_them(self):
+        text = json.dumps({'questions': [item(1), item(2), item(3)]})
+
+        def failing():
+            yield text[:text.index('Question 3')]
+            raise RuntimeError('connection reset')
+
+        extractor = JSONStreamExtractor('questions')
+        with self.assertLogs('core.llm_parsing', 'WARNING'):
+            items = list(stream_items(failing(), extractor))
+        self.assertEqual(items, [item(1), item(2)])
+
+    def test_failure_before_any_item_is_raised(self):
+        def failing():
+            yield '{"questions": ['
+            raise RuntimeError('connection reset')
+
+        with self.assertRaises(RuntimeError):
+            list(stream_items(failing(), JSONStreamExtractor('questions')))
+
+    def test_complete_document_ends_the_stream_as_a_success(self):
+        events = []
+
+        def chunks():
+            try:
+                yield json.dumps({'questions': [item(1)]})
+                yield ' and some trailing prose'
+                events.append('read past the document')
+            except StreamComplete:
+                events.append('complete')
+            except GeneratorExit:
+                events.append('closed')
+                raise
+
+        extracted = parse_stream(chunks(), 'questions')
+        self.assertTrue(extracted.complete)
+        self.assertEqual(events, ['complete'])
+
+    def test_abandoned_stream_is_only_closed(self):
+        events = []
+
+        def chunks():
+            try:
+                yield '{"questions": [' + json.dumps(item(1)) + ','
+                yield json.dumps(item(2))
+            except StreamComplete:
+                events.append('complete')
+            except GeneratorExit:
+                events.append('closed')
+                raise
+
+        items = stream_items(chunks(), JSONStreamExtractor('questions'))
+        self.assertEqual(next(items), item(1))
+        items.close()
+        self.assertEqual(events, ['closed'])
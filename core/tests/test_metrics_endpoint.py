@@ -0,0 +1,26 @@
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+
+class MetricsEndpointTests(TestCase):
+    def test_closed_without_a_token(self):
+        with self.settings(METRICS_TOKEN=None):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 401)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_bearer_token(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('# TYPE adaptlearn_quizzes_total counter', response.content.decode())
+
+    def test_staff_session(self):
+        learner = User.objects.create_user('learner@example.com', 'learner@example.com', 'secret')
+        self.client.force_login(learner)
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+
+        learner.is_staff = True
+        learner.save()
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
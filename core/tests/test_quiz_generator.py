@@ -0,0 +1,131 @@
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+
+from core import question_dedup
+from core.question_bank import QUIZ_SIZE, question_hash, store_questions
+from core.quiz_generator import (
+    agenerate_assessment_quiz, astream_assessment_quiz, format_quiz_data, generate_assessment_quiz,
+    generate_fallback_quiz, stream_assessment_quiz,
+)
+
+SUBJECTS = [
+    'borrow checker', 'lifetime elision', 'trait objects', 'pattern matching', 'cargo workspaces',
+    'unsafe blocks', 'async executors', 'macro hygiene', 'error propagation', 'slice indexing',
+    'iterator adaptors', 'smart pointers', 'module visibility', 'integer overflow', 'closure captures',
+    'enum layout', 'const generics', 'interior mutability', 'string encoding', 'test attributes',
+]
+
+
+def generated_question(number):
+    subject = SUBJECTS[number % len(SUBJECTS)]
+    return {
+        'difficulty': 'intermediate', 'topic': subject.title(), 'code_snippet': '',
+        'question_text': f'What does Rust guarantee about {subject}?',
+        'options': {'A': f'{subject} is checked at compile time', 'B': 'Nothing', 'C': 'Only in debug builds', 'D': 'Only with nightly'},
+        'correct_answer': 'A', 'explanation': f'The compiler checks {subject}.', 'concept_tested': subject,
+    }
+
+
+def numbered(questions):
+    return [dict(q, question_id=f'q{n}', question_number=n) for n, q in enumerate(questions, 1)]
+
+
+class QuestionBankTestCase(TestCase):
+    def setUp(self):
+        # The per-process bank index would still hold questions from rolled back tests
+        question_dedup._indexes.clear()
+
+
+class FormatQuizDataTests(QuestionBankTestCase):
+    def assertFullQuiz(self, quiz_data):
+        questions = quiz_data['questions']
+        self.assertEqual(len(questions), QUIZ_SIZE)
+        self.assertEqual(quiz_data['quiz_metadata']['total_questions'], QUIZ_SIZE)
+        self.assertEqual([q['question_id'] for q in questions], [f'q{n}' for n in range(1, QUIZ_SIZE + 1)])
+        self.assertEqual(len({question_hash(q) for q in questions}), QUIZ_SIZE)
+
+    def test_short_quiz_is_padded_from_the_bank_first(self):
+        store_questions('Rust', numbered(generated_question(n) for n in range(1, len(SUBJECTS))))
+        quiz_data = format_quiz_data({'questions': numbered([generated_question(0)])}, 'Rust')
+        self.assertFullQuiz(quiz_data)
+        fallback = {question_hash(q) for q in generate_fallback_quiz('Rust')['questions']}
+        self.assertFalse(fallback & {question_hash(q) for q in quiz_data['questions']})
+
+    def test_short_quiz_without_a_bank_is_padded_from_the_fallback(self):
+        self.assertFullQuiz(format_quiz_data({'questions': numbered([generated_question(1)])}, 'Rust'))
+
+    def test_quiz_made_of_fallback_questions_is_still_filled(self):
+        # Padding must skip the fallback questions already in the quiz
+        fallback = generate_fallback_quiz('Rust')['questions']
+        for questions in (fallback[:9], fallback[3:8], []):
+            self.assertFullQuiz(format_quiz_data({'questions': numbered(questions)}, 'Rust'))
+
+    def test_long_quiz_is_cut(self):
+        questions = numbered(generated_question(n) for n in range(QUIZ_SIZE + 2))
+        self.assertFullQuiz(format_quiz_data({'questions': questions}, 'Rust'))
+
+
+async def _astream_quiz(course_name):
+    steps = [step async for step in astream_assessment_quiz(course_name)]
+    return steps[-1][1]
+
+
+ENTRY_POINTS = {
+    'generate': generate_assessment_quiz,
+    'agenerate': async_to_sync(agenerate_assessment_quiz),
+    'stream': lambda course_name: list(stream_assessment_quiz(course_name))[-1][1],
+    'astream': async_to_sync(_astream_quiz),
+}
+
+
+class QuizSourceTests(QuestionBankTestCase):
+    """The sync, async and streaming generators must pick the same source in every situation"""
+
+    def serve(self, llm_text=None):
+        """Quiz and recorded source from each entry point; the LLM answers llm_text, or fails when None"""
+        def chunks(prompt, **kwargs):
+            if llm_text is None:
+                raise ConnectionError('LLM down')
+            return iter([llm_text[i:i + 50] for i in range(0, len(llm_text), 50)])
+
+        async def achunks(prompt, **kwargs):
+            for chunk in chunks(prompt):
+                yield chunk
+
+        served = {}
+        for name, entry_point in ENTRY_POINTS.items():
+            with mock.patch('core.quiz_generator.stream_text', side_effect=chunks) as llm, \
+                    mock.patch('core.quiz_generator.astream_text', side_effect=achunks) as allm, \
+                    mock.patch('core.quiz_generator.QUIZZES') as quizzes:
+                if llm_text is None:
+                    with self.assertLogs('core.quiz_generator', 'ERROR'):
+                        quiz_data = entry_point('Rust')
+                else:
+                    quiz_data = entry_point('Rust')
+            source = quizzes.labels.call_args.kwargs['source']
+            served[name] = (source, len(quiz_data['questions']), llm.called or allm.called)
+        return served
+
+    def assertServed(self, served, source, asked_llm):
+        self.assertEqual(served, {name: (source, QUIZ_SIZE, asked_llm) for name in ENTRY_POINTS})
+
+    def llm_answer(self):
+        return json.dumps({'questions': numbered(generated_question(n) for n in range(QUIZ_SIZE))})
+
+    def test_full_bank_skips_the_llm(self):
+        store_questions('Rust', numbered(generated_question(n) for n in range(len(SUBJECTS))))
+        with self.settings(QUESTION_BANK_MIN_QUESTIONS=len(SUBJECTS)):
+            self.assertServed(self.serve(self.llm_answer()), 'bank', False)
+
+    def test_llm_quiz(self):
+        self.assertServed(self.serve(self.llm_answer()), 'llm', True)
+
+    def test_failed_llm_falls_back_to_a_thin_bank(self):
+        store_questions('Rust', numbered(generated_question(n) for n in range(len(SUBJECTS))))
+        self.assertServed(self.serve(), 'bank_partial', True)
+
+    def test_failed_llm_and_empty_bank_fall_back_to_the_static_quiz(self):
+        self.assertServed(self.serve(), 'fallback', True)
@@ -0,0 +1,34 @@
+from unittest import mock
+
+from core.models import Roadmap, RoadmapJob
+from core.roadmap_generator import get_roadmap_inputs
+from core.roadmap_store import roadmap_fingerprint
+from core.tests.base import APITestCase
+
+
+class RoadmapRequestTests(APITestCase):
+    def store_roadmap(self, assessment):
+        fingerprint = roadmap_fingerprint(**get_roadmap_inputs(assessment, self.user))
+        Roadmap.objects.create(assessment=assessment, fingerprint=fingerprint, roadmap_data={'roadmap_title': 'Stored'})
+
+    def test_sync_and_async_parse_regenerate_alike(self):
+        assessment = self.evaluated_assessment()
+        self.store_roadmap(assessment)
+
+        for path in ('/api/roadmap/generate/', '/api/roadmap/generate-async/'):
+            for value in ('false', 'no', '0', False, None):
+                response = self.post_json(path, {'assessment_id': assessment.id, 'regenerate': value})
+                self.assertEqual(response.status_code, 200, (path, value))
+                self.assertEqual(response.json()['roadmap'], {'roadmap_title': 'Stored'})
+
+            response = self.post_json(path, {'assessment_id': assessment.id, 'regenerate': 'true'})
+            self.assertEqual(response.status_code, 202, path)
+            self.assertTrue(RoadmapJob.objects.get(id=response.json()['job_id']).regenerate)
+
+    def test_async_queues_a_job_instead_of_generating_inline(self):
+        assessment = self.evaluated_assessment()
+        with mock.patch('core.roadmap_generator.agenerate_learning_roadmap') as generate:
+            response = self.post_json('/api/roadmap/generate-async/', {'assessment_id': assessment.id})
+        generate.assert_not_called()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status_url'], f"/api/roadmap/jobs/{response.json()['job_id']}/")
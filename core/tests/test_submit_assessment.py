@@ -0,0 +1,45 @@
+from unittest import mock
+
+from core.models import Assessment, SkillProfile
+from core.quiz_generator import generate_fallback_quiz
+from core.tests.base import APITestCase
+
+
+@mock.patch('core.quiz_pool.claim_pregenerated_quiz', side_effect=generate_fallback_quiz)
+class SubmitAssessmentTests(APITestCase):
+    def start(self):
+        response = self.post_json('/api/assessment/start-custom/', {'course_name': 'Rust'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['assessment_id']
+
+    def submit(self, assessment_id, answer='A'):
+        return self.post_json('/api/assessment/submit/', {
+            'assessment_id': assessment_id, 'user_answers': {'q1': {'answer': answer}}, 'time_taken': 60,
+        })
+
+    def test_submit_writes_results_and_skill_profile(self, claim):
+        assessment_id = self.start()
+        self.assertEqual(self.submit(assessment_id).status_code, 200)
+
+        assessment = Assessment.objects.get(id=assessment_id)
+        self.assertEqual(assessment.status, 'completed')
+        self.assertTrue(SkillProfile.objects.filter(user=self.user, assessment=assessment).exists())
+
+    def test_resubmit_is_rejected_and_changes_nothing(self, claim):
+        assessment_id = self.start()
+        self.submit(assessment_id)
+        before = Assessment.objects.get(id=assessment_id)
+
+        self.assertEqual(self.submit(assessment_id, answer='B').status_code, 409)
+
+        after = Assessment.objects.get(id=assessment_id)
+        self.assertEqual(after.completed_at, before.completed_at)
+        self.assertEqual(after.user_answers, before.user_answers)
+        self.assertEqual(after.evaluation_results, before.evaluation_results)
+
+    def test_adaptive_assessment_cannot_be_submitted_whole(self, claim):
+        assessment = Assessment.objects.create(
+            user=self.user, custom_course_name='Rust', quiz_data={'adaptive': {'items': [], 'responses': []}},
+        )
+        self.assertEqual(self.submit(assessment.id).status_code, 400)
+        self.assertEqual(Assessment.objects.get(id=assessment.id).status, 'in_progress')
@@ -20,7 +20,20 @@ urlpatterns = [
     path('api/assessment/start/', views.start_assessment, name='api_start_assessment'),
     path('api/assessment/submit/', views.submit_assessment, name='api_submit_assessment'),
     path('api/assessment/<int:assessment_id>/results/', views.get_results, name='api_results'),
+    path('api/assessment/adaptive/start/', views.start_adaptive_assessment, name='api_start_adaptive_assessment'),
+    path('api/assessment/adaptive/answer/', views.answer_adaptive_question, name='api_answer_adaptive_question'),
+    path('api/assessments/', views.list_assessments, name='api_assessments'),
     path('api/assessment/start-custom/', views.start_assessment, name='api_start_assessment'),
+    path('api/assessment/start-stream/', views.start_assessment_stream, name='api_start_assessment_stream'),
     path('api/roadmap/generate/', views.generate_roadmap, name='api_generate_roadmap'),
+    path('api/roadmap/jobs/<int:job_id>/', views.get_roadmap_job, name='api_roadmap_job'),
+    path('api/admin/llm-status/', views.llm_status, name='api_llm_status'),
+    path('api/admin/request-metrics/', views.request_metrics_status, name='api_request_metrics'),
+    path('metrics', views.metrics, name='metrics'),
+    
+    # Async API endpoints (run under adaptlearn.asgi)
+    path('api/assessment/start-async/', views.start_assessment_async, name='api_start_assessment_async'),
+    path('api/assessment/start-stream-async/', views.start_assessment_stream_async, name='api_start_assessment_stream_async'),
+    path('api/roadmap/generate-async/', views.generate_roadmap_async, name='api_generate_roadmap_async'),
 
 ]
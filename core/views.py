@@ -1,16 +1,31 @@
+from django.conf import settings
 from django.shortcuts import render
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags
+from django.db import transaction, IntegrityError
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.urls import reverse
+from asgiref.sync import sync_to_async
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from rest_framework import status
-from .models import LearnerProfile, Course, Assessment, SkillProfile
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from .models import LearnerProfile, Course, Assessment, AssessmentQuestion, SkillProfile, QuestionBank, RoadmapJob
 from .serializers import *
-from .quiz_generator import generate_assessment_quiz
-from .evaluator import evaluate_assessment
+from .roadmap_store import roadmap_fingerprint, get_stored_roadmap
+from .course_catalog import get_catalog
+from .question_bank import resolve_quiz_questions, question_dict, link_questions
+from functools import wraps
+import base64
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -52,7 +67,10 @@ def register_user(request):
         email = request.data.get('email')
         password = request.data.get('password')
         
-        if User.objects.filter(email=email).exists():
+        # Matches the unique index on lower(email), so case variants are caught too
+        if User.objects.alias(email_lower=Lower('email')).filter(
+            email_lower=(email or '').lower()
+        ).exclude(email='').exists():
             return Response(
                 {'error': 'Email already registered'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -78,6 +96,12 @@ def register_user(request):
             'message': 'Account created successfully'
         }, status=status.HTTP_201_CREATED)
         
+    except IntegrityError:
+        # Lost a race with a concurrent registration for the same email
+        return Response(
+            {'error': 'Email already registered'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     except Exception as e:
         logger.error(f"Registration error: {str(e)}")
         return Response(
@@ -151,11 +175,23 @@ def create_profile(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_courses(request):
-    """Get available courses"""
+    """
+    Get available courses.
+    ?detail=1 includes descriptions, prerequisites and learning outcomes.
+    """
     try:
-        courses = Course.objects.filter(is_available=True)
-        serializer = CourseSerializer(courses, many=True)
-        return Response(serializer.data)
+        detail = _is_true(request.query_params.get('detail'))
+        etag, body = get_catalog(detail)
+        
+        client_etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if '*' in client_etags or etag in [tag.removeprefix('W/') for tag in client_etags]:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type='application/json')
+        
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'  # Always revalidate, the 304 is cheap
+        return response
         
     except Exception as e:
         logger.error(f"Course retrieval error: {str(e)}")
@@ -165,6 +201,69 @@ def get_courses(request):
         )
 
 
+def _validate_course_name(course_name):
+    """Return an error message for an invalid custom course name, or None"""
+    if not course_name or len(course_name) < 2:
+        return 'Course name must be at least 2 characters'
+    
+    if len(course_name) > 100:
+        return 'Course name too long (max 100 characters)'
+    
+    return None
+
+
+def _create_custom_assessment(user, course_name, quiz_data):
+    """
+    Create the assessment record for a custom course.
+    Questions are stored once in the bank and linked by id; only quizzes that
+    cannot be represented that way keep their questions inline.
+    Returns the assessment and the quiz as it will be graded.
+    """
+    rows = resolve_quiz_questions(course_name, quiz_data.get('questions', []))
+    stored_quiz_data = quiz_data
+    if rows:
+        quiz_data = dict(quiz_data, questions=[question_dict(row, number) for number, row in enumerate(rows, start=1)])
+        stored_quiz_data = {'quiz_metadata': quiz_data.get('quiz_metadata', {})}
+    
+    with transaction.atomic():
+        assessment = Assessment.objects.create(
+            user=user,
+            course=None,  # No associated course since it's custom
+            quiz_data=stored_quiz_data,
+            status='in_progress',
+            started_at=timezone.now(),
+            custom_course_name=course_name  # Store custom course name for reference
+        )
+        if rows:
+            link_questions(assessment, rows)
+    
+    logger.info(f"Assessment {assessment.id} created for {course_name}")
+    return assessment, quiz_data
+
+
+def _question_for_display(q):
+    """Question without its answer key"""
+    return {
+        'question_id': q['question_id'],
+        'question_number': q['question_number'],
+        'difficulty': q['difficulty'],
+        'topic': q['topic'],
+        'question_text': q['question_text'],
+        'code_snippet': q.get('code_snippet', ''),
+        'options': q['options']
+    }
+
+
+def _quiz_for_display(assessment, course_name, quiz_data):
+    """Prepare quiz for frontend (hide correct answers)"""
+    return {
+        'assessment_id': assessment.id,
+        'course_name': course_name,
+        'metadata': quiz_data.get('quiz_metadata', {}),
+        'questions': [_question_for_display(q) for q in quiz_data.get('questions', [])]
+    }
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def start_assessment(request):
@@ -176,23 +275,21 @@ def start_assessment(request):
         logger.info(f"Starting custom assessment for: {course_name}")
         
         # Validate course name
-        if not course_name or len(course_name) < 2:
+        error = _validate_course_name(course_name)
+        if error:
             return Response(
-                {'error': 'Course name must be at least 2 characters'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        if len(course_name) > 100:
-            return Response(
-                {'error': 'Course name too long (max 100 characters)'},
+                {'error': error},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
         # Import here to avoid circular imports
         from .quiz_generator import generate_assessment_quiz
+        from .quiz_pool import claim_pregenerated_quiz
         
-        # Generate dynamic quiz for the custom course
-        quiz_data = generate_assessment_quiz(course_name, user)
+        # Serve a pre-built quiz when the pool has one, otherwise generate live
+        quiz_data = claim_pregenerated_quiz(course_name)
+        if not quiz_data:
+            quiz_data = generate_assessment_quiz(course_name, user)
         
         if not quiz_data:
             logger.error(f"Failed to generate quiz for course: {course_name}")
@@ -204,38 +301,8 @@ def start_assessment(request):
         logger.info(f"Quiz generated with {len(quiz_data.get('questions', []))} questions")
         
         # Create assessment record
-        assessment = Assessment.objects.create(
-            user=user,
-            course=None,  # No associated course since it's custom
-            quiz_data=quiz_data,
-            status='in_progress',
-            started_at=timezone.now()
-        )
-        
-        # Store custom course name for reference
-        assessment.custom_course_name = course_name
-        assessment.save()
-        
-        logger.info(f"Assessment {assessment.id} created for {course_name}")
-        
-        # Prepare quiz for frontend (hide correct answers)
-        quiz_for_display = {
-            'assessment_id': assessment.id,
-            'course_name': course_name,
-            'metadata': quiz_data.get('quiz_metadata', {}),
-            'questions': [
-                {
-                    'question_id': q['question_id'],
-                    'question_number': q['question_number'],
-                    'difficulty': q['difficulty'],
-                    'topic': q['topic'],
-                    'question_text': q['question_text'],
-                    'code_snippet': q.get('code_snippet', ''),
-                    'options': q['options']
-                }
-                for q in quiz_data.get('questions', [])
-            ]
-        }
+        assessment, quiz_data = _create_custom_assessment(user, course_name, quiz_data)
+        quiz_for_display = _quiz_for_display(assessment, course_name, quiz_data)
         
         logger.info(f"Assessment response prepared with {len(quiz_for_display['questions'])} questions")
         
@@ -254,6 +321,80 @@ def start_assessment(request):
 
 
 
+def _ndjson_response(events):
+    """Stream events as newline-delimited JSON, unbuffered by proxies"""
+    response = StreamingHttpResponse(events, content_type='application/x-ndjson')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _assessment_events(user, course_name):
+    """Events of start_assessment_stream: each question as it is ready, then the saved quiz"""
+    from .quiz_generator import stream_assessment_quiz
+    from .quiz_pool import claim_pregenerated_quiz
+    
+    try:
+        quiz_data = claim_pregenerated_quiz(course_name)
+        steps = [('quiz', quiz_data)] if quiz_data else stream_assessment_quiz(course_name, user)
+        for kind, payload in steps:
+            if kind == 'question':
+                yield json.dumps({'type': 'question', 'question': _question_for_display(payload)}) + '\n'
+            else:
+                quiz_data = payload
+        
+        assessment, quiz_data = _create_custom_assessment(user, course_name, quiz_data)
+        yield json.dumps({
+            'type': 'complete',
+            'assessment_id': assessment.id,
+            'quiz': _quiz_for_display(assessment, course_name, quiz_data)
+        }) + '\n'
+    except Exception as e:
+        logger.error(f"Error in start_assessment_stream: {str(e)}", exc_info=True)
+        yield json.dumps({'type': 'error', 'error': str(e)}) + '\n'
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def start_assessment_stream(request):
+    """
+    Streaming version of start_assessment, as newline-delimited JSON:
+    a {"type": "question"} event per question as soon as the LLM has produced it,
+    then {"type": "complete"} with the saved assessment, or {"type": "error"}.
+    The complete event carries the final quiz, which replaces the streamed questions.
+    """
+    course_name = str(request.data.get('course_name', '')).strip()
+    
+    error = _validate_course_name(course_name)
+    if error:
+        return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    logger.info(f"Streaming custom assessment for: {course_name}")
+    return _ndjson_response(_assessment_events(request.user, course_name))
+
+
+def _save_evaluation(assessment, user_answers, evaluation_results, extra_fields=()):
+    """
+    Write answers and results (without rewriting quiz_data unless listed in
+    extra_fields) and upsert the SkillProfile. Call inside a transaction.
+    """
+    from .evaluator import skill_profile_fields
+    
+    assessment.user_answers = user_answers
+    assessment.evaluation_results = evaluation_results
+    assessment.status = 'completed'
+    assessment.completed_at = timezone.now()
+    assessment.save(update_fields=['user_answers', 'evaluation_results', 'status', 'completed_at', *extra_fields])
+    
+    defaults = dict(skill_profile_fields(evaluation_results), assessment=assessment)
+    if assessment.course_id:
+        # One profile per user and catalog course; a retake replaces it
+        SkillProfile.objects.update_or_create(user=assessment.user, course_id=assessment.course_id, defaults=defaults)
+    else:
+        defaults['user'] = assessment.user
+        SkillProfile.objects.update_or_create(assessment=assessment, defaults=defaults)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def submit_assessment(request):
@@ -264,28 +405,35 @@ def submit_assessment(request):
         user_answers = request.data.get('user_answers', {})
         time_taken = request.data.get('time_taken', 0)
         
-        # Get assessment
-        assessment = Assessment.objects.get(id=assessment_id, user=user)
-        
-        # Store user answers
-        assessment.user_answers = user_answers
-        assessment.save()
-        
-        # Evaluate assessment
         from .evaluator import evaluate_assessment
-        evaluation_results = evaluate_assessment(assessment, user_answers, time_taken)
-        
-        if not evaluation_results:
-            return Response(
-                {'error': 'Failed to evaluate assessment'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
         
-        # Store evaluation results
-        assessment.evaluation_results = evaluation_results
-        assessment.status = 'completed'
-        assessment.completed_at = timezone.now()
-        assessment.save()
+        with transaction.atomic():
+            # Lock the row so a double submit cannot race the SkillProfile upsert
+            assessment = Assessment.objects.select_for_update(of=('self',)).select_related(
+                'user__profile'
+            ).defer('user_answers', 'evaluation_results').get(id=assessment_id, user=user)
+            
+            if assessment.status == 'completed':
+                # A resubmit would overwrite the results and move completed_at past the calibration watermark
+                return Response(
+                    {'error': 'Assessment already submitted'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            if 'adaptive' in (assessment.quiz_data or {}):
+                return Response(
+                    {'error': 'Adaptive assessments are answered one question at a time'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            evaluation_results = evaluate_assessment(assessment, user_answers, time_taken)
+            
+            if not evaluation_results:
+                return Response(
+                    {'error': 'Failed to evaluate assessment'},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+            
+            _save_evaluation(assessment, user_answers, evaluation_results)
         
         logger.info(f"Assessment {assessment_id} submitted by user {user.id}")
         
@@ -310,16 +458,276 @@ def submit_assessment(request):
         )
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def start_adaptive_assessment(request):
+    """Start an adaptive assessment: questions come one at a time from the bank"""
+    try:
+        user = request.user
+        course_name = request.data.get('course_name', '').strip()
+        
+        error = _validate_course_name(course_name)
+        if error:
+            return Response(
+                {'error': error},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        from .adaptive import get_item_pool, invalidate_item_pool, new_state, next_item, min_questions, max_questions
+        
+        pool = get_item_pool(course_name)
+        if len(pool) < max_questions():
+            # Grow the bank once; generated questions are stored as they are parsed
+            from .quiz_generator import try_llm_generation
+            if try_llm_generation(course_name):
+                invalidate_item_pool(course_name)
+                pool = get_item_pool(course_name)
+        
+        if len(pool) < min_questions():
+            return Response(
+                {'error': 'Not enough questions for an adaptive assessment on this topic yet. Please take the standard assessment.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+        
+        state = new_state()
+        bank_id = next_item(state, pool)
+        
+        with transaction.atomic():
+            assessment = Assessment.objects.create(
+                user=user,
+                course=None,
+                quiz_data={
+                    'quiz_metadata': {
+                        'course_name': course_name,
+                        'mode': 'adaptive',
+                        'max_questions': max_questions()
+                    },
+                    'adaptive': state
+                },
+                status='in_progress',
+                started_at=timezone.now(),
+                custom_course_name=course_name
+            )
+            AssessmentQuestion.objects.create(assessment=assessment, question_id=bank_id, position=1)
+        
+        question = question_dict(QuestionBank.objects.get(id=bank_id), 1)
+        
+        logger.info(f"Adaptive assessment {assessment.id} started for {course_name}")
+        
+        return Response({
+            'message': 'Adaptive assessment started',
+            'assessment_id': assessment.id,
+            'course_name': course_name,
+            'question': _question_for_display(question),
+            'max_questions': max_questions()
+        }, status=status.HTTP_200_OK)
+        
+    except Exception as e:
+        logger.error(f"Error in start_adaptive_assessment: {str(e)}", exc_info=True)
+        return Response(
+            {'error': 'An error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def answer_adaptive_question(request):
+    """
+    Answer the current adaptive question. Returns the next question, or the
+    evaluation (same shape as submit_assessment) once the estimate is precise enough.
+    """
+    try:
+        user = request.user
+        assessment_id = request.data.get('assessment_id')
+        question_id = request.data.get('question_id')
+        answer = request.data.get('answer')
+        time_taken = request.data.get('time_taken', 0)
+        
+        from .adaptive import get_item_pool, record_response, should_stop, next_item, skill_level_for
+        from .evaluator import evaluate_assessment
+        
+        with transaction.atomic():
+            assessment = Assessment.objects.select_for_update(of=('self',)).select_related(
+                'user__profile'
+            ).defer('evaluation_results').get(id=assessment_id, user=user)
+            
+            state = (assessment.quiz_data or {}).get('adaptive')
+            if not state or assessment.status != 'in_progress':
+                return Response(
+                    {'error': 'Not an active adaptive assessment'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            position = len(state['responses']) + 1
+            if question_id != f"q{position}":
+                return Response(
+                    {'error': 'Answer the current question first', 'current_question_id': f"q{position}"},
+                    status=status.HTTP_409_CONFLICT
+                )
+            
+            bank_id = state['items'][position - 1][0]
+            correct_answer = QuestionBank.objects.values_list('correct_answer', flat=True).get(id=bank_id)
+            
+            user_answers = dict(assessment.user_answers or {})
+            user_answers[question_id] = {'answer': answer}
+            record_response(state, answer == correct_answer)
+            
+            next_id = None
+            if not should_stop(state):
+                next_id = next_item(state, get_item_pool(assessment.custom_course_name))
+            
+            if next_id is None:
+                evaluation_results = evaluate_assessment(assessment, user_answers, time_taken)
+                evaluation_results['ability'] = {
+                    'theta': round(state['theta'], 3),
+                    'standard_error': round(state['se'], 3),
+                    'questions_answered': len(state['responses'])
+                }
+                # The percentage-based level is meaningless when items track the learner
+                learner_profile = evaluation_results['learner_profile']
+                learner_profile['skill_level'] = skill_level_for(state['theta'])
+                learner_profile['skill_level_reasoning'] = (
+                    f"Adaptive estimate after {len(state['responses'])} questions: "
+                    f"ability {state['theta']:+.2f} (±{state['se']:.2f})."
+                )
+                _save_evaluation(assessment, user_answers, evaluation_results, extra_fields=['quiz_data'])
+            else:
+                AssessmentQuestion.objects.create(assessment=assessment, question_id=next_id, position=position + 1)
+                assessment.user_answers = user_answers
+                assessment.save(update_fields=['quiz_data', 'user_answers'])
+        
+        if next_id is None:
+            logger.info(f"Adaptive assessment {assessment_id} completed after {len(state['responses'])} questions")
+            return Response({
+                'message': 'Assessment evaluated successfully',
+                'completed': True,
+                'assessment_id': assessment.id,
+                'evaluation_results': evaluation_results,
+                'learner_profile': evaluation_results.get('learner_profile', {}),
+                'overall_score': evaluation_results.get('overall_score', 0)
+            }, status=status.HTTP_200_OK)
+        
+        question = question_dict(QuestionBank.objects.get(id=next_id), position + 1)
+        return Response({
+            'completed': False,
+            'assessment_id': assessment.id,
+            'question': _question_for_display(question)
+        }, status=status.HTTP_200_OK)
+        
+    except (Assessment.DoesNotExist, QuestionBank.DoesNotExist):
+        return Response(
+            {'error': 'Assessment not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except Exception as e:
+        logger.error(f"Adaptive answer error: {str(e)}", exc_info=True)
+        return Response(
+            {'error': 'An error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
+ASSESSMENT_PAGE_SIZE = 20
+ASSESSMENT_PAGE_MAX = 100
+
+
+def _encode_cursor(started_at, assessment_id):
+    raw = json.dumps([started_at.isoformat(), assessment_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _decode_cursor(cursor):
+    """(started_at, id) from a cursor, or None if it is malformed"""
+    try:
+        started_at, assessment_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        started_at = parse_datetime(started_at)
+        if started_at is None or not isinstance(assessment_id, int):
+            return None
+        return started_at, assessment_id
+    except (ValueError, TypeError):
+        return None
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def list_assessments(request):
+    """
+    Learner's assessment history, newest first.
+    Filters: status, course (course id), custom_course_name. Pass next_cursor
+    back as ?cursor= for the following page; each page is one index range scan.
+    """
+    try:
+        try:
+            limit = min(max(int(request.query_params.get('limit', ASSESSMENT_PAGE_SIZE)), 1), ASSESSMENT_PAGE_MAX)
+        except ValueError:
+            return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        assessments = Assessment.objects.filter(user=request.user)
+        
+        if request.query_params.get('status'):
+            assessments = assessments.filter(status=request.query_params['status'])
+        if request.query_params.get('course'):
+            assessments = assessments.filter(course__course_id=request.query_params['course'])
+        if request.query_params.get('custom_course_name'):
+            assessments = assessments.filter(custom_course_name__iexact=request.query_params['custom_course_name'])
+        
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            position = _decode_cursor(cursor)
+            if position is None:
+                return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+            started_at, assessment_id = position
+            # started_at__lte bounds the index range; the OR only breaks ties
+            assessments = assessments.filter(started_at__lte=started_at).filter(
+                Q(started_at__lt=started_at) | Q(id__lt=assessment_id)
+            )
+        
+        rows = list(assessments.order_by('-started_at', '-id').values(
+            'id', 'status', 'started_at', 'completed_at', 'custom_course_name',
+            'course__course_id', 'course__title',
+            'skillprofile__skill_level', 'skillprofile__confidence_score'
+        )[:limit + 1])
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1]['started_at'], rows[-1]['id']) if has_more else None
+        
+        return Response({
+            'results': [
+                {
+                    'assessment_id': row['id'],
+                    'course_id': row['course__course_id'],
+                    'course_name': row['custom_course_name'] or row['course__title'],
+                    'status': row['status'],
+                    'started_at': row['started_at'],
+                    'completed_at': row['completed_at'],
+                    'skill_level': row['skillprofile__skill_level'],
+                    'score': row['skillprofile__confidence_score'],
+                }
+                for row in rows
+            ],
+            'next_cursor': next_cursor
+        })
+        
+    except Exception as e:
+        logger.error(f"Assessment history error: {str(e)}")
+        return Response(
+            {'error': 'Failed to retrieve assessments'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_results(request, assessment_id):
     """Get assessment results"""
     try:
-        assessment = Assessment.objects.get(id=assessment_id, user=request.user)
-        skill_profile = SkillProfile.objects.get(assessment=assessment)
+        # One query; telling a missing assessment from missing results is left to the error path
+        skill_profile = SkillProfile.objects.get(assessment_id=assessment_id, assessment__user=request.user)
         
         return Response({
-            'assessment_id': assessment.id,
+            'assessment_id': skill_profile.assessment_id,
             'evaluation_results': skill_profile.raw_results,
             'learner_profile': {
                 'skill_level': skill_profile.skill_level,
@@ -333,12 +741,12 @@ def get_results(request, assessment_id):
             }
         })
         
-    except Assessment.DoesNotExist:
-        return Response(
-            {'error': 'Assessment not found'},
-            status=status.HTTP_404_NOT_FOUND
-        )
     except SkillProfile.DoesNotExist:
+        if not Assessment.objects.filter(id=assessment_id, user=request.user).exists():
+            return Response(
+                {'error': 'Assessment not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         return Response(
             {'error': 'Results not available yet'},
             status=status.HTTP_404_NOT_FOUND
@@ -350,10 +758,45 @@ def get_results(request, assessment_id):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
     
+def _is_true(value):
+    return str(value if value is not None else '').lower() in ('1', 'true', 'yes')
+
+
+def _roadmap_or_job(user, assessment, regenerate):
+    """
+    Stored roadmap when nothing that shapes it has changed, otherwise a queued
+    RoadmapJob to poll. Returns (response data, status code).
+    """
+    from .jobs import enqueue_roadmap_job
+    from .roadmap_generator import get_roadmap_inputs
+    
+    if not regenerate:
+        fingerprint = roadmap_fingerprint(**get_roadmap_inputs(assessment, assessment.user))
+        roadmap = get_stored_roadmap(assessment, fingerprint)
+        if roadmap:
+            return {
+                'message': 'Roadmap loaded',
+                'status': 'completed',
+                'roadmap': roadmap.roadmap_data
+            }, status.HTTP_200_OK
+    
+    job = RoadmapJob.objects.create(user=user, assessment=assessment, regenerate=regenerate)
+    transaction.on_commit(lambda: enqueue_roadmap_job(job.id))
+    
+    logger.info(f"Roadmap job {job.id} queued for user {user.id}")
+    
+    return {
+        'message': 'Roadmap generation started',
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': reverse('api_roadmap_job', args=[job.id])
+    }, status.HTTP_202_ACCEPTED
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def generate_roadmap(request):
-    """Generate personalized learning roadmap based on assessment"""
+    """Queue personalized roadmap generation and return a job id to poll"""
     try:
         user = request.user
         assessment_id = request.data.get('assessment_id')
@@ -364,8 +807,10 @@ def generate_roadmap(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get assessment
-        assessment = Assessment.objects.get(id=assessment_id, user=user)
+        # Get assessment (the roadmap only needs the results and the learner's weekly hours)
+        assessment = Assessment.objects.select_related('course', 'user__profile').defer(
+            'quiz_data', 'user_answers'
+        ).get(id=assessment_id, user=user)
         
         if not assessment.evaluation_results:
             return Response(
@@ -373,54 +818,236 @@ def generate_roadmap(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Extract data for roadmap generation
-        eval_results = assessment.evaluation_results
-        learner_profile = eval_results.get('learner_profile', {})
-        topic = assessment.custom_course_name or (assessment.course.title if assessment.course else 'General')
+        data, response_status = _roadmap_or_job(user, assessment, _is_true(request.data.get('regenerate')))
+        return Response(data, status=response_status)
         
-        skill_level = learner_profile.get('skill_level', 'beginner')
-        weaknesses = learner_profile.get('weaknesses', [])
-        strengths = learner_profile.get('strengths', [])
-        weekly_hours = user.profile.weekly_hours if hasattr(user, 'profile') else 5
-        
-        # Import here to avoid circular imports
-        from .roadmap_generator import generate_learning_roadmap
-        
-        # Generate roadmap
-        roadmap_data = generate_learning_roadmap(
-            topic=topic,
-            skill_level=skill_level,
-            weaknesses=weaknesses,
-            strengths=strengths,
-            weekly_hours=weekly_hours
+    except Assessment.DoesNotExist:
+        return Response(
+            {'error': 'Assessment not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    except Exception as e:
+        logger.error(f"Error in generate_roadmap: {str(e)}")
+        return Response(
+            {'error': 'An error occurred'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def get_roadmap_job(request, job_id):
+    """Poll a roadmap job; includes the roadmap once it is ready"""
+    try:
+        job = RoadmapJob.objects.select_related('roadmap').get(id=job_id, user=request.user)
         
-        if not roadmap_data:
-            return Response(
-                {'error': 'Failed to generate roadmap'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
+        from .jobs import requeue_if_stale
+        requeue_if_stale(job)
         
-        # Store roadmap (optional - for future reference)
-        assessment.roadmap_data = roadmap_data
-        assessment.save()
+        response_data = {
+            'job_id': job.id,
+            'assessment_id': job.assessment_id,
+            'status': job.status
+        }
         
-        logger.info(f"Roadmap generated for user {user.id} - Topic: {topic}")
+        if job.status == 'completed':
+            response_data['roadmap'] = job.roadmap.roadmap_data if job.roadmap else None
+        elif job.status == 'failed':
+            response_data['error'] = job.error or 'Failed to generate roadmap'
         
-        return Response({
-            'message': 'Roadmap generated successfully',
-            'roadmap': roadmap_data
-        }, status=status.HTTP_200_OK)
+        return Response(response_data)
         
-    except Assessment.DoesNotExist:
+    except RoadmapJob.DoesNotExist:
         return Response(
-            {'error': 'Assessment not found'},
+            {'error': 'Roadmap job not found'},
             status=status.HTTP_404_NOT_FOUND
         )
     except Exception as e:
-        logger.error(f"Error in generate_roadmap: {str(e)}")
+        logger.error(f"Roadmap job retrieval error: {str(e)}")
         return Response(
-            {'error': 'An error occurred'},
+            {'error': 'Failed to retrieve roadmap job'},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def llm_status(request):
+    """Circuit breaker state and roadmap cache counters for monitoring (admin only)"""
+    from .llm_client import get_breaker
+    from .roadmap_cache import cache_stats
+    
+    return Response({
+        'circuit_breaker': get_breaker().snapshot(),
+        'roadmap_cache': cache_stats()
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def request_metrics_status(request):
+    """
+    Per-endpoint histograms of request time, DB queries and time, LLM time and
+    evaluator time for this process (admin only). ?reset=1 starts a new window.
+    """
+    from . import request_metrics
+    
+    data = request_metrics.snapshot()
+    if _is_true(request.query_params.get('reset')):
+        request_metrics.reset()
+    return Response(data)
+
+
+def metrics(request):
+    """
+    Prometheus scrape endpoint (text exposition format), totals across all
+    workers when METRICS_DIR is set. Scrapers send "Authorization: Bearer
+    <METRICS_TOKEN>"; staff can also read it with their session. Everyone
+    else is refused, including when no METRICS_TOKEN is configured.
+    """
+    from django.utils.crypto import constant_time_compare
+    from . import metrics as app_metrics
+    
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    scraper = token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not scraper and not request.user.is_staff:
+        if request.user.is_authenticated:
+            return HttpResponse('Forbidden\n', status=403, content_type='text/plain')
+        return HttpResponse('Unauthorized\n', status=401, content_type='text/plain')
+    return HttpResponse(app_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# Async API endpoints - served without holding a worker thread under adaptlearn.asgi
+async def _authenticate_token(request):
+    """Resolve the API token on a plain Django request (async views bypass DRF)"""
+    try:
+        result = await sync_to_async(TokenAuthentication().authenticate)(request)
+    except AuthenticationFailed:
+        return None
+    return result[0] if result else None
+
+
+def async_api_view(view):
+    """
+    POST-only, token-authenticated async API view, called as
+    view(request, user, data) with the parsed JSON body. Async views bypass
+    DRF, so this also does what @api_view does for the sync views: reject
+    malformed JSON with a 400 and exempt them from CSRF (the token is the
+    credential, not a cookie).
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'POST':
+            return JsonResponse({'error': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+        
+        user = await _authenticate_token(request)
+        if user is None:
+            return JsonResponse({'error': 'Authentication credentials were not provided.'}, status=status.HTTP_401_UNAUTHORIZED)
+        
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return JsonResponse({'error': 'Invalid JSON body'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return await view(request, user, data, *args, **kwargs)
+    
+    # Set directly: Django 4.2's csrf_exempt wraps the view in a sync function
+    wrapper.csrf_exempt = True
+    return wrapper
+
+
+@async_api_view
+async def start_assessment_async(request, user, data):
+    """Async version of start_assessment"""
+    try:
+        course_name = str(data.get('course_name', '')).strip()
+        
+        error = _validate_course_name(course_name)
+        if error:
+            return JsonResponse({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        
+        from .quiz_generator import agenerate_assessment_quiz
+        from .quiz_pool import claim_pregenerated_quiz
+        
+        quiz_data = await sync_to_async(claim_pregenerated_quiz)(course_name)
+        if not quiz_data:
+            quiz_data = await agenerate_assessment_quiz(course_name, user)
+        
+        assessment, quiz_data = await sync_to_async(_create_custom_assessment)(user, course_name, quiz_data)
+        
+        return JsonResponse({
+            'message': 'Assessment generated successfully',
+            'quiz': _quiz_for_display(assessment, course_name, quiz_data),
+            'assessment_id': assessment.id
+        })
+        
+    except Exception as e:
+        logger.error(f"Error in start_assessment_async: {str(e)}", exc_info=True)
+        return JsonResponse({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+async def _aassessment_events(user, course_name):
+    """Async version of _assessment_events"""
+    from .quiz_generator import astream_assessment_quiz
+    from .quiz_pool import claim_pregenerated_quiz
+    
+    try:
+        quiz_data = await sync_to_async(claim_pregenerated_quiz)(course_name)
+        if not quiz_data:
+            async for kind, payload in astream_assessment_quiz(course_name, user):
+                if kind == 'question':
+                    yield json.dumps({'type': 'question', 'question': _question_for_display(payload)}) + '\n'
+                else:
+                    quiz_data = payload
+        
+        assessment, quiz_data = await sync_to_async(_create_custom_assessment)(user, course_name, quiz_data)
+        yield json.dumps({
+            'type': 'complete',
+            'assessment_id': assessment.id,
+            'quiz': _quiz_for_display(assessment, course_name, quiz_data)
+        }) + '\n'
+    except Exception as e:
+        logger.error(f"Error in start_assessment_stream_async: {str(e)}", exc_info=True)
+        yield json.dumps({'type': 'error', 'error': str(e)}) + '\n'
+
+
+@async_api_view
+async def start_assessment_stream_async(request, user, data):
+    """Async version of start_assessment_stream"""
+    course_name = str(data.get('course_name', '')).strip()
+    error = _validate_course_name(course_name)
+    if error:
+        return JsonResponse({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return _ndjson_response(_aassessment_events(user, course_name))
+
+
+@async_api_view
+async def generate_roadmap_async(request, user, data):
+    """Async version of generate_roadmap"""
+    try:
+        assessment_id = data.get('assessment_id')
+        
+        if not assessment_id:
+            return JsonResponse({'error': 'Assessment ID required'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        assessment = await Assessment.objects.select_related('course', 'user__profile').defer(
+            'quiz_data', 'user_answers'
+        ).aget(id=assessment_id, user=user)
+        
+        if not assessment.evaluation_results:
+            return JsonResponse({'error': 'Assessment not yet evaluated'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Same job queue as generate_roadmap, so no request waits on the LLM
+        response_data, response_status = await sync_to_async(_roadmap_or_job)(
+            user, assessment, _is_true(data.get('regenerate'))
+        )
+        return JsonResponse(response_data, status=response_status)
+        
+    except Assessment.DoesNotExist:
+        return JsonResponse({'error': 'Assessment not found'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.error(f"Error in generate_roadmap_async: {str(e)}")
+        return JsonResponse({'error': 'An error occurred'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -3,8 +3,11 @@
  */
 
 class QuizManager {
-    constructor(quizData) {
+    constructor(quizData, expectedTotal = null) {
         this.quizData = quizData;
+        // While a quiz streams in, questions arrive one by one up to expectedTotal
+        this.expectedTotal = expectedTotal || quizData.questions.length;
+        this.loading = quizData.questions.length < this.expectedTotal;
         this.currentIndex = 0;
         this.userAnswers = {};
         this.startTime = Date.now();
@@ -17,9 +20,36 @@ class QuizManager {
     }
 
     getTotalQuestions() {
+        return Math.max(this.quizData.questions.length, this.expectedTotal);
+    }
+
+    getLoadedCount() {
         return this.quizData.questions.length;
     }
 
+    isLoaded(index) {
+        return index < this.quizData.questions.length;
+    }
+
+    addQuestion(question) {
+        this.quizData.questions.push(question);
+    }
+
+    finishLoading(quizData) {
+        // The saved quiz is authoritative; drop answers to questions it replaced
+        const streamed = this.quizData.questions;
+        quizData.questions.forEach((q, i) => {
+            if (streamed[i] && streamed[i].question_text !== q.question_text) {
+                delete this.userAnswers[q.question_id];
+            }
+        });
+
+        this.quizData = quizData;
+        this.expectedTotal = quizData.questions.length;
+        this.currentIndex = Math.min(this.currentIndex, this.expectedTotal - 1);
+        this.loading = false;
+    }
+
     selectAnswer(questionId, answer) {
         if (!this.questionStartTimes[questionId]) {
             this.questionStartTimes[questionId] = Date.now();
@@ -48,7 +78,7 @@ class QuizManager {
     }
 
     getUnansweredCount() {
-        let count = 0;
+        let count = this.getTotalQuestions() - this.getLoadedCount();
         this.quizData.questions.forEach(q => {
             if (!this.hasAnswer(q.question_id)) {
                 count++;
@@ -96,7 +126,7 @@ function escapeHtml(text) {
         '"': '&quot;',
         "'": '&#039;'
     };
-    return text.replace(/[&<>"']/g, m => map[m]);
+    return String(text).replace(/[&<>"']/g, m => map[m]);
 }
 
 // Utility function to show loading overlay
@@ -117,3 +147,53 @@ function hideLoadingOverlay() {
         overlay.style.display = 'none';
     }
 }
+
+// Start an assessment over the streaming endpoint, which sends one JSON event
+// per line: each question as soon as it is generated, then the saved quiz
+async function streamAssessment(courseName, { onQuestion, onComplete }) {
+    const response = await fetch('/api/assessment/start-stream/', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Authorization': `Token ${localStorage.getItem('token')}`
+        },
+        body: JSON.stringify({ course_name: courseName })
+    });
+
+    if (!response.ok) {
+        const data = await response.json().catch(() => ({}));
+        throw new Error(data.error || 'Failed to start assessment');
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newline).trim();
+            buffer = buffer.slice(newline + 1);
+            if (!line) {
+                continue;
+            }
+
+            const event = JSON.parse(line);
+            if (event.type === 'question') {
+                onQuestion(event.question);
+            } else if (event.type === 'complete') {
+                onComplete(event);
+                return event;
+            } else if (event.type === 'error') {
+                throw new Error(event.error || 'Failed to generate assessment');
+            }
+        }
+
+        if (done) {
+            throw new Error('Assessment stream ended before the quiz was saved');
+        }
+    }
+}